@@ -1,18 +1,12 @@
 # app.py
 import streamlit as st
 import pandas as pd
-import pdfplumber
-import openpyxl
-import re
 import os
-import io
-
-# To parse .docx files, you need to install python-docx
-try:
-    import docx
-except ImportError:
-    st.error("The 'python-docx' library is not installed. Please install it by running: pip install python-docx")
-    st.stop()
+import uuid
+# PDF/XLSX/DOCX parsers are imported by compliance_core only when a file of that type is parsed.
+from compliance_core import asset_cache, bom_check, history_store, job_store, knowledge_store, limits, tracing
+from compliance_core.component_index import ComponentIndex
+from compliance_core.requirement_search import RequirementIndex
 
 # === Branding & Page Config ===
 st.set_page_config(page_title="Regulatory Compliance & Safety Tool", layout="wide")
@@ -20,16 +14,18 @@ st.set_page_config(page_title="Regulatory Compliance & Safety Tool", layout="wid
 # --- FINAL, CORRECTED LOGO AND TITLE LAYOUT ---
 col1, col2 = st.columns([1, 4])
 
-with col1:
-    def find_logo_path(possible_names=["logo.png", "logo.jpg", "logo.jpeg"]):
-        for name in possible_names:
-            if os.path.exists(name):
-                return name
-        return None
+@st.cache_resource
+def load_logo(possible_names=("logo.png", "logo.jpg", "logo.jpeg")):
+    # Probed and read once per server process instead of on every rerun.
+    for name in possible_names:
+        if os.path.exists(name):
+            with open(name, "rb") as f: return f.read()
+    return None
 
-    logo_path = find_logo_path()
-    if logo_path:
-        st.image(logo_path, width=150)
+with col1:
+    logo = load_logo()
+    if logo:
+        st.image(logo, width=150)
     else:
         st.warning("Logo file not found. Please save your logo as 'logo.png'.")
 
@@ -58,396 +54,173 @@ st.markdown("""
 # === Session State Initialization ===
 def init_session_state():
     state_defaults = {
-        "reports_verified": 0, "requirements_generated": 0, "found_component": None
+        "reports_verified": 0, "requirements_generated": 0, "found_component": None, "component_hits": [], "requirement_hits": [],
+        "session_id": uuid.uuid4().hex
     }
     for key, value in state_defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 init_session_state()
 
-# === FULLY RESTORED TEST CASE KNOWLEDGE BASE ===
-TEST_CASE_KNOWLEDGE_BASE = {
-    "water ingress": {
-        "name": "Water Ingress Protection Test (IPX7)", "standard": "Based on ISO 20653 / IEC 60529",
-        "description": "This test simulates the temporary immersion of the device in water to ensure no harmful quantity of water can enter the enclosure.",
-        "procedure": [
-            "Ensure the Device Under Test (DUT) is in a non-operational state and at ambient temperature.",
-            "Submerge the DUT completely in a water tank.",
-            "The lowest point of the DUT should be 1 meter below the surface of the water.",
-            "The highest point of the DUT should be at least 0.15 meters below the surface.",
-            "Maintain the immersion for 30 minutes.",
-            "After the test, remove the DUT, dry the exterior, and inspect the interior for any signs of water ingress.",
-            "Conduct a full functional check to ensure the device operates as expected."
-        ],
-        "equipment": ["Water Immersion Tank", "Depth Measurement Tool", "Stopwatch", "Post-test Inspection Tools"],
-        "image_url": "https://user-gen-media-assets.s3.amazonaws.com/seedream_images/43e47e6a-f0c8-41fd-b191-50c020769fcb.png"
-    },
-    "thermal shock": {
-        "name": "Thermal Shock Test", "standard": "Based on ISO 16750-4",
-        "description": "Simulates the extreme stress placed on electronic components and their solder joints when moving between extreme temperatures rapidly.",
-        "procedure": [
-            "Set up a dual-chamber thermal shock system (hot and cold chambers).",
-            "Place the DUT in the cold chamber and allow it to stabilize at the minimum temperature (e.g., -40°C).",
-            "Rapidly transfer the DUT to the hot chamber (transfer time should be less than 1 minute).",
-            "Allow the DUT to stabilize at the maximum temperature (e.g., +125°C).",
-            "This completes one cycle. Repeat for the specified number of cycles (e.g., 100 or 1000 cycles).",
-            "After the final cycle, allow the DUT to return to room temperature and perform a full functional and visual inspection for any damage."
-        ],
-        "equipment": ["Dual-Chamber Thermal Shock System", "Temperature Controller", "Monitoring Devices"],
-        "image_url": "https://user-gen-media-assets.s3.amazonaws.com/seedream_images/43e47e6a-f0c8-41fd-b191-50c020769fcb.png"
-    },
-    "vibration": {
-        "name": "Vibration Test", "standard": "Based on IEC 60068-2-6",
-        "description": "This test simulates the vibrations that a component might experience during its operational life due to engine harmonics or rough road conditions.",
-        "procedure": [
-            "Securely mount the DUT onto the vibration shaker table in its intended operational orientation.",
-            "Sweep the frequency range from the minimum to the maximum value and back down (e.g., 10 Hz to 500 Hz).",
-            "Perform the sweep on all three axes (X, Y, and Z).",
-            "Maintain the specified G-force (acceleration) throughout the test.",
-            "During the test, monitor the DUT for any intermittent failures or resonant frequencies.",
-            "After the test, perform a full functional and visual inspection for any damage."
-        ],
-        "equipment": ["Electrodynamic Shaker Table", "Vibration Controller", "Accelerometers", "Data Acquisition System"],
-        "image_url": "https://user-gen-media-assets.s3.amazonaws.com/seedream_images/dbec2cd4-b4dd-410b-b79f-3e6403f51821.png"
-    },
-    "short circuit": {
-        "name": "External Short Circuit Protection", "standard": "Based on AIS-156 / IEC 62133-2",
-        "description": "Verifies the safety performance of a battery or system when an external short circuit is applied, ensuring it does not result in a hazardous event.",
-        "procedure": [
-            "Ensure the DUT (typically a battery pack) is fully charged.",
-            "Connect the positive and negative terminals of the DUT with a copper wire or load with a resistance of less than 100 mΩ.",
-            "Maintain the short circuit condition for a specified duration or until the protection circuit interrupts the current.",
-            "Monitor the DUT for any hazardous events like fire, explosion, or casing rupture.",
-            "Measure the case temperature during the test; it should not exceed the specified safety limit.",
-            "After the test, the DUT should not show signs of fire or explosion."
-        ],
-        "equipment": ["High-Current Contactor", "Low-Resistance Load", "Thermocouples", "Safety Enclosure", "High-speed Camera"],
-        "image_url": ""
-    },
-    "high temperature endurance": {
-        "name": "High Temperature Endurance Test", "standard": "IEC 60068-2-2",
-        "description": "Evaluates the ability of the component to withstand prolonged operation under elevated temperatures without performance degradation or failure.",
-        "procedure": [
-            "Place the DUT inside a calibrated thermal chamber set to the target high temperature (typically +85°C or +125°C).",
-            "Operate the DUT continuously under its typical operating conditions or specified stress conditions for a predetermined duration (e.g., 1000 hours).",
-            "Monitor key performance parameters such as voltage, current, and temperature at set intervals during the test.",
-            "Upon completion, visually inspect the DUT for any signs of material degradation, discoloration, or mechanical failure.",
-            "Perform full functional tests to verify the device operates within specifications post-test."
-        ],
-        "equipment": ["Thermal chamber with temperature control", "Data acquisition system for operational monitoring", "Environmental chamber accessories"],
-        "image_url": "https://user-gen-media-assets.s3.amazonaws.com/seedream_images/43e47e6a-f0c8-41fd-b191-50c020769fcb.png"
-    },
-    "low temperature endurance": {
-        "name": "Low Temperature Endurance Test", "standard": "IEC 60068-2-1",
-        "description": "Assesses the component’s functional reliability and mechanical integrity under prolonged exposure to low temperature environments.",
-        "procedure": [
-            "Place the DUT inside the thermal chamber set at the specified low temperature (commonly -40°C or lower).",
-            "Power the DUT and monitor its behavior over the specified test duration.",
-            "Periodically perform operational verification such as functional checks during the exposure period.",
-            "After completion of the test, inspect the DUT for physical or performance anomalies.",
-            "Document all observations and performance data for evaluation."
-        ],
-        "equipment": ["Low temperature thermal chamber", "Functionality test benches", "Sensor data loggers"],
-        "image_url": ""
-    },
-    "temperature cycling": {
-        "name": "Temperature Cycling Test", "standard": "IEC 60068-2-14",
-        "description": "Measures the robustness of components against cyclic thermal stress typically caused by on/off cycles or environmental temperature fluctuations.",
-        "procedure": [
-            "Mount the DUT securely inside a thermal cycling chamber.",
-            "Cycle the temperature between two limits (e.g., -40°C to +125°C) using ramp rates and dwell times as defined in the test requirements.",
-            "Repeat the defined number of cycles (e.g., 1000 cycles) to simulate expected service life.",
-            "Monitor for any visible signs of cracking, solder joint failures, or other mechanical damage following cycles.",
-            "Perform electrical functional tests before and after the cycling to detect latent failures."
-        ],
-        "equipment": ["Thermal cycling chamber", "Precision temperature controllers", "Mechanical inspection tools"],
-        "image_url": ""
-    },
-    "humidity & damp heat test": {
-        "name": "Humidity and Damp Heat Test", "standard": "IEC 60068-2-78",
-        "description": "Tests endurance of device against moisture ingress and humidity under elevated temperature, simulating tropical and harsh environmental conditions.",
-        "procedure": [
-            "Place the DUT in a humidity chamber with controlled humidity (e.g., 85% RH) and temperature (e.g., +85°C).",
-            "Maintain the test conditions steadily for a required length of time (e.g., 1000 hours for steady-state test).",
-            "Periodically monitor the electrical parameters of the DUT and check for condensation forming on critical points.",
-            "Post-exposure, visually inspect for corrosion, delamination, or material degradation.",
-            "Perform comprehensive functional testing to confirm operational integrity."
-        ],
-        "equipment": ["Humidity chamber with precise RH and temperature control", "Electrical monitoring systems", "Moisture sensors"],
-        "image_url": ""
-    },
-    "salt spray / corrosion test": {
-        "name": "Salt Spray (Corrosion) Test", "standard": "ASTM B117 / IEC 60068-2-11",
-        "description": "Determines corrosion resistance of materials and coatings by exposing components to a saline fog.",
-        "procedure": ["Place components inside a salt spray chamber...", "Operate a saline fog for the specified period...", "Assess coatings and material for corrosion."],
-        "equipment": ["Salt spray chamber", "Fog generator", "Temperature controllers"],
-        "image_url": "https://user-gen-media-assets.s3.amazonaws.com/seedream_images/a8dae943-cf37-4798-acea-4d96c4b558c4.png"
-    },
-    "dust ingress (ip rating)": {
-        "name": "Dust Ingress Test (IP Ratings)", "standard": "IEC 60529",
-        "description": "Evaluates resistance of an enclosure to ingress of dust particles.",
-        "procedure": ["Mount the DUT in a dust chamber with circulating test dust...", "Apply a vacuum inside the DUT to challenge seals...", "Disassemble and inspect for any internal dust contamination."],
-        "equipment": ["Dust test chamber", "Vacuum pump", "Standardized test dust", "Inspection tools"],
-        "image_url": ""
-    },
-    "drop test / mechanical shock": {
-        "name": "Drop Test / Mechanical Shock", "standard": "IEC 60068-2-27 (Shock) / IEC 60068-2-31 (Drop)",
-        "description": "Simulates mechanical shock from impacts or falls to evaluate structural integrity.",
-        "procedure": ["Subject the DUT to a specified number of shocks with a defined pulse shape...", "For drop tests, release the DUT from a defined height...", "Inspect for mechanical damage and verify function."],
-        "equipment": ["Shock or Drop Tester", "Accelerometers", "High-speed cameras"],
-        "image_url": ""
-    },
-    "overvoltage protection test": {
-        "name": "Overvoltage Protection Test", "standard": "IEC 61000-4-5 / ISO 16750-2",
-        "description": "Verifies component resilience to transient overvoltage events (surges).",
-        "procedure": ["Apply standardized surge voltage waveforms to the DUT's power input...", "Monitor the voltage and current to observe protection circuitry...", "Confirm that the device survives without permanent damage."],
-        "equipment": ["Surge Generator", "Coupling/Decoupling Network (CDN)", "Oscilloscope"],
-        "image_url": ""
-    },
-    "overcurrent protection test": {
-        "name": "Overcurrent Protection Test", "standard": "UL 248 / IEC 60947",
-        "description": "Assesses the effectiveness of internal current limiting devices under fault conditions.",
-        "procedure": ["Create a controlled overcurrent condition...", "Measure the time it takes for the protection device to trip...", "Verify that the protection action prevents damage."],
-        "equipment": ["High-Current Power Supply", "DC Electronic Load", "Oscilloscope with Current Probe"],
-        "image_url": ""
-    },
-    "insulation resistance test": {
-        "name": "Insulation Resistance Test", "standard": "IEC 60664-1",
-        "description": "Measures the resistance of insulating materials to ensure its integrity.",
-        "procedure": ["Apply a high, stable DC voltage across the insulation barrier...", "Measure the resulting leakage current and calculate the resistance...", "The resistance must exceed a minimum threshold."],
-        "equipment": ["Megohmmeter (Insulation Resistance Tester)", "High Voltage Probes"],
-        "image_url": ""
-    },
-    "dielectric strength test": {
-        "name": "Dielectric Strength Test (Hipot)", "standard": "IEC 60243 / IEC 60664-1",
-        "description": "Determines if insulation can withstand high voltage transients without breaking down.",
-        "procedure": ["Apply a high AC or DC voltage to the insulation barrier for 60 seconds...", "Monitor the leakage current; a sudden spike indicates failure...", "Leakage must not exceed a predefined limit."],
-        "equipment": ["Hipot Tester (Dielectric Analyzer)", "High Voltage Test Leads", "Safety Enclosure"],
-        "image_url": ""
-    },
-    "electrostatic discharge (esd) test": {
-        "name": "Electrostatic Discharge (ESD) Test", "standard": "IEC 61000-4-2",
-        "description": "Evaluates immunity to static electricity discharges from human contact or other sources.",
-        "procedure": ["Use a calibrated ESD gun to apply 'contact' and 'air' discharges...", "Apply discharges at several voltage levels...", "Monitor the device for any disruption or damage."],
-        "equipment": ["ESD Simulator (ESD Gun)", "Ground Reference Plane"],
-        "image_url": "https://user-gen-media-assets.s3.amazonaws.com/seedream_images/4a0a4660-b90e-4429-994e-9abb6b82feb9.png"
-    },
-    "emi/emc test": {
-        "name": "EMI/EMC Test", "standard": "CISPR 25, IEC 61000 series",
-        "description": "Verifies that the device doesn’t emit excessive interference and can tolerate external interference.",
-        "procedure": ["A suite of tests including Radiated Emissions, Conducted Emissions, Radiated Immunity, and Conducted Immunity."],
-        "equipment": ["EMI Receiver", "Anechoic Chamber", "Signal Generators", "RF Amplifiers", "Antennas", "LISN"],
-        "image_url": ""
-    },
-    "conducted immunity test": {
-        "name": "Conducted Immunity Test", "standard": "IEC 61000-4-6",
-        "description": "Assesses tolerance to conducted radio-frequency disturbances on power or signal lines.",
-        "procedure": ["Inject amplitude-modulated RF signals onto the DUT's cables...", "Sweep the test across a specified frequency range...", "Monitor the DUT for any signs of malfunction."],
-        "equipment": ["RF Signal Generator", "RF Amplifier", "Coupling/Decoupling Network (CDN)"],
-        "image_url": ""
-    },
-    "radiated emissions test": {
-        "name": "Radiated Emissions Test", "standard": "CISPR 25",
-        "description": "Measures the level of unintentional electromagnetic energy radiated from a device.",
-        "procedure": ["Place the device in a semi-anechoic chamber...", "Use a calibrated antenna to scan for RF emissions...", "Compare the measured emissions to the regulatory limits."],
-        "equipment": ["Anechoic Chamber", "Calibrated Antennas", "EMI Receiver"],
-        "image_url": ""
-    },
-    "endurance / life cycle test": {
-        "name": "Endurance / Life Cycle Test", "standard": "AEC-Q100/AEC-Q200",
-        "description": "Simulates the expected operational lifetime stresses to verify long-term reliability.",
-        "procedure": ["Subject the device to a large number of operational cycles...", "Run tests over an accelerated timeline...", "Analyze any failures to understand the root cause."],
-        "equipment": ["Environmental Chamber", "Power Cycling Equipment", "Data Loggers"],
-        "image_url": ""
-    },
-    "connector durability test": {
-        "name": "Connector Durability Test", "standard": "IEC 60512",
-        "description": "Evaluates the mechanical and electrical performance of connectors over repeated mating cycles.",
-        "procedure": ["Perform a specified number of mating and unmating cycles...", "Measure the low-level contact resistance (LLCR) during the test...", "Inspect contacts for wear and degradation."],
-        "equipment": ["Connector Cycling Machine", "Contact Resistance Meter", "Inspection Microscope"],
-        "image_url": ""
-    }
-}
+# === BACKGROUND VERIFICATION (jobs and results live in job_store.py) ===
+JOB_STATUS = {job_store.QUEUED: "Queued", job_store.RUNNING: "Running", job_store.DONE: "Verified", job_store.ERROR: "Error"}
 
-# === FULLY RESTORED AND EXPANDED COMPONENT DATABASE ===
-UNIFIED_COMPONENT_DB = {
-    # --- Detailed Components as requested ---
-    "ncp164csnadjt1g": {
-        "Manufacturer": "onsemi", "Product Category": "LDO Voltage Regulators", "RoHS": "Yes",
-        "Mounting Style": "SMD/SMT", "Package/Case": "TSOP-5", "Output Current": "300 mA",
-        "Number of Outputs": "1 Output", "Polarity": "Positive", "Quiescent Current": "30 uA",
-        "Input Voltage - Min": "1.6 V", "Input Voltage - Max": "5.5 V", "PSRR / Ripple Rejection - Typ": "85 dB",
-        "Output Type": "Adjustable", "Minimum Operating Temperature": "-40 C", "Maximum Operating Temperature": "+150 C",
-        "Series": "NCP164C", "Packaging": "Reel, Cut Tape, MouseReel", "Brand": "onsemi",
-        "Line Regulation": "0.5 mV/V", "Load Regulation": "2 mV/V", "Operating Temperature Range": "-40 C to +150 C",
-        "Output Voltage Range": "1.2 V to 4.5 V", "Product": "LDO Voltage Regulators",
-        "Product Type": "LDO Voltage Regulators", "Subcategory": "PMIC - Power Management ICs",
-        "Type": "Low Noise", "Voltage Regulation Accuracy": "2 %"
-    },
-    "spc560p50l3": {
-        "Manufacturer": "STMicroelectronics", "Product Category": "32-bit Microcontrollers - MCU", "RoHS": "Yes",
-        "Series": "SPC560P", "CPU Core": "PowerPC e200z0h", "Program Memory Size": "512 KB",
-        "Data Bus Width": "32 bit", "ADC Resolution": "10 bit", "Maximum Clock Frequency": "64 MHz",
-        "Number of I/Os": "64 I/O", "Data RAM Size": "48 KB", "Supply Voltage - Min": "4.5 V",
-        "Supply Voltage - Max": "5.5 V", "Minimum Operating Temperature": "-40 C", "Maximum Operating Temperature": "125 C",
-        "Package/Case": "LQFP-100", "Data RAM Type": "SRAM", "Interface Type": "CAN, LIN, SPI",
-        "Number of Timers/Counters": "8 Timer", "Processor Series": "MPC56xx", "Product": "MCUs",
-        "Program Memory Type": "Flash", "Qualification": "AEC-Q100"
-    },
-    "bq76952": {
-        "Manufacturer": "Texas Instruments", "Product Category": "Battery Management", "RoHS": "Yes",
-        "Product": "Monitors", "Number of Cells": "3 to 16", "Battery Type": "Li-Ion, Li-Polymer",
-        "Output Voltage": "5 V", "Output Current": "10 mA", "Interface Type": "I2C, SPI",
-        "Operating Supply Current": "15 uA", "Minimum Operating Temperature": "-40 C",
-        "Maximum Operating Temperature": "+85 C", "Package/Case": "TQFP-48", "Series": "BQ76952",
-        "Feature": "Cell Balancing, Protections", "Supply Voltage - Min": "4.5 V", "Supply Voltage - Max": "30 V",
-        "Voltage Regulation Accuracy": "10 mV", "Qualification": "AEC-Q100"
-    },
-    "tja1051t": {
-        "Manufacturer": "NXP", "Product Category": "CAN Interface IC", "RoHS": "Yes",
-        "Series": "TJA1051", "Transceiver Type": "High Speed CAN Transceiver", "Data Rate": "1 Mbps",
-        "Number of Drivers": "1 Driver", "Number of Receivers": "1 Receiver", "Duplex": "Half Duplex",
-        "Supply Voltage - Min": "4.5 V", "Supply Voltage - Max": "5.5 V", "Operating Supply Current": "70 mA",
-        "Minimum Operating Temperature": "-40 C", "Maximum Operating Temperature": "150 C",
-        "Package/Case": "SO-8", "Product": "CAN Transceivers", "Qualification": "AEC-Q100"
-    },
-    # --- The rest of the 120+ components in their complete, detailed format ---
-    "cga3e1x7r1e105k080ac": {"Manufacturer":"TDK", "Product Category":"Multilayer Ceramic Capacitors MLCC - SMD/SMT", "RoHS":"Yes", "Capacitance":"1 uF", "Voltage Rating DC":"25 VDC", "Dielectric":"X7R", "Tolerance":"10 %", "Case Code - in":"0603", "Case Code - mm":"1608", "Termination Style":"SMD/SMT", "Termination":"Standard", "Minimum Operating Temperature":"-55 C", "Maximum Operating Temperature":"+125 C", "Length":"1.6 mm", "Width":"0.8 mm", "Height":"0.8 mm", "Product":"Automotive MLCCs", "Qualification":"AEC-Q200"},
-    "tle4275g": {"Manufacturer": "Infineon", "Product Category": "LDO Regulator", "RoHS": "Yes", "Output Voltage": "5V", "Output Current": "450mA", "Package": "TO-252-3", "Minimum Operating Temperature": "-40 C", "Maximum Operating Temperature": "150 C", "Qualification": "AEC-Q100"},
-    "fsbb30ch60f": {"Manufacturer": "onsemi", "Product Category": "IGBT Module", "RoHS": "Yes", "Voltage Rating DC": "600V", "Current": "30A", "Package": "SPM27-CC", "Minimum Operating Temperature": "-40 C", "Maximum Operating Temperature": "150 C", "Product": "Smart Power Module"},
-    "wslp2512r0100fe": {"Manufacturer": "Vishay", "Product Category": "Resistor", "RoHS": "Yes", "Resistance": "10 mOhm", "Power": "1W", "Tolerance": "1%", "Case Code - in": "2512", "Minimum Operating Temperature": "-65 C", "Maximum Operating Temperature": "170 C", "Qualification": "AEC-Q200"},
-    "irfz44n": {"Manufacturer": "Infineon", "Product Category": "MOSFET", "RoHS": "Yes", "Vds": "55V", "Id": "49A", "Rds(on)": "17.5 mOhm", "Package": "TO-220AB", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "175 C"},
-    "1n4007": {"Manufacturer": "Multiple", "Product Category": "Diode", "RoHS": "Yes", "VRRM": "1000V", "If(AV)": "1A", "Package": "DO-41", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "150 C"},
-    "fh28-10s-0.5sh(05)": {"Manufacturer": "Hirose", "Product Category": "Connector", "RoHS": "Yes", "Pitch": "0.5mm", "Positions": "10", "Current": "0.5A", "Package": "FFC/FPC", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "105 C"},
-    "gcm155l81e104ke02d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "0.1uF", "Voltage Rating DC": "25V", "Dielectric": "X8L", "Case Code - mm": "1005", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "150 C", "Qualification": "AEC-Q200"},
-    "grt1555c1e220ja02j": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "22pF", "Voltage Rating DC": "25V", "Dielectric": "C0G", "Case Code - mm": "1005", "Tolerance": "5%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "grt155r61a475me13d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "4.7uF", "Voltage Rating DC": "10V", "Dielectric": "X5R", "Case Code - mm": "1005", "Tolerance": "20%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "85 C", "Qualification": "AEC-Q200"},
-    "grt31cr61a476ke13l": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "47uF", "Voltage Rating DC": "10V", "Dielectric": "X5R", "Case Code - mm": "3216", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "85 C", "Qualification": "AEC-Q200"},
-    "cga2b2c0g1h180j050ba": {"Manufacturer": "TDK", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "18pF", "Voltage Rating DC": "50V", "Dielectric": "C0G", "Case Code - mm": "1005", "Tolerance": "5%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "c0402c103k4racauto": {"Manufacturer": "KEMET", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "10nF", "Voltage Rating DC": "16V", "Dielectric": "X7R", "Case Code - mm": "1005", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "gcm1555c1h101ja16d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "100pF", "Voltage Rating DC": "50V", "Dielectric": "C0G", "Case Code - mm": "1005", "Tolerance": "5%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "grt155r71h104ke01d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "0.1uF", "Voltage Rating DC": "50V", "Dielectric": "X7R", "Case Code - mm": "1005", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "grt21br61e226me13l": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "22uF", "Voltage Rating DC": "25V", "Dielectric": "X5R", "Case Code - mm": "2012", "Tolerance": "20%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "85 C", "Qualification": "AEC-Q200"},
-    "grt1555c1h150fa02d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "15pF", "Voltage Rating DC": "50V", "Dielectric": "C0G", "Case Code - mm": "1005", "Tolerance": "1%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "c1210c226k8racauto": {"Manufacturer": "KEMET", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "22uF", "Voltage Rating DC": "10V", "Dielectric": "X7R", "Case Code - in": "1210", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "0402yc222j4t2a": {"Manufacturer": "AVX", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "2.2nF", "Voltage Rating DC": "16V", "Dielectric": "X7R", "Case Code - in": "0402", "Tolerance": "5%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "gcm1555c1h560fa16d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "56pF", "Voltage Rating DC": "50V", "Dielectric": "C0G", "Case Code - mm": "1005", "Tolerance": "1%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "grt1555c1h330fa02d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "33pF", "Voltage Rating DC": "50V", "Dielectric": "C0G", "Case Code - mm": "1005", "Tolerance": "1%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "grt188c81a106me13d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "10uF", "Voltage Rating DC": "10V", "Dielectric": "X6S", "Case Code - mm": "1608", "Tolerance": "20%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "105 C", "Qualification": "AEC-Q200"},
-    "umk212b7105kfna01": {"Manufacturer": "Taiyo Yuden", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "1uF", "Voltage Rating DC": "50V", "Dielectric": "X7R", "Case Code - in": "0805", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C"},
-    "c1206c104k5racauto": {"Manufacturer": "KEMET", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "0.1uF", "Voltage Rating DC": "50V", "Dielectric": "X7R", "Case Code - in": "1206", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "grt31cr61h106ke01k": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "10uF", "Voltage Rating DC": "50V", "Dielectric": "X5R", "Case Code - in": "1206", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "85 C", "Qualification": "AEC-Q200"},
-    "c0402c333k4racauto": {"Manufacturer": "KEMET", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "33nF", "Voltage Rating DC": "16V", "Dielectric": "X7R", "Case Code - in": "0402", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "cl10b474ko8vpnc": {"Manufacturer": "Samsung", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "0.47uF", "Voltage Rating DC": "16V", "Dielectric": "X7R", "Case Code - in": "0603", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C"},
-    "gcm155r71c224ke02d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "0.22uF", "Voltage Rating DC": "16V", "Dielectric": "X7R", "Case Code - mm": "1005", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "gcm155r71h102ka37j": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "1nF", "Voltage Rating DC": "50V", "Dielectric": "X7R", "Case Code - mm": "1005", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "50tpv330m10x10.5": {"Manufacturer": "Panasonic", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "330uF", "Voltage Rating DC": "50V", "Type": "Polymer", "ESR": "18 mOhm", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "105 C"},
-    "cl31b684kbhwpne": {"Manufacturer": "Samsung", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "0.68uF", "Voltage Rating DC": "50V", "Dielectric": "X7R", "Case Code - in": "1206", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C"},
-    "gcm155r71h272ka37d": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "2.7nF", "Voltage Rating DC": "50V", "Dielectric": "X7R", "Case Code - mm": "1005", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "edk476m050s9haa": {"Manufacturer": "KEMET", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "47uF", "Voltage Rating DC": "50V", "Type": "Aluminum Electrolytic", "ESR": "700 mOhm", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "105 C"},
-    "gcm155r71h332ka37j": {"Manufacturer": "Murata", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "3.3nF", "Voltage Rating DC": "50V", "Dielectric": "X7R", "Case Code - mm": "1005", "Tolerance": "10%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "a768ke336m1hlae042": {"Manufacturer": "KEMET", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "33uF", "Voltage Rating DC": "50V", "Type": "Polymer", "ESR": "42 mOhm", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "ac0402jrx7r9bb152": {"Manufacturer": "Yageo", "Product Category": "Capacitor", "RoHS": "Yes", "Capacitance": "1.5nF", "Voltage Rating DC": "50V", "Dielectric": "X7R", "Case Code - in": "0402", "Tolerance": "5%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "d5v0h1b2lpq-7b": {"Manufacturer": "Diodes Inc.", "Product Category": "TVS Diode", "RoHS": "Yes", "V Rwm": "5V", "Power": "30W", "Package": "X2-DFN1006-2", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "150 C"},
-    "szmmbz9v1alt3g": {"Manufacturer": "onsemi", "Product Category": "Zener Diode", "RoHS": "Yes", "Vz": "9.1V", "Power": "225mW", "Tolerance": "5%", "Package": "SOT-23", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "150 C"},
-    "mmbz5227blt3g": {"Manufacturer": "onsemi", "Product Category": "Zener Diode", "RoHS": "Yes", "Vz": "3.6V", "Power": "225mW", "Tolerance": "5%", "Package": "SOT-23", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "150 C"},
-    "d24v0s1u2tq-7": {"Manufacturer": "Diodes Inc.", "Product Category": "TVS Diode Array", "RoHS": "Yes", "V Rwm": "24V", "Channels": "1", "Package": "SOD-323", "Minimum Operating Temperature": "-65 C", "Maximum Operating Temperature": "150 C"},
-    "b340bq-13-f": {"Manufacturer": "Diodes Inc.", "Product Category": "Schottky Diode", "RoHS": "Yes", "VRRM": "40V", "If(AV)": "3A", "Package": "SMC", "Minimum Operating Temperature": "-65 C", "Maximum Operating Temperature": "150 C", "Qualification": "AEC-Q101"},
-    "tld8s22ah": {"Manufacturer": "Infineon", "Product Category": "TVS Diode", "RoHS": "Yes", "V Rwm": "22V", "Power": "8000W", "Package": "DO-218AB", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "175 C", "Qualification": "AEC-Q101"},
-    "b260aq-13-f": {"Manufacturer": "Diodes Inc.", "Product Category": "Schottky Diode", "RoHS": "Yes", "VRRM": "60V", "If(AV)": "2A", "Package": "SMB", "Minimum Operating Temperature": "-65 C", "Maximum Operating Temperature": "150 C", "Qualification": "AEC-Q101"},
-    "rb530sm-40fht2r": {"Manufacturer": "ROHM", "Product Category": "Schottky Diode", "RoHS": "Yes", "VRM": "40V", "IF": "30mA", "Package": "SOD-523", "Minimum Operating Temperature": "-40 C", "Maximum Operating Temperature": "125 C"},
-    "74279262": {"Manufacturer": "Würth Elektronik", "Product Category": "Ferrite Bead", "RoHS": "Yes", "Impedance @ 100MHz": "220 Ohm", "Current": "3A", "Package": "0805", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "742792641": {"Manufacturer": "Würth Elektronik", "Product Category": "Ferrite Bead", "RoHS": "Yes", "Impedance @ 100MHz": "1000 Ohm", "Current": "1.5A", "Package": "0805", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "voma617a-4x001t": {"Manufacturer": "Vishay", "Product Category": "Optocoupler", "RoHS": "Yes", "Type": "Transistor Output", "CTR": "100-200%", "Package": "SOP-4", "Isolation": "3750Vrms", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "110 C", "Qualification": "AEC-Q101"},
-    "744235510": {"Manufacturer": "Würth Elektronik", "Product Category": "Inductor", "RoHS": "Yes", "Inductance": "51uH", "Current": "1.8A", "Package": "Shielded SMD", "Minimum Operating Temperature": "-40 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "lqw15an56nj8zd": {"Manufacturer": "Murata", "Product Category": "Inductor", "RoHS": "Yes", "Inductance": "56nH", "Current": "350mA", "Case Code - in": "0402", "Tolerance": "5%", "Minimum Operating Temperature": "-55 C", "Maximum Operating Temperature": "125 C", "Qualification": "AEC-Q200"},
-    "ac0402fr-07100kl": {"Manufacturer": "Yageo", "Product Category": "Resistor", "RoHS": "Yes", "Resistance": "100 kOhm", "Power": "0.063W", "Tolerance": "1%", "Case Code - in": "0402", "Qualification": "AEC-Q200"},
-    "erj-2rkf1002x": {"Manufacturer": "Panasonic", "Product Category": "Resistor", "RoHS": "Yes", "Resistance": "10 kOhm", "Power": "0.1W", "Tolerance": "1%", "Case Code - in": "0402", "Qualification": "AEC-Q200"},
-    "rc0603fr-0759rl": {"Manufacturer": "Yageo", "Product Category": "Resistor", "RoHS": "Yes", "Resistance": "59 Ohm", "Power": "0.1W", "Tolerance": "1%", "Case Code - in": "0603", "Qualification": "AEC-Q200"},
-    "ltr18ezpfsr015": {"Manufacturer": "ROHM", "Product Category": "Resistor", "RoHS": "Yes", "Resistance": "15 mOhm", "Power": "1.5W", "Tolerance": "1%", "Case Code - in": "1206", "Qualification": "AEC-Q200"},
-    "zldo1117qg33ta": {"Manufacturer": "Diodes Inc.", "Product Category": "LDO Regulator", "RoHS": "Yes", "Output Voltage": "3.3V", "Output Current": "1A", "Package": "SOT-223", "Qualification": "AEC-Q100"},
-    "ap63357qzv-7": {"Manufacturer": "Diodes Inc.", "Product Category": "Buck Converter", "RoHS": "Yes", "Input Voltage": "3.8V-32V", "Output Current": "3.5A", "Package": "SOT-563", "Qualification": "AEC-Q100"},
-    "pca9306idcurq1": {"Manufacturer": "Texas Instruments", "Product Category": "I2C Translator", "RoHS": "Yes", "Channels": "2", "Voltage Range": "1V-5.5V", "Package": "VSSOP-8", "Qualification": "AEC-Q100"},
-    "mcp2518fdt-e/sl": {"Manufacturer": "Microchip", "Product Category": "CAN FD Controller", "RoHS": "Yes", "Data Rate": "8 Mbps", "Interface": "SPI", "Package": "SOIC-14", "Qualification": "AEC-Q100"},
-    "iso1042bqdwvq1": {"Manufacturer": "Texas Instruments", "Product Category": "CAN Transceiver", "RoHS": "Yes", "Product": "Isolated", "Data Rate": "5 Mbps", "Package": "SOIC-16", "Qualification": "AEC-Q100"},
-    "pesd2canfd27v-tr": {"Manufacturer": "Nexperia", "Product Category": "ESD Suppressor", "RoHS": "Yes", "Bus Type": "CAN", "V Rwm": "27V", "Package": "SOT-23", "Qualification": "AEC-Q101"},
-    "tlv9001qdckrq1": {"Manufacturer": "Texas Instruments", "Product Category": "Op-Amp", "RoHS": "Yes", "Channels": "1", "GBW": "1MHz", "Package": "SC-70", "Qualification": "AEC-Q100"},
-    "attiny1616-szt-vao": {"Manufacturer": "Microchip", "Product Category": "MCU", "RoHS": "Yes", "CPU Core": "AVR", "Frequency": "20MHz", "RAM Size": "2KB", "Flash Size": "16KB", "Package": "SOIC-24", "Qualification": "AEC-Q100"},
-    "iam-20680ht": {"Manufacturer": "TDK InvenSense", "Product Category": "IMU", "RoHS": "Yes", "Axes": "6", "Interface": "SPI, I2C", "Package": "LGA-16", "Qualification": "AEC-Q100"}
-}
+def submit_uploads(uploaded_files):
+    # The batch id goes into the URL as well, so a reloaded or reopened tab finds its results.
+    with tracing.span("verify_upload", files=len(uploaded_files)):
+        try:
+            with tracing.span("upload.read"): files = [(f.name, f.getvalue()) for f in uploaded_files]
+            batch = job_store.get_queue().submit(files, st.session_state.session_id)
+        except ValueError as e:
+            st.query_params.pop("job", None); st.warning(str(e)); return None
+        except Exception as e:
+            st.query_params.pop("job", None); st.error(f"Error reading upload: {e}"); return None
+    st.query_params["job"] = batch
+    return batch
 
-# === UPGRADED PARSING LOGIC FOR BATTERY REPORTS ===
-def parse_battery_profile(df):
-    try:
-        header_row_index = -1
-        for i, row in df.iterrows():
-            row_values = [str(v).upper() for v in row.values]
-            if 'TIME' in row_values and 'VOLTAGE' in row_values:
-                header_row_index = i
-                df.columns = [str(c).strip().upper() if c else "" for c in df.iloc[i]]
-                break
-        
-        if header_row_index == -1: return None
-        df = df.iloc[header_row_index + 1:].reset_index(drop=True)
-        time_col = next((c for c in df.columns if 'TIME' in c), None); volt_col = next((c for c in df.columns if 'VOLTAGE' in c), None)
-        curr_col = next((c for c in df.columns if 'CURRENT' in c), None); ah_col = next((c for c in df.columns if 'AH' in c), None)
-        if not all([time_col, volt_col, curr_col, ah_col]): return None
-        for col in [volt_col, curr_col, ah_col]: df[col] = pd.to_numeric(df[col], errors='coerce')
-        df = df.dropna(subset=[volt_col, curr_col, ah_col])
-        if df.empty: return None
-        return {"TestName": "Battery Charge/Discharge Profile", "Result": "Data Extracted",
-            "Details": { "Total Duration": df[time_col].iloc[-1], "Starting Voltage (V)": f"{df[volt_col].iloc[0]:.2f}",
-                "Ending Voltage (V)": f"{df[volt_col].iloc[-1]:.2f}", "Max Current (A)": f"{df[curr_col].abs().max():.2f}",
-                "Total Capacity (Ah)": f"{df[ah_col].iloc[-1]:.2f}"}}
-    except Exception: return None
+@st.fragment(run_every=1.0)
+def display_job_progress(batch):
+    # Polls the job store while files are pending; finished files show up as they complete.
+    jobs = job_store.get_queue().batch(batch)
+    if not any(j.status in job_store.PENDING for j in jobs): st.rerun()
+    done = sum(j.status not in job_store.PENDING for j in jobs)
+    st.progress(done / len(jobs), text=f"Verified {done}/{len(jobs)} file(s) in the background. "
+        "You can use other pages or close this tab; reopen this page's link to pick up the results.")
+    st.dataframe(pd.DataFrame([{"File": j.name, "Status": "No test data" if j.status == job_store.DONE and not j.results else JOB_STATUS[j.status],
+        "Progress": j.progress, "Tests Found": len(j.results), "Error": j.error or ""} for j in jobs]), hide_index=True,
+        column_config={"Progress": st.column_config.ProgressColumn("Progress", min_value=0.0, max_value=1.0)})
+    partial = [{"File": j.name, "Test": t.get("TestName", "N/A"), "Result": t.get("Result", "")} for j in jobs for t in j.results]
+    if partial:
+        with st.expander(f"Results so far ({len(partial)} test result(s))", expanded=True): st.dataframe(pd.DataFrame(partial), hide_index=True)
 
-def parse_report(uploaded_file):
-    try:
-        file_extension = os.path.splitext(uploaded_file.name.lower())[1]
-        if file_extension in ['.csv', '.xlsx']:
-            df = pd.read_csv(uploaded_file, header=None) if file_extension == '.csv' else pd.read_excel(uploaded_file, header=None)
-            battery_data = parse_battery_profile(df.copy());
-            if battery_data: return [battery_data]
-        uploaded_file.seek(0)
-        if file_extension == '.pdf':
-            with pdfplumber.open(uploaded_file) as pdf: content = "".join(page.extract_text() for page in pdf.pages if page.extract_text())
-        else: content = uploaded_file.getvalue().decode('utf-8', errors='ignore')
-        if "test summary" in content.lower(): return [{"TestName": "Generic Test Report", "Result": "PASS"}]
-        return []
-    except Exception as e:
-        st.error(f"Error parsing file: {e}"); return []
+def log_history(record_fn, *args):
+    # History is best effort; a locked or read-only store must not break the page.
+    try: record_fn(st.session_state.session_id, *args)
+    except Exception as e: st.warning(f"Could not record activity history: {e}")
 
 def display_test_card(test_case, color):
     test_name = test_case.get('TestName', 'N/A'); details_html = f"<b>🧪 Test:</b> {test_name}<br>"
     if "Details" in test_case:
+        result = test_case.get('Result')
+        if result in ('PASS', 'FAIL'): details_html += f"<b>📊 Result:</b> <span class='result-{result.lower()}'>{result}</span><br>"
         for key, value in test_case["Details"].items(): details_html += f"<b>{key}:</b> {value}<br>"
     else:
         for key, label in {'Standard': '📘 Standard', 'Result': '📊 Result'}.items():
             if test_case.get(key): details_html += f"<b>{label}:</b> {test_case.get(key)}<br>"
     st.markdown(f"<div class='card' style='border-left-color:{color};'>{details_html}</div>", unsafe_allow_html=True)
 
+def display_battery_analysis(record, key):
+    # Cycle table and downsampled traces produced by compliance_core.battery_analytics.
+    cycles = pd.DataFrame(record.get("Cycles") or [])
+    if len(cycles) > 1:
+        c1, c2 = st.columns(2)
+        c1.markdown("**Capacity Fade**"); c1.line_chart(cycles, x="Cycle", y=["Charge Capacity (Ah)", "Discharge Capacity (Ah)"])
+        c2.markdown("**Coulombic Efficiency**"); c2.line_chart(cycles, x="Cycle", y="Coulombic Efficiency (%)")
+    if not cycles.empty:
+        with st.expander(f"Per-cycle results ({len(cycles)} cycle(s))"):
+            st.dataframe(cycles.round(4), hide_index=True)
+            st.download_button("Download cycle table (CSV)", cycles.to_csv(index=False).encode("utf-8"),
+                file_name=f"{os.path.splitext(key)[0]}_cycles.csv", mime="text/csv", key=f"cycles-{key}")
+    trace = record.get("Trace") or {}
+    if trace:
+        columns = st.columns(len(trace))
+        for column, (name, points) in zip(columns, trace.items()):
+            frame = pd.DataFrame(points)
+            column.markdown(f"**{name}**"); column.line_chart(frame, x=frame.columns[0], y=name)
+
+def display_limit_checks(outcomes):
+    # Extracted measurements against the standards' limits (data/limits.json; see limits.py).
+    try: checks = limits.check_reports((name, results) for name, results, _ in outcomes)
+    except Exception as e:
+        st.warning(f"Limits catalogue is unavailable: {e}"); return
+    if checks.empty: return
+    summary = limits.summarize(checks)
+    st.markdown("#### Compliance Against Standard Limits")
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Requirements Checked", summary["requirements"]); m2.metric("Pass", summary["pass"])
+    m3.metric("Fail", summary["fail"]); m4.metric("Not Measured", summary["not_measured"])
+    with tracing.span("render.limit_checks", rows=len(checks)):
+        st.dataframe(checks if len(outcomes) > 1 else checks.drop(columns="File"), hide_index=True)
+    st.download_button("Download limit checks (CSV)", checks.to_csv(index=False).encode("utf-8"),
+        file_name="limit_checks.csv", mime="text/csv", key="limit-checks")
+
+# === Search Indexes & BOM Catalog (built once per server process) ===
+@st.cache_resource
+def get_component_index():
+    return ComponentIndex(knowledge_store.components())
+
+@st.cache_resource
+def get_component_catalog():
+    return bom_check.build_catalog(knowledge_store.components())
+
+@st.cache_resource
+def get_requirement_index():
+    return RequirementIndex(knowledge_store.test_cases())
+
 # ---- Streamlit App Layout ----
-option = st.sidebar.radio("Navigate", ("Component Information", "Test Requirement Generation", "Test Report Verification", "Dashboard & Analytics"))
+PAGES = ("Component Information", "Test Requirement Generation", "Test Report Verification", "Dashboard & Analytics")
+# Diagnostics is hidden unless the URL carries ?diagnostics=1 or COMPLIANCE_DIAGNOSTICS=1 is set.
+if st.query_params.get("diagnostics") == "1" or os.environ.get("COMPLIANCE_DIAGNOSTICS") == "1": PAGES += ("Diagnostics",)
+option = st.sidebar.radio("Navigate", PAGES)
 st.sidebar.info("An integrated tool for automotive compliance.")
 
 # --- Component Information Module ---
 if option == "Component Information":
     st.subheader("Key Component Information", anchor=False)
-    part_q = st.text_input("Quick Lookup (part number)", placeholder="e.g., ncp164csnadjt1g").lower().strip()
-    if st.button("Find Component") and part_q:
-        result = UNIFIED_COMPONENT_DB.get(part_q)
-        if result: st.session_state.found_component, st.session_state.searched_part, _ = result, part_q, st.success(f"Found: {part_q.upper()}.")
-        else: st.session_state.found_component, _ = None, st.warning("Part number not found.")
-    if st.session_state.get('found_component'):
-        st.markdown(f"### Details for: {st.session_state.searched_part.upper()}"); st.markdown("---")
-        data_items = list(st.session_state.found_component.items())
-        col1, col2 = st.columns(2); midpoint = (len(data_items) + 1) // 2
-        with col1:
-            for i, (k, v) in enumerate(data_items[:midpoint]):
-                st.markdown(f"<div class='attr-item'><span>{i+1}. </span><strong>{k.replace('_', ' ').title()}:</strong> {v}</div>", unsafe_allow_html=True)
-        with col2:
-            for i, (k, v) in enumerate(data_items[midpoint:], start=midpoint):
-                st.markdown(f"<div class='attr-item'><span>{i+1}. </span><strong>{k.replace('_', ' ').title()}:</strong> {v}</div>", unsafe_allow_html=True)
+    mode = st.radio("Mode", ("Single part lookup", "BOM upload"), horizontal=True, label_visibility="collapsed")
+    if mode == "Single part lookup":
+        index = get_component_index()
+        part_q = st.text_input("Quick Lookup (part number, prefix or approximate)", placeholder="e.g., ncp164csnadjt1g").lower().strip()
+        f1, f2, f3 = st.columns(3)
+        filters = {"Manufacturer": f1.multiselect("Manufacturer", index.values("Manufacturer")),
+            "Product Category": f2.multiselect("Product Category", index.values("Product Category")),
+            "Qualification": f3.multiselect("Qualification", index.values("Qualification"))}
+        if st.button("Find Component") and (part_q or any(filters.values())):
+            st.session_state.component_hits = index.search(part_q, filters=filters, limit=25)
+            if st.session_state.component_hits: st.success(f"Found {len(st.session_state.component_hits)} matching part(s).")
+            else: st.session_state.found_component, _ = None, st.warning("Part number not found.")
+        hits = st.session_state.get('component_hits') or []
+        if hits:
+            db = knowledge_store.components()
+            st.dataframe(pd.DataFrame([{"Part Number": h.part.upper(), "Manufacturer": db[h.part].get("Manufacturer", ""),
+                "Product Category": db[h.part].get("Product Category", ""), "Match": h.match, "Score": round(h.score, 2)} for h in hits]),
+                hide_index=True)
+            picked = st.selectbox("Show details for", [h.part for h in hits], format_func=str.upper)
+            st.session_state.found_component, st.session_state.searched_part = db[picked], picked
+        if st.session_state.get('found_component'):
+            st.markdown(f"### Details for: {st.session_state.searched_part.upper()}"); st.markdown("---")
+            data_items = list(st.session_state.found_component.items())
+            col1, col2 = st.columns(2); midpoint = (len(data_items) + 1) // 2
+            with col1:
+                for i, (k, v) in enumerate(data_items[:midpoint]):
+                    st.markdown(f"<div class='attr-item'><span>{i+1}. </span><strong>{k.replace('_', ' ').title()}:</strong> {v}</div>", unsafe_allow_html=True)
+            with col2:
+                for i, (k, v) in enumerate(data_items[midpoint:], start=midpoint):
+                    st.markdown(f"<div class='attr-item'><span>{i+1}. </span><strong>{k.replace('_', ' ').title()}:</strong> {v}</div>", unsafe_allow_html=True)
+    else:
+        st.caption("Upload a BOM (CSV, XLSX) to check every line for database presence, RoHS, AEC-Q qualification and temperature range.")
+        bom_file = st.file_uploader("Upload a BOM file", type=["csv", "xlsx"])
+        t1, t2 = st.columns(2)
+        temp_range = (t1.number_input("Required min. temperature (°C)", value=-40.0), t2.number_input("Required max. temperature (°C)", value=125.0))
+        if bom_file:
+            try:
+                bom = bom_check.read_bom(bom_file.name, bom_file.getvalue())
+                part_col = st.selectbox("Part number column", list(bom.columns), index=list(bom.columns).index(bom_check.find_part_column(bom.columns) or bom.columns[0]))
+                result = bom_check.check_bom(bom, get_component_catalog(), part_column=part_col, temp_range=temp_range)
+            except Exception as e:
+                st.error(f"Error checking BOM: {e}"); result = None
+            if result is not None:
+                if st.session_state.get("last_checked_bom") != bom_file.file_id:
+                    st.session_state.last_checked_bom = bom_file.file_id
+                    log_history(history_store.record_bom_check, bom_file.name, result)
+                summary = bom_check.summarize(result)
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("BOM Lines", summary["lines"]); m2.metric("Pass", summary["pass"])
+                m3.metric("Review", summary["review"]); m4.metric("Fail", summary["fail"])
+                show = st.radio("Show", ("All", "FAIL", "REVIEW", "PASS"), horizontal=True)
+                st.dataframe(result if show == "All" else result[result["Status"] == show], hide_index=True)
+                st.download_button("Download BOM compliance report (CSV)", result.to_csv(index=False).encode("utf-8"),
+                    file_name=f"{os.path.splitext(bom_file.name)[0]}_compliance.csv", mime="text/csv")
 
 # --- Test Requirement Generation Module ---
 elif option == "Test Requirement Generation":
@@ -455,42 +228,160 @@ elif option == "Test Requirement Generation":
     text_input = st.text_input("Enter a test case keyword", placeholder="Try: 'vibration', 'esd', 'salt spray'...")
     if st.button("Generate Requirements") and text_input.strip():
         user_case = text_input.strip().lower()
-        matched_test = next((data for key, data in TEST_CASE_KNOWLEDGE_BASE.items() if user_case in key.lower()), None)
-        if matched_test:
-            st.markdown(f"#### Generated Procedure for: **{matched_test.get('name', 'N/A')}**")
-            with st.container():
-                st.markdown("<div class='card'>", unsafe_allow_html=True)
-                if matched_test.get("image_url"):
-                    st.image(matched_test["image_url"], caption=f"Test Setup for {matched_test.get('name')}")
-                st.markdown(f"**Standard:** {matched_test.get('standard', 'N/A')}<br>**Description:** {matched_test.get('description', 'N/A')}", unsafe_allow_html=True)
-                st.markdown("**Test Procedure:**")
-                for step in matched_test.get('procedure', []):
-                    st.markdown(f"- {step}")
-                st.markdown("**Required Equipment:**")
-                for item in matched_test.get('equipment', []):
-                    st.markdown(f"- {item}")
-                st.markdown("</div>", unsafe_allow_html=True)
+        st.session_state.requirement_hits, st.session_state.requirement_query = get_requirement_index().search(user_case, limit=10), user_case
+        if st.session_state.requirement_hits:
+            st.session_state.requirements_generated += 1
+            log_history(history_store.record_generation, user_case, st.session_state.requirement_hits[0].key)
         else: st.warning(f"No detailed procedure found for '{user_case}'.")
+    hits = st.session_state.get('requirement_hits') or []
+    if hits:
+        kb = knowledge_store.test_cases()
+        picked = st.radio(f"Ranked matches for '{st.session_state.requirement_query}'", [h.key for h in hits],
+            format_func=lambda k: f"{kb[k].get('name', k)}  ·  {kb[k].get('standard', '')}")
+        matched_test = kb[picked]
+        st.markdown(f"#### Generated Procedure for: **{matched_test.get('name', 'N/A')}**")
+        with st.container():
+            st.markdown("<div class='card'>", unsafe_allow_html=True)
+            if matched_test.get("image_url"):
+                # Served from the local asset cache only; never hot-linked.
+                setup_image = asset_cache.thumbnail_path(matched_test["image_url"])
+                if setup_image: st.image(setup_image, caption=f"Test Setup for {matched_test.get('name')}")
+                else: st.caption("🖼️ Test setup image is not available offline (run `compliance-check assets fetch` to bundle it).")
+            st.markdown(f"**Standard:** {matched_test.get('standard', 'N/A')}<br>**Description:** {matched_test.get('description', 'N/A')}", unsafe_allow_html=True)
+            st.markdown("**Test Procedure:**")
+            for step in matched_test.get('procedure', []):
+                st.markdown(f"- {step}")
+            st.markdown("**Required Equipment:**")
+            for item in matched_test.get('equipment', []):
+                st.markdown(f"- {item}")
+            st.markdown("</div>", unsafe_allow_html=True)
 
 # --- Test Report Verification Module ---
 elif option == "Test Report Verification":
     st.subheader("Upload & Verify Test Report", anchor=False)
-    st.caption("Upload reports (PDF, TXT, CSV, XLSX) to extract test data, including battery profiles.")
-    uploaded_file = st.file_uploader("Upload a report file", type=["pdf", "docx", "xlsx", "csv", "txt"])
-    if uploaded_file:
-        parsed_data = parse_report(uploaded_file)
-        if parsed_data:
-            st.session_state.reports_verified += 1
-            st.markdown(f"### Found {len(parsed_data)} Test Summary in the report.")
-            for t in parsed_data:
-                display_test_card(t, '#0056b3')
-        else: st.warning("No recognizable test data or battery profile was extracted from the uploaded file.")
+    st.caption("Upload reports (PDF, DOCX, TXT, CSV, XLSX) or ZIP bundles of them to extract test data, including battery profiles.")
+    uploaded_files = st.file_uploader("Upload report files", type=["pdf", "docx", "xlsx", "csv", "txt", "zip"], accept_multiple_files=True)
+    upload_key = tuple(f.file_id for f in uploaded_files or ())
+    if upload_key and st.session_state.get("submitted_upload") != upload_key:
+        st.session_state.submitted_upload, st.session_state.verify_batch = upload_key, submit_uploads(uploaded_files)
+    elif not upload_key and st.session_state.get("submitted_upload"):
+        st.session_state.submitted_upload = st.session_state.verify_batch = None; st.query_params.pop("job", None)
+    batch = st.session_state.get("verify_batch") or st.query_params.get("job")
+    jobs = job_store.get_queue().batch(batch) if batch else []
+    if batch and not jobs: st.warning("These verification results have expired; upload the files again.")
+    elif any(j.status in job_store.PENDING for j in jobs): display_job_progress(batch)
+    elif jobs:
+        outcomes = job_store.outcomes(jobs)
+        if st.session_state.get("last_verified_batch") != batch:
+            st.session_state.reports_verified += sum(1 for _, results, _ in outcomes if results)
+            st.session_state.last_verified_batch = batch
+        for name, _, error in outcomes:
+            if error: st.error(f"Error parsing {name}: {error}")
+        if len(outcomes) == 1:
+            parsed_data = outcomes[0][1]
+            if parsed_data:
+                st.markdown(f"### Found {len(parsed_data)} Test Summary in the report.")
+                with tracing.span("render.test_cards", cards=len(parsed_data)):
+                    for t in parsed_data:
+                        display_test_card(t, '#0056b3')
+                        if "Cycles" in t:
+                            with tracing.span("render.battery_analysis"): display_battery_analysis(t, outcomes[0][0])
+            elif not outcomes[0][2]: st.warning("No recognizable test data or battery profile was extracted from the uploaded file.")
+            display_limit_checks(outcomes)
+        elif outcomes:
+            rows = [{"File": name, "Test": t.get("TestName", "N/A"), "Result": t.get("Result", ""),
+                "Details": "; ".join(f"{k}: {v}" for k, v in t.get("Details", {}).items())}
+                for name, results, _ in outcomes for t in results]
+            verified = sum(1 for _, results, _ in outcomes if results)
+            st.markdown(f"### Verified {verified} of {len(outcomes)} files, {len(rows)} test result(s) found.")
+            if rows:
+                with tracing.span("render.results_table", rows=len(rows)):
+                    results_df = pd.DataFrame(rows)
+                    st.dataframe(results_df, hide_index=True)
+                st.download_button("Download verification table (CSV)", results_df.to_csv(index=False).encode("utf-8"),
+                    file_name="verification_results.csv", mime="text/csv")
+            missing = [name for name, results, error in outcomes if not results and not error]
+            if missing:
+                with st.expander(f"{len(missing)} file(s) with no recognizable test data"):
+                    for name in missing: st.markdown(f"- {name}")
+            display_limit_checks(outcomes)
 
 # --- Dashboard & Analytics Module ---
 elif option == "Dashboard & Analytics":
     st.subheader("Dashboard & Analytics", anchor=False)
-    st.caption("High-level view of session activities.")
+    st.caption("This session, plus all-time activity across every user from the shared history store.")
     c1, c2, c3 = st.columns(3)
-    c1.metric("Reports Verified", st.session_state.get("reports_verified", 0))
-    c2.metric("Requirements Generated", st.session_state.get("requirements_generated", 0))
-    c3.metric("Components in DB", len(UNIFIED_COMPONENT_DB))
+    c1.metric("Reports Verified (session)", st.session_state.get("reports_verified", 0))
+    c2.metric("Requirements Generated (session)", st.session_state.get("requirements_generated", 0))
+    c3.metric("Components in DB", len(knowledge_store.components()))
+    try:
+        totals = history_store.totals()
+        daily, test_types, components = history_store.daily(30), history_store.by_test_type(), history_store.by_component()
+    except Exception as e:
+        st.warning(f"Activity history is unavailable: {e}"); totals = None
+    if totals is not None:
+        st.markdown("#### All-Time Activity")
+        reports, tests = totals.get(history_store.REPORT, {}), totals.get(history_store.TEST, {})
+        decided = tests.get("passed", 0) + tests.get("failed", 0)
+        a1, a2, a3, a4 = st.columns(4)
+        a1.metric("Reports Verified", reports.get("passed", 0), help=f"{reports.get('events', 0)} files uploaded in total")
+        a2.metric("Requirements Generated", totals.get(history_store.GENERATION, {}).get("events", 0))
+        a3.metric("Tests Extracted", tests.get("events", 0))
+        a4.metric("Test Pass Rate", f"{100 * tests.get('passed', 0) / decided:.1f}%" if decided else "—")
+        if daily:
+            per_day = pd.DataFrame(daily, columns=["Day", "Kind", "Events", "Passed", "Failed"]).pivot_table(
+                index="Day", columns="Kind", values="Events", aggfunc="sum", fill_value=0)
+            st.markdown("**Activity per day (last 30 days)**"); st.bar_chart(per_day)
+        d1, d2 = st.columns(2)
+        if test_types:
+            by_type = pd.DataFrame(test_types, columns=["Test Type", "Results", "Pass", "Fail"])
+            by_type["Pass Rate (%)"] = (100 * by_type["Pass"] / (by_type["Pass"] + by_type["Fail"]).where(lambda x: x > 0)).round(1)
+            d1.markdown("**Results by test type**"); d1.dataframe(by_type, hide_index=True)
+        if components:
+            d2.markdown("**Components with most BOM failures**")
+            d2.dataframe(pd.DataFrame(components, columns=["Component", "Checks", "Pass", "Review", "Fail"]), hide_index=True)
+
+# --- Diagnostics (hidden) ---
+elif option == "Diagnostics":
+    st.subheader("Diagnostics", anchor=False)
+    st.caption("Per-stage spans recorded by compliance_core.tracing in this server process (most recent runs only).")
+    spans, export = tracing.recent_spans(), tracing.export_status()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Spans Recorded", len(spans)); m2.metric("Current RSS (MB)", f"{tracing.current_rss_mb():.0f}")
+    m3.metric("Peak RSS (MB)", f"{max((s.peak_rss_mb for s in spans), default=0):.0f}")
+    m4.metric("Span Export", f"{export['exported']} sent" if export else "Off",
+        help=f"{export['target']}: {export['dropped']} dropped{', last error: ' + export['last_error'] if export['last_error'] else ''}" if export
+        else "Set COMPLIANCE_TRACE_EXPORT to a file path or an OTLP/HTTP collector URL.")
+    if st.button("Clear recorded spans"):
+        tracing.clear(); st.rerun()
+    batches = job_store.get_queue().recent_batches()
+    if batches:
+        st.markdown("**Background verification batches**")
+        st.dataframe(pd.DataFrame([{"Batch": b, "Submitted": pd.Timestamp(created, unit="s", tz="UTC").tz_convert(None).strftime("%Y-%m-%d %H:%M:%S"),
+            "Files": files, "Finished": finished} for b, created, files, finished in batches]), hide_index=True)
+    if not spans: st.info("No spans recorded yet. Verify a report or run a search, then come back.")
+    else:
+        stats = pd.DataFrame(tracing.stage_stats(spans))
+        st.markdown("**Latency and memory by stage**"); st.dataframe(stats, hide_index=True)
+        h1, h2 = st.columns(2)
+        names = list(stats["Stage"])
+        stage = h1.selectbox("Latency histogram for", names, index=names.index("parse_report") if "parse_report" in names else 0)
+        edges, counts = tracing.histogram(stage, spans)
+        h1.bar_chart(pd.DataFrame({"Up to (ms)": [float(f"{e:.3g}") for e in edges], "Calls": counts}), x="Up to (ms)", y="Calls")
+        caches = [{"Cache": name, "Hits": hits, "Misses": misses, "Hit Rate (%)": round(100 * hits / (hits + misses), 1) if hits + misses else None}
+            for name, (hits, misses) in tracing.cache_stats().items()]
+        h2.markdown("**Cache hit rates**"); h2.dataframe(pd.DataFrame(caches), hide_index=True)
+        runs = tracing.runs(spans)[:50]
+        st.markdown("**Recent runs**")
+        st.dataframe(pd.DataFrame([{"Started": pd.Timestamp(r.start_ns, unit="ns", tz="UTC").tz_convert(None).strftime("%H:%M:%S"),
+            "Run": r.name, "File": r.attrs.get("file", ""), "Duration (ms)": round(r.duration_ns / 1e6, 1), "Peak RSS (MB)": r.peak_rss_mb,
+            "RSS Growth (MB)": r.rss_growth_mb, "Error": r.error or ""} for r in runs]), hide_index=True)
+        picked = st.selectbox("Stage breakdown for run", range(len(runs)),
+            format_func=lambda i: f"{runs[i].name} {runs[i].attrs.get('file', '')} ({runs[i].duration_ns / 1e6:.1f} ms)")
+        if picked is not None:
+            members = tracing.trace(runs[picked].trace_id, spans)
+            depth = {runs[picked].span_id: 0}
+            for s in members:
+                if s.span_id not in depth: depth[s.span_id] = depth.get(s.parent_id, 0) + 1
+            st.dataframe(pd.DataFrame([{"Stage": "\u2003" * depth[s.span_id] + s.name, "Offset (ms)": round((s.start_ns - runs[picked].start_ns) / 1e6, 1),
+                "Duration (ms)": round(s.duration_ns / 1e6, 2), "RSS Growth (MB)": s.rss_growth_mb, "Error": s.error or ""} for s in members]), hide_index=True)
@@ -0,0 +1,78 @@
+# bench_battery_analytics.py
+# Cycle analysis and plot downsampling on synthetic long-term cycling logs.
+# Arrays are fed in the parser's CHUNK_ROWS batches, so the numbers exclude CSV/XLSX decoding.
+#   python benchmarks/bench_battery_analytics.py --samples 1000000 10000000
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compliance_core.battery_analytics import PLOT_POINTS, CycleAnalyzer, lttb  # noqa: E402
+from compliance_core.report_parser import CHUNK_ROWS, parse_report  # noqa: E402
+
+def synthetic_log(samples, dt=1.0, cycle_samples=8000, seed=0):
+    # CC charge, rest, CC discharge, rest; voltage follows charge state with a little noise.
+    rng = np.random.default_rng(seed)
+    phase = (np.arange(samples) % cycle_samples) / cycle_samples
+    current = np.select([phase < 0.45, phase < 0.5, phase < 0.95], [1.0, 0.0, -1.0], 0.0)
+    soc = np.clip(np.where(phase < 0.5, phase / 0.45, (0.95 - phase) / 0.45), 0, 1)
+    voltage = 3.0 + 1.2 * soc + 0.05 * current + rng.normal(0, 0.002, samples)
+    return np.arange(samples) * dt, voltage, current
+
+def check_csv_layouts(rows=400):
+    # Regression check: the streamed CSV read must cope with a preamble wider than the data,
+    # unused columns after the last one used (Maccor puts ES after State) and trailing delimiters.
+    t, v, i = synthetic_log(rows, cycle_samples=100)
+    data = [f"{k},{t[k]:.0f},{v[k]:.4f},{i[k]:.3f},{k * 0.01:.2f}" for k in range(rows)]
+    state = lambda k: "C" if i[k] > 0 else "D" if i[k] < 0 else "R"
+    layouts = {
+        "wider preamble": "Cycler export,synthetic,,,,,,,\nIndex,Time,Voltage,Current,Ah\n" + "\n".join(data),
+        "trailing columns": "Index,Time,Voltage,Current,Ah,Temperature\n" + "\n".join(f"{d},25.0" for d in data),
+        "trailing delimiter": "Index,Time,Voltage,Current,Ah,\n" + "\n".join(f"{d}," for d in data),
+        "maccor": "Rec#,Cyc#,Test (Sec),Amps,Volts,Amp-hr,State,ES\n" + "\n".join(
+            f"{k},1,{t[k]:.0f},{abs(i[k]):.3f},{v[k]:.4f},{k * 0.01:.2f},{state(k)},0" for k in range(rows)),
+    }
+    for name, text in layouts.items():
+        records = parse_report(f"{name}.csv", text.encode())
+        assert records and records[0].get("Cycles"), f"{name}: no battery profile extracted"
+
+def check_low_current_start(cycles=20, cycle_samples=8000):
+    # Regression check: a log opening with a long rest (with sensor noise) must not shift the
+    # charge/discharge threshold, so later rest noise is not counted as charge or discharge.
+    rng = np.random.default_rng(1)
+    t, v, i = synthetic_log(cycles * cycle_samples, cycle_samples=cycle_samples)
+    i = np.concatenate((np.zeros(CHUNK_ROWS), i)) + rng.normal(0, 0.0005, CHUNK_ROWS + len(i))
+    v, t = np.concatenate((np.full(CHUNK_ROWS, v[0]), v)), np.arange(len(i), dtype=float)
+    analyzer = CycleAnalyzer()
+    for s in range(0, len(i), CHUNK_ROWS):
+        analyzer.update(t[s:s + CHUNK_ROWS], v[s:s + CHUNK_ROWS], i[s:s + CHUNK_ROWS])
+    ce = analyzer.result().cycles["Coulombic Efficiency (%)"].to_numpy()
+    assert len(ce) == cycles and np.allclose(ce, 100, atol=0.5), f"rest noise counted: {len(ce)} cycles, CE {ce.min():.1f}-{ce.max():.1f}%"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = ap.parse_args()
+    check_csv_layouts()
+    check_low_current_start()
+    print(f"{'samples':>11}{'cycles':>8}{'analyze s':>11}{'Msamples/s':>12}{'lttb s':>8}{'trace KB':>10}")
+    for n in args.samples:
+        t, v, i = synthetic_log(n)
+        t0 = time.perf_counter()
+        analyzer = CycleAnalyzer()
+        for s in range(0, n, CHUNK_ROWS):
+            analyzer.update(t[s:s + CHUNK_ROWS], v[s:s + CHUNK_ROWS], i[s:s + CHUNK_ROWS])
+        result = analyzer.result()
+        analyze = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        lttb(t, v, PLOT_POINTS)                  # single-pass reduction of the whole trace, for reference
+        single = time.perf_counter() - t0
+        kb = len(json.dumps(result.trace)) / 1024
+        print(f"{n:>11}{len(result.cycles):>8}{analyze:>11.2f}{n / analyze / 1e6:>12.1f}{single:>8.2f}{kb:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# bench_cold_start.py
+# Cold start and per-rerun latency of the Streamlit entry point, measured headlessly with
+# streamlit.testing.AppTest. Every sample starts a fresh interpreter so imports are truly cold.
+#   python benchmarks/bench_cold_start.py --repeat 5
+#   python benchmarks/bench_cold_start.py --app /path/to/older/Appp_23.py   # compare against another revision
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("pdfplumber", "openpyxl", "docx")
+
+CHILD = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app, reruns = sys.argv[1], int(sys.argv[2])
+os.chdir(os.path.dirname(app)); sys.path.insert(0, os.path.dirname(app))
+out = {"streamlit_import": time.perf_counter() - t0}
+at = AppTest.from_file(app, default_timeout=120)
+t0 = time.perf_counter(); at.run(); out["first_run"] = time.perf_counter() - t0
+assert not at.exception, at.exception
+out["heavy_loaded"] = [m for m in %r if m in sys.modules]
+pages = {}
+for page in at.sidebar.radio[0].options:
+    t0 = time.perf_counter(); at.sidebar.radio[0].set_value(page).run(); first = time.perf_counter() - t0
+    samples = []
+    for _ in range(reruns):
+        t0 = time.perf_counter(); at.run(); samples.append(time.perf_counter() - t0)
+    pages[page] = {"first": first, "rerun": samples}
+out["pages"] = pages
+print(json.dumps(out))
+""" % (HEAVY,)
+
+def sample(app, reruns):
+    proc = subprocess.run([sys.executable, "-c", CHILD, app, str(reruns)], capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default=os.path.join(ROOT, "Appp_23.py"))
+    ap.add_argument("--repeat", type=int, default=5, help="fresh-process cold starts")
+    ap.add_argument("--reruns", type=int, default=10, help="warm reruns per page")
+    args = ap.parse_args()
+
+    runs = [sample(os.path.abspath(args.app), args.reruns) for _ in range(args.repeat)]
+    first = [r["first_run"] * 1e3 for r in runs]
+    print(f"cold first render (default page): p50 {np.percentile(first, 50):.0f} ms, max {max(first):.0f} ms")
+    print(f"heavy parsers loaded at first render: {', '.join(runs[0]['heavy_loaded']) or 'none'}")
+    print(f"{'page':<30}{'first visit ms':>15}{'rerun p50 ms':>14}{'rerun p99 ms':>14}")
+    for page in runs[0]["pages"]:
+        visits = [r["pages"][page]["first"] * 1e3 for r in runs]
+        reruns = [s * 1e3 for r in runs for s in r["pages"][page]["rerun"]]
+        p50, p99 = np.percentile(reruns, [50, 99])
+        print(f"{page:<30}{np.percentile(visits, 50):>15.1f}{p50:>14.1f}{p99:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench_component_search.py
+# Builds a ComponentIndex over a synthetic BOM library and reports query latency.
+#   python benchmarks/bench_component_search.py --parts 200000 --queries 2000
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compliance_core.component_index import ComponentIndex  # noqa: E402
+
+MANUFACTURERS = ["onsemi", "STMicroelectronics", "Texas Instruments", "Murata", "Vishay", "Yageo",
+                 "Panasonic", "ROHM", "Nexperia", "Microchip", "Infineon", "NXP", "Würth Elektronik"]
+CATEGORIES = ["Resistor", "Capacitor", "Inductor", "MOSFET", "Diode", "LDO Regulator", "MCU",
+              "CAN Transceiver", "Op-Amp", "Ferrite Bead", "ESD Suppressor", "Buck Converter"]
+QUALIFICATIONS = ["AEC-Q100", "AEC-Q101", "AEC-Q200", None]
+
+def synthetic_db(n, seed=0):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    db = {}
+    while len(db) < n:
+        part = (rng.choice(["", "t", "s", "m"]) + "".join(rng.choices(letters, k=rng.randint(2, 4)))
+                + "".join(rng.choices("0123456789", k=rng.randint(3, 6)))
+                + rng.choice(["", "-7", "qdrq1", "fr-07", "t1g", "-tr", "/sl", "zd"]))
+        record = {"Manufacturer": rng.choice(MANUFACTURERS), "Product Category": rng.choice(CATEGORIES), "RoHS": "Yes"}
+        qual = rng.choice(QUALIFICATIONS)
+        if qual: record["Qualification"] = qual
+        db[part] = record
+    return db
+
+def typo(part, rng):
+    chars = list(part)
+    i = rng.randrange(len(chars))
+    op = rng.choice("sdi")
+    if op == "s": chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz0123456789")
+    elif op == "d" and len(chars) > 4: del chars[i]
+    else: chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz0123456789"))
+    return "".join(chars)
+
+def timed(index, queries, **kwargs):
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, **kwargs)
+        samples.append((time.perf_counter() - t0) * 1e3)
+    return np.percentile(samples, [50, 99])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--parts", type=int, default=200_000)
+    ap.add_argument("--queries", type=int, default=2000)
+    ap.add_argument("--budget-ms", type=float, default=10.0, help="fail if any p99 exceeds this")
+    args = ap.parse_args()
+
+    rng = random.Random(1)
+    db = synthetic_db(args.parts)
+    t0 = time.perf_counter()
+    index = ComponentIndex(db)
+    print(f"built index over {len(index):,} parts in {time.perf_counter() - t0:.2f} s")
+
+    parts = rng.sample(list(db), args.queries)
+    cases = {
+        "exact": (parts, {}),
+        "prefix": ([p[:max(3, len(p) // 2)] for p in parts], {}),
+        "fuzzy": ([typo(p, rng) for p in parts], {}),
+        "filtered": ([typo(p, rng) for p in parts], {"filters": {"Qualification": "AEC-Q100"}}),
+    }
+    worst = 0.0
+    print(f"{'case':<10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, (queries, kwargs) in cases.items():
+        p50, p99 = timed(index, queries, **kwargs)
+        worst = max(worst, p99)
+        print(f"{name:<10}{p50:>10.3f}{p99:>10.3f}")
+    if worst > args.budget_ms:
+        sys.exit(f"p99 {worst:.2f} ms exceeds budget of {args.budget_ms} ms")
+
+if __name__ == "__main__":
+    main()
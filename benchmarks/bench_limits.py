@@ -0,0 +1,63 @@
+# bench_limits.py
+# Campaign-wide limit checks: flattening parsed reports into the measurement table, then
+# re-evaluating it against the catalogue (what a limits change costs).
+#   python benchmarks/bench_limits.py --reports 1000 10000
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compliance_core import knowledge_store, limits  # noqa: E402
+
+SAMPLE_VALUES = {"temperature": ("°C", -55, 150), "time": ("h", 0.5, 1200), "voltage": ("kV", 0.1, 16), "length": ("m", 0.1, 2),
+                 "count": ("cycles", 10, 1200), "resistance": ("Mohm", 1, 500), "frequency": ("Hz", 5, 3000), "percent": ("%", 1, 99)}
+
+def synthetic_campaign(n_reports, tests_per_report=4, seed=0):
+    rng, kb = random.Random(seed), knowledge_store.test_cases()
+    keys = [k for k in kb if k in {t for t in limits.load_limits()["test"]}]
+    reports = []
+    for i in range(n_reports):
+        records = []
+        for key in rng.sample(keys, tests_per_report):
+            values = []
+            for _ in range(rng.randint(2, 6)):
+                unit, lo, hi = SAMPLE_VALUES[rng.choice(list(SAMPLE_VALUES))]
+                values.append((round(rng.uniform(lo, hi), 2), unit))
+            records.append({"TestName": kb[key]["name"], "TestKey": key, "Result": "PASS",
+                            "Details": {"Standard": kb[key].get("standard", "")}, "Measurements": values})
+        reports.append((f"report_{i:06d}.pdf", records))
+    return reports
+
+def check_standard_selection(table):
+    # Regression check: a report citing one standard is only held to that standard's limits,
+    # even though the knowledge base lists several for the test.
+    short = {"TestName": "Short Circuit", "TestKey": "short circuit", "Result": "PASS", "Measurements": [(80, "mΩ"), (55, "°C")],
+             "Details": {"Standard": "Based on AIS-156 / IEC 62133-2", "Standards Cited": "IEC 62133-2"}}
+    result = limits.evaluate(limits.measurement_table([("short.pdf", [short])]), table)
+    assert set(result["Standard"]) == {"IEC 62133-2"}, result[["Standard", "Requirement", "Status"]]
+    assert (result["Status"] == limits.PASS).all(), result[["Standard", "Requirement", "Status", "Margin"]]
+    uncited = {**short, "Details": {"Standard": "Based on AIS-156 / IEC 62133-2"}}
+    result = limits.evaluate(limits.measurement_table([("uncited.pdf", [uncited])]), table)
+    assert set(result["Standard"]) == {"IEC 62133-2", "AIS-156"}, result[["Standard", "Requirement", "Status"]]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reports", type=int, nargs="+", default=[1000, 10000])
+    args = ap.parse_args()
+    table = limits.load_limits()
+    check_standard_selection(table)
+    print(f"{'reports':>9}{'requirements':>14}{'flatten s':>11}{'evaluate s':>12}{'reports/s':>11}")
+    for n in args.reports:
+        reports = synthetic_campaign(n)
+        t0 = time.perf_counter()
+        measurements = limits.measurement_table(reports)
+        flatten = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        result = limits.evaluate(measurements, table)
+        evaluate = time.perf_counter() - t0
+        print(f"{n:>9}{len(result):>14}{flatten:>11.3f}{evaluate:>12.3f}{n / evaluate:>11,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# bench_requirement_search.py
+# Query latency of the requirement index as the procedure catalogue grows.
+#   python benchmarks/bench_requirement_search.py --sizes 21 1000 5000
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compliance_core import knowledge_store  # noqa: E402
+from compliance_core.requirement_search import RequirementIndex  # noqa: E402
+
+QUERIES = ["shock", "IP67", "immersion", "ESD gun", "vibration sweep", "salt spray", "hipot", "thermal cycling",
+           "60068-2-14", "insulation resistance 500 V", "connector mating cycles", "radiated emissions cispr"]
+
+def synthetic_catalogue(size, seed=0):
+    # Variants of the shipped procedures with a distinguishing suffix and shuffled steps.
+    rng = random.Random(seed)
+    base = list(knowledge_store.test_cases().items())
+    catalogue = dict(base[:size])
+    i = 0
+    while len(catalogue) < size:
+        key, entry = base[i % len(base)]
+        variant = dict(entry, name=f"{entry['name']} variant {i}", procedure=rng.sample(entry["procedure"], len(entry["procedure"])))
+        catalogue[f"{key} #{i}"] = variant
+        i += 1
+    return catalogue
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[21, 1000, 5000])
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+    print(f"{'procedures':>11}{'build s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+    for size in args.sizes:
+        catalogue = synthetic_catalogue(size)
+        t0 = time.perf_counter()
+        index = RequirementIndex(catalogue)
+        build = time.perf_counter() - t0
+        samples = []
+        for r in range(args.rounds):
+            q = QUERIES[r % len(QUERIES)]
+            t0 = time.perf_counter()
+            index.search(q)
+            samples.append((time.perf_counter() - t0) * 1e3)
+        p50, p99 = np.percentile(samples, [50, 99])
+        print(f"{len(index):>11}{build:>9.2f}{p50:>9.3f}{p99:>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# corpus.py
+# Deterministic synthetic corpus for the benchmark suite: a multi-hundred-page PDF report,
+# a large DOCX report, cycler logs as CSV and XLSX, a component database and a BOM.
+# Files are only regenerated when their parameters change (see manifest.json).
+#   python benchmarks/corpus.py --scale small            # quick, a few hundred MB at most
+#   python benchmarks/corpus.py --scale full --out /data/bench-corpus
+import argparse
+import json
+import os
+import random
+import sys
+import textwrap
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_component_search import synthetic_db, typo  # noqa: E402
+from bench_test_extraction import synthetic_report  # noqa: E402
+
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+XLSX_MAX_ROWS = 1_048_575       # one worksheet, minus the header row
+SCALES = {
+    "small": {"pdf_pages": 50, "docx_mb": 8, "csv_rows": 1_000_000, "xlsx_rows": 100_000, "parts": 100_000, "bom_lines": 5000},
+    "full": {"pdf_pages": 500, "docx_mb": 64, "csv_rows": 10_000_000, "xlsx_rows": XLSX_MAX_ROWS, "parts": 100_000, "bom_lines": 20000},
+}
+
+# === Reports ===
+def report_lines(n_lines, seed=0):
+    text = synthetic_report(n_lines * 90 / 1024 / 1024 + 0.01, seed=seed)
+    lines = [l for para in text.splitlines() for l in textwrap.wrap(para, 90)]
+    return lines[:n_lines]
+
+def write_pdf(path, pages, lines_per_page=56):
+    # Hand-rolled PDF 1.4: one Helvetica text object per page, so no PDF library is needed.
+    lines = report_lines(pages * lines_per_page)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for p in range(pages):
+        body = lines[p * lines_per_page:(p + 1) * lines_per_page]
+        ops = ["BT /F1 10 Tf 12 TL 50 760 Td"] + [
+            "(" + l.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") '" for l in body] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), pages)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for i, obj in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (i, obj))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        f.write(b"".join(b"%010d 00000 n \n" % o for o in offsets))
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+def write_docx(path, size_mb):
+    # Paragraphs plus a results table every ~200 paragraphs; only the parts a reader needs.
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    rng, parts, total, i = random.Random(0), [], 0, 0
+    lines = report_lines(5000, seed=1)
+    while total < size_mb * 1024 * 1024:
+        if i % 200 == 199:
+            rows = [("Test Item", "Result", "Remarks")] + [(rng.choice(["Vibration Test", "Thermal Shock", "Salt Spray", "ESD", "IP67 Immersion"]),
+                    rng.choice(["PASS", "PASS", "FAIL"]), f"Sample {rng.randint(1, 20)}") for _ in range(8)]
+            xml = "<w:tbl>" + "".join("<w:tr>" + "".join(f"<w:tc><w:p><w:r><w:t>{escape(c)}</w:t></w:r></w:p></w:tc>" for c in row) + "</w:tr>"
+                                      for row in rows) + "</w:tbl>"
+        else: xml = f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(lines[i % len(lines)])}</w:t></w:r></w:p>"
+        parts.append(xml); total += len(xml); i += 1
+    document = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {w}><w:body>{"".join(parts)}</w:body></w:document>'
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", '<?xml version="1.0" encoding="UTF-8"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/><Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>')
+        zf.writestr("_rels/.rels", '<?xml version="1.0" encoding="UTF-8"?><Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/></Relationships>')
+        zf.writestr("word/document.xml", document)
+
+# === Cycler logs ===
+def cycler_frame(start, stop, cycle_samples=7200, dt=1.0):
+    # CC charge / rest / CC discharge / rest at 1 s resolution, with slow capacity fade.
+    n = np.arange(start, stop)
+    phase, cycle = (n % cycle_samples) / cycle_samples, n // cycle_samples
+    current = np.select([phase < 0.45, phase < 0.5, phase < 0.95], [2.0, 0.0, -2.0], 0.0) * (1 - 2e-4 * cycle)
+    soc = np.clip(np.where(phase < 0.5, phase / 0.45, (0.95 - phase) / 0.45), 0, 1)
+    voltage = 3.0 + 1.2 * soc + 0.03 * current
+    ah = np.where(phase < 0.5, np.minimum(phase, 0.45), np.maximum(0.95 - phase, 0)) * cycle_samples * 2.0 * dt / 3600
+    return pd.DataFrame({"Time": np.round(n * dt, 1), "Voltage": np.round(voltage, 4), "Current": np.round(current, 4), "Ah": np.round(ah, 5)})
+
+def write_cycler_csv(path, rows, chunk=1_000_000):
+    with open(path, "w", newline="") as f:
+        f.write("Cycler export,synthetic\nChannel,1\n")
+        for start in range(0, rows, chunk):
+            cycler_frame(start, min(rows, start + chunk)).to_csv(f, index=False, header=start == 0)
+
+def write_cycler_xlsx(path, rows, chunk=100_000):
+    import openpyxl
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Channel_1")
+    ws.append(["Time", "Voltage", "Current", "Ah"])
+    for start in range(0, min(rows, XLSX_MAX_ROWS), chunk):
+        for row in cycler_frame(start, min(rows, XLSX_MAX_ROWS, start + chunk)).itertuples(index=False): ws.append(list(row))
+    wb.save(path)
+
+# === Component database & BOM ===
+def write_components(path, parts):
+    rng, db = random.Random(2), synthetic_db(parts)
+    for record in db.values():
+        lo, hi = rng.choice([(-40, 85), (-40, 105), (-40, 125), (-55, 150), (0, 70)])
+        record["Minimum Operating Temperature"], record["Maximum Operating Temperature"] = f"{lo} C", f"+{hi} C"
+    with open(path, "w", encoding="utf-8") as f: json.dump(db, f)
+    return db
+
+def write_bom(path, db, lines):
+    rng, parts = random.Random(3), list(db)
+    rows = [{"Ref": f"U{i + 1}", "Part Number": (typo(p, rng) if rng.random() < 0.05 else p.upper()), "Qty": rng.randint(1, 10)}
+            for i, p in enumerate(rng.choices(parts, k=lines))]
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+# === Driver ===
+FILES = {
+    "report.pdf": ("pdf_pages", lambda path, p: write_pdf(path, p["pdf_pages"])),
+    "report.docx": ("docx_mb", lambda path, p: write_docx(path, p["docx_mb"])),
+    "cycler.csv": ("csv_rows", lambda path, p: write_cycler_csv(path, p["csv_rows"])),
+    "cycler.xlsx": ("xlsx_rows", lambda path, p: write_cycler_xlsx(path, p["xlsx_rows"])),
+    "components.json": ("parts", None),
+    "bom.csv": ("bom_lines", None),
+}
+
+def generate(out=DEFAULT_OUT, scale="small", force=False, log=print):
+    """Write (or reuse) every corpus file under out; returns the manifest."""
+    os.makedirs(out, exist_ok=True)
+    params, manifest_path = SCALES[scale], os.path.join(out, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f: manifest = json.load(f)
+    db = None
+    for name, (param, writer) in FILES.items():
+        path, entry = os.path.join(out, name), manifest.get(name, {})
+        fresh = os.path.exists(path) and entry.get(param) == params[param] and entry.get("bytes") == os.path.getsize(path)
+        if fresh and not force and not (name == "bom.csv" and db is not None): continue   # BOM follows the DB
+        t0 = time.perf_counter()
+        if name == "components.json": db = write_components(path, params["parts"])
+        elif name == "bom.csv":
+            if db is None:
+                with open(os.path.join(out, "components.json"), encoding="utf-8") as f: db = json.load(f)
+            write_bom(path, db, params["bom_lines"])
+        else: writer(path, params)
+        manifest[name] = {param: params[param], "bytes": os.path.getsize(path)}
+        log(f"wrote {name} ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - t0:.1f} s")
+        with open(manifest_path, "w") as f: json.dump(manifest, f, indent=1)
+    return manifest
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--scale", choices=SCALES, default="small")
+    ap.add_argument("--force", action="store_true", help="regenerate even if the files are up to date")
+    args = ap.parse_args()
+    generate(args.out, args.scale, args.force)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# run_suite.py
+# Benchmark suite over the synthetic corpus (see corpus.py). Every stage runs in a fresh
+# interpreter so its peak RSS is its own; results are written to benchmarks/results/ as
+# JSON, one file per run, and can be compared against any earlier run.
+#   python benchmarks/run_suite.py                              # small corpus, all stages
+#   python benchmarks/run_suite.py --scale full --repeat 5 parse.csv parse.xlsx
+#   python benchmarks/run_suite.py --compare latest --fail-on-regression 15
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+try: import resource
+except ImportError: resource = None      # Windows: peak RSS comes from psutil, if installed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+RESULTS_DIR = os.path.join(HERE, "results")
+sys.path[:0] = [ROOT, HERE]
+
+STAGES = {}
+
+def stage(name, unit):
+    """Register fn(corpus, repeat) -> (samples in seconds, units handled per sample)."""
+    def register(fn):
+        STAGES[name] = (fn, unit)
+        return fn
+    return register
+
+def _timed(fn, repeat, warmup=1):
+    for _ in range(warmup): fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); samples.append(time.perf_counter() - t0)
+    return samples
+
+def _read(corpus, name):
+    with open(os.path.join(corpus, name), "rb") as f: return f.read()
+
+def _parse_file(name, units=lambda corpus, data: len(data) / 1e6):
+    def run(corpus, repeat):
+        from compliance_core import report_parser
+        report_parser.RESULT_CACHE_SIZE = 0          # measure parsing, not the result cache
+        data = _read(corpus, name)
+        return _timed(lambda: report_parser.parse_report(name, data), repeat), units(corpus, data)
+    return run
+
+def _pdf_pages(corpus, data):
+    with open(os.path.join(corpus, "manifest.json")) as f: return json.load(f)["report.pdf"]["pdf_pages"]
+
+# === Stages ===
+stage("parse.pdf", "pages")(_parse_file("report.pdf", _pdf_pages))
+stage("parse.docx", "MB")(_parse_file("report.docx"))
+stage("parse.csv", "MB")(_parse_file("cycler.csv"))
+stage("parse.xlsx", "MB")(_parse_file("cycler.xlsx"))
+
+@stage("battery_profile.frame", "Mrows")
+def battery_profile_frame(corpus, repeat):
+    import pandas as pd
+    from compliance_core.report_parser import parse_battery_profile
+    df = pd.read_csv(os.path.join(corpus, "cycler.csv"), header=None, skiprows=2, nrows=1_000_000, dtype=str)
+    return _timed(lambda: parse_battery_profile(df), repeat), len(df) / 1e6
+
+@stage("kb.lookup", "lookups")
+def kb_lookup(corpus, repeat):
+    from compliance_core import knowledge_store
+    kb = knowledge_store.test_cases()
+    keys = list(kb) * 50
+    kb.get(keys[0])
+    samples = []
+    for key in keys[:max(repeat, 1) * 100]:
+        knowledge_store.test_cases()._get.cache_clear()
+        t0 = time.perf_counter(); kb[key]; samples.append(time.perf_counter() - t0)
+    return samples, 1
+
+@stage("components.build", "Kparts")
+def components_build(corpus, repeat):
+    from compliance_core.component_index import ComponentIndex
+    with open(os.path.join(corpus, "components.json"), encoding="utf-8") as f: db = json.load(f)
+    return _timed(lambda: ComponentIndex(db), repeat), len(db) / 1e3
+
+@stage("components.search", "queries")
+def components_search(corpus, repeat):
+    import random
+    from bench_component_search import typo
+    from compliance_core.component_index import ComponentIndex
+    with open(os.path.join(corpus, "components.json"), encoding="utf-8") as f: db = json.load(f)
+    index, rng = ComponentIndex(db), random.Random(0)
+    parts = rng.sample(list(db), 500)
+    queries = parts + [p[:max(3, len(p) // 2)] for p in parts] + [typo(p, rng) for p in parts]
+    samples = []
+    for q in queries * max(1, repeat // 3):
+        t0 = time.perf_counter(); index.search(q); samples.append(time.perf_counter() - t0)
+    return samples, 1
+
+@stage("requirements.search", "queries")
+def requirements_search(corpus, repeat):
+    from bench_requirement_search import QUERIES
+    from compliance_core import knowledge_store
+    from compliance_core.requirement_search import RequirementIndex
+    index = RequirementIndex(knowledge_store.test_cases())
+    samples = []
+    for q in QUERIES * 50 * max(1, repeat // 3):
+        t0 = time.perf_counter(); index.search(q); samples.append(time.perf_counter() - t0)
+    return samples, 1
+
+@stage("bom.check", "Klines")
+def bom_check_stage(corpus, repeat):
+    from compliance_core import bom_check
+    with open(os.path.join(corpus, "components.json"), encoding="utf-8") as f: catalog = bom_check.build_catalog(json.load(f))
+    bom = bom_check.read_bom("bom.csv", _read(corpus, "bom.csv"))
+    return _timed(lambda: bom_check.check_bom(bom, catalog), repeat), len(bom) / 1e3
+
+@stage("limits.evaluate", "Kreports")
+def limits_evaluate(corpus, repeat):
+    from bench_limits import synthetic_campaign
+    from compliance_core import limits
+    measurements, table = limits.measurement_table(synthetic_campaign(10_000)), limits.load_limits()
+    return _timed(lambda: limits.evaluate(measurements, table), repeat), 10.0
+
+# === Runner ===
+def _peak_mb(children=False):
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+        return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    if children: return None             # finished workers are not observable without getrusage
+    try: import psutil
+    except ImportError: return 0.0
+    info = psutil.Process().memory_info()
+    return round(getattr(info, "peak_wset", info.rss) / 2 ** 20, 1)
+
+def run_child(name, corpus, repeat):
+    fn, unit = STAGES[name]
+    samples, units = fn(corpus, repeat)
+    samples = np.asarray(samples)
+    p50, p99 = np.percentile(samples, [50, 99])
+    return {"unit": unit, "runs": len(samples), "mean_s": float(samples.mean()), "p50_s": float(p50), "p99_s": float(p99),
+            "throughput": float(units / samples.mean()) if samples.mean() > 0 else None,
+            "peak_rss_mb": _peak_mb(), "workers_peak_rss_mb": _peak_mb(children=True)}
+
+def run_stage(name, corpus, repeat):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name, "--corpus", corpus, "--repeat", str(repeat)],
+                          capture_output=True, text=True)
+    if proc.returncode: return {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def _git_revision():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): return "unknown"
+
+def _load(path):
+    if path == "latest":
+        runs = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+        if not runs: return None
+        path = runs[-1]
+    with open(path) as f: return json.load(f)
+
+def _fmt_ms(seconds): return f"{seconds * 1e3:.3f}" if seconds < 0.1 else f"{seconds * 1e3:.0f}"
+
+def _fmt_rate(value): return f"{value:,.0f}" if value >= 100 else f"{value:.3g}"
+
+def report(run, baseline=None, threshold=None):
+    print(f"{'stage':<24}{'p50 ms':>10}{'p99 ms':>10}{'throughput':>20}{'peak RSS MB':>13}{'vs base':>9}")
+    regressions = []
+    for name, r in run["stages"].items():
+        if "error" in r:
+            print(f"{name:<24}  error: {r['error']}"); continue
+        change = ""
+        base = (baseline or {}).get("stages", {}).get(name)
+        if base and "p50_s" in base:
+            ratio = r["p50_s"] / base["p50_s"]
+            change = f"{(ratio - 1) * 100:+.0f}%"
+            if threshold is not None and ratio > 1 + threshold / 100: regressions.append(name); change += " !"
+        tput = f"{_fmt_rate(r['throughput'])} {r['unit']}/s" if r["throughput"] else "-"
+        print(f"{name:<24}{_fmt_ms(r['p50_s']):>10}{_fmt_ms(r['p99_s']):>10}{tput:>20}{r['peak_rss_mb']:>13.0f}{change:>9}")
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("stages", nargs="*", help=f"stages to run (default: all of {', '.join(STAGES)})")
+    ap.add_argument("--corpus", default=None, help="corpus directory (default: benchmarks/corpus, generated if needed)")
+    ap.add_argument("--scale", default="small", help="corpus scale when generating (small or full)")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per file stage (after one warm-up)")
+    ap.add_argument("--compare", metavar="RESULT", help="earlier result file, or 'latest', to compare against")
+    ap.add_argument("--fail-on-regression", type=float, metavar="PCT", help="exit 1 if any p50 is PCT%% slower than the baseline")
+    ap.add_argument("--no-save", action="store_true", help="do not write a result file")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.corpus, args.repeat)))
+        return
+    import corpus as corpus_gen
+    corpus = args.corpus or corpus_gen.DEFAULT_OUT
+    manifest = corpus_gen.generate(corpus, args.scale)
+    baseline = _load(args.compare) if args.compare else None   # read before this run is saved
+    names = args.stages or list(STAGES)
+    unknown = [n for n in names if n not in STAGES]
+    if unknown: sys.exit(f"unknown stage(s): {', '.join(unknown)}")
+    run = {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "revision": _git_revision(),
+           "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+           "corpus": manifest, "repeat": args.repeat, "stages": {}}
+    for name in names:
+        run["stages"][name] = run_stage(name, corpus, args.repeat)
+    regressions = report(run, baseline, args.fail_on_regression)
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{run['timestamp'].replace(':', '')[:17]}_{run['revision']}.json")
+        with open(path, "w") as f: json.dump(run, f, indent=1)
+        print(f"saved {os.path.relpath(path, ROOT)}")
+    if regressions: sys.exit(f"p50 regressions beyond {args.fail_on_regression}%: {', '.join(regressions)}")
+
+if __name__ == "__main__":
+    main()
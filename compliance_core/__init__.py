@@ -0,0 +1,14 @@
+# compliance_core/__init__.py
+# Streamlit-free core of the Regulatory Compliance & Safety tool: report parsing and
+# verification, limit checks against standards, component search, BOM checks and
+# knowledge-base lookups. Used by the Streamlit app (Appp_23.py), the compliance-check
+# CLI and other Python services.
+from .battery_analytics import CycleAnalyzer, lttb
+from .bom_check import build_catalog, check_bom, read_bom, summarize
+from .component_index import ComponentIndex, normalize_part
+from .knowledge_store import components, test_cases
+from .limits import check_reports, load_limits
+from .report_parser import (SUPPORTED_EXTENSIONS, expand_uploads, parse_battery_file, parse_many, parse_report,
+                            verify_file, verify_paths)
+from .requirement_search import RequirementIndex
+from .test_extraction import get_extractor
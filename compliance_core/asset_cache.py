@@ -0,0 +1,121 @@
+# compliance_core/asset_cache.py
+# Offline, content-addressed cache for knowledge-base images (test-setup pictures).
+# Originals are stored once under their SHA-256 and looked up by URL through manifest.json;
+# display-size thumbnails are derived from them on first use. Rendering never touches the
+# network: fill the cache with `compliance-check assets fetch` on a connected machine (or
+# `assets add` for files obtained some other way) and ship the directory with the deployment.
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import urllib.request
+
+from . import knowledge_store, tracing
+
+ASSET_DIR = os.environ.get("COMPLIANCE_ASSET_DIR") or os.path.join(knowledge_store.DATA_DIR, "assets")
+MANIFEST = "manifest.json"
+THUMB_WIDTH = 640
+FETCH_TIMEOUT = 20
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+IMAGE_TYPES = {b"\x89PNG": ".png", b"\xff\xd8\xff": ".jpg", b"GIF8": ".gif", b"RIFF": ".webp"}   # RIFF only with a WEBP form type
+
+_lock = threading.Lock()
+_manifest = (None, {})   # (mtime_ns, {url: blob name})
+
+# === Manifest & blobs ===
+def load_manifest():
+    global _manifest
+    try: mtime = os.stat(os.path.join(ASSET_DIR, MANIFEST)).st_mtime_ns
+    except OSError: return {}
+    with _lock:
+        if _manifest[0] != mtime:
+            with open(os.path.join(ASSET_DIR, MANIFEST), encoding="utf-8") as f: _manifest = (mtime, json.load(f))
+        return _manifest[1]
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f: f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def _save_manifest(entries):
+    _write_atomic(os.path.join(ASSET_DIR, MANIFEST), json.dumps(entries, indent=1, sort_keys=True).encode("utf-8"))
+
+def _image_ext(data):
+    ext = next((ext for magic, ext in IMAGE_TYPES.items() if data.startswith(magic)), None)
+    if ext == ".webp" and data[8:12] != b"WEBP": return None    # WAV, AVI and other RIFF containers
+    return ext
+
+def _store_blob(data):
+    ext = _image_ext(data)
+    if ext is None: raise ValueError("not a PNG, JPEG, GIF or WebP image")
+    name = hashlib.sha256(data).hexdigest() + ext
+    if not os.path.exists(os.path.join(ASSET_DIR, name)): _write_atomic(os.path.join(ASSET_DIR, name), data)
+    return name
+
+def add_image(url, data):
+    """Register image bytes obtained out of band (e.g. copied onto an air-gapped host) for url."""
+    entries = dict(load_manifest())
+    entries[url] = _store_blob(data)
+    _save_manifest(entries)
+    return os.path.join(ASSET_DIR, entries[url])
+
+def knowledge_base_urls():
+    return sorted({e["image_url"] for e in knowledge_store.test_cases().values() if e.get("image_url")})
+
+def prefetch(urls=None, timeout=FETCH_TIMEOUT, refresh=False):
+    """Download each missing image once. Yields (url, status): 'cached', 'fetched' or 'error: ...'."""
+    entries = dict(load_manifest())
+    try:
+        for url in (knowledge_base_urls() if urls is None else urls):
+            if not refresh and original_path(url, entries):
+                yield url, "cached"; continue
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as resp: data = resp.read(MAX_IMAGE_BYTES + 1)
+                if len(data) > MAX_IMAGE_BYTES: raise ValueError(f"larger than {MAX_IMAGE_BYTES >> 20} MB")
+                entries[url] = _store_blob(data)
+                yield url, "fetched"
+            except (OSError, ValueError) as e:
+                yield url, f"error: {e}"
+    finally:
+        if entries != load_manifest(): _save_manifest(entries)
+
+# === Lookup (offline) ===
+def original_path(url, entries=None):
+    name = (load_manifest() if entries is None else entries).get(url)
+    path = name and os.path.join(ASSET_DIR, name)
+    return path if path and os.path.exists(path) else None
+
+def thumbnail_path(url, width=THUMB_WIDTH):
+    """Local display-size copy of the image for url, or None if it is not cached."""
+    src = original_path(url)
+    if src is None: return None
+    thumb = os.path.join(ASSET_DIR, "thumbs", f"{os.path.basename(src).split('.')[0]}_{width}.jpg")
+    tracing.cache_event("image thumbnails", os.path.exists(thumb))
+    if os.path.exists(thumb): return thumb
+    try: from PIL import Image
+    except ImportError: return src   # Pillow is optional; serve the original
+    try:
+        with Image.open(src) as img:
+            if img.width <= width: return src
+            img.thumbnail((width, img.height))
+            if img.mode not in ("RGB", "L"):
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", rgba.size, "white")
+                img.paste(rgba, mask=rgba.getchannel("A"))
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=85, optimize=True)
+        _write_atomic(thumb, buf.getvalue())
+    except OSError:
+        return src   # unreadable image or read-only cache: fall back to the original
+    return thumb
+
+def status():
+    urls = knowledge_base_urls()
+    return {"images": len(urls), "cached": sum(original_path(u) is not None for u in urls)}
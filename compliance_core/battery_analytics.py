@@ -0,0 +1,178 @@
+# compliance_core/battery_analytics.py
+# Cycle analysis for charge/discharge logs. Every sample is classified as charge, discharge
+# or rest from the sign of the current, samples are grouped into cycles (a new cycle starts
+# where charging resumes after a discharge) and current and power are integrated per cycle
+# into capacity and energy, all with whole-array NumPy operations. The analyzer consumes a
+# log chunk by chunk and carries only the previous sample across chunk boundaries, so it
+# keeps the bounded memory of the streaming parsers. Plot traces are preselected per chunk
+# with a vectorized min/max envelope and reduced with LTTB once at the end (MinMaxLTTB).
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# |I| at or below this many amps counts as rest. It is a fixed threshold rather than a share of
+# the peak current: a streamed log's peak is unknown until the end, and the first chunk may be
+# a rest or a low-current step whose noise would otherwise count as charge or discharge.
+# Logs of very small cells (or very noisy large packs) can set COMPLIANCE_REST_CURRENT.
+REST_CURRENT = float(os.environ.get("COMPLIANCE_REST_CURRENT", "0.005"))
+PLOT_POINTS = 2000          # points per plotted channel
+CHUNK_PLOT_POINTS = 2000    # min/max points kept per chunk ahead of the final LTTB pass
+CHARGE, REST, DISCHARGE = 1, 0, -1
+_SUMS = ("charge_ah", "discharge_ah", "charge_wh", "discharge_wh", "seconds")
+
+CycleAnalysis = namedtuple("CycleAnalysis", ["cycles", "summary", "trace"])
+
+# === Downsampling ===
+def minmax_indices(y, n_out):
+    """Indices of the per-bucket minimum and maximum of y (about n_out points), in order."""
+    n = len(y)
+    if n_out >= n: return np.arange(n)
+    size = -(-2 * n // n_out)
+    m = n - n % size
+    blocks, base = y[:m].reshape(-1, size), np.arange(0, m, size)
+    parts = [base + blocks.argmin(axis=1), base + blocks.argmax(axis=1), [0, n - 1]]
+    if m < n: parts += [[m + int(y[m:].argmin()), m + int(y[m:].argmax())]]
+    return np.unique(np.concatenate(parts))
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points that preserve the shape of y(x)."""
+    n = len(x)
+    if n_out >= n or n_out < 3: return np.arange(n)
+    bounds = np.linspace(1, n - 1, n_out - 1).astype(np.int64)   # n_out - 2 buckets between the end points
+    counts = np.diff(bounds)
+    avg_x = np.add.reduceat(x[:n - 1], bounds[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], bounds[:-1]) / counts
+    next_x, next_y = np.append(avg_x[1:], x[-1]), np.append(avg_y[1:], y[-1])
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1], a = 0, n - 1, 0
+    for j in range(n_out - 2):
+        lo, hi = bounds[j], bounds[j + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[j]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[j] - ay))
+        a = keep[j + 1] = lo + int(np.argmax(area))
+    return keep
+
+# === Time axis ===
+def _to_seconds(time, mode):
+    if mode == "numeric": return pd.to_numeric(time, errors="coerce").to_numpy(float)
+    if mode == "duration": return pd.to_timedelta(time.astype(str), errors="coerce").dt.total_seconds().to_numpy()
+    stamps = pd.to_datetime(time, errors="coerce", format="mixed")
+    return (stamps - pd.Timestamp(0)).dt.total_seconds().to_numpy()
+
+def _time_mode(time):
+    # Cycler logs carry elapsed seconds, h:mm:ss durations or wall-clock timestamps.
+    for mode in ("numeric", "duration", "timestamp"):
+        try: seconds = _to_seconds(time, mode)
+        except (ValueError, TypeError): continue
+        if np.isfinite(seconds).mean() > 0.5: return mode
+    return None
+
+# === Cycle analysis ===
+class CycleAnalyzer:
+    """Per-cycle capacity, energy and efficiency of a log fed chunk by chunk.
+
+    rest_current (amps, default REST_CURRENT) is the |I| up to which a sample counts as rest;
+    it is the same for every chunk.
+    """
+    def __init__(self, rest_current=None):
+        self.rest_current = REST_CURRENT if rest_current is None else rest_current
+        self.samples, self._mode, self._cycle, self._active = 0, None, 1, REST
+        self._last = None                       # (t, v, i, state, cycle) of the previous sample
+        self._ids, self._sums, self._vmin, self._vmax = [], [], [], []
+        self._trace = {"Voltage (V)": [], "Current (A)": []}
+
+    def update(self, time, volt, curr):
+        """Fold one chunk: raw time values and numeric voltage/current arrays of equal length."""
+        v, i = np.asarray(volt, dtype=float), np.asarray(curr, dtype=float)
+        if not len(v): return
+        if self._mode is None: self._mode = _time_mode(pd.Series(time)) or "none"
+        t = _to_seconds(pd.Series(time), self._mode) if self._mode != "none" else np.full(len(v), np.nan)
+        thr = self.rest_current
+        state = np.where(i > thr, CHARGE, np.where(i < -thr, DISCHARGE, REST)).astype(np.int8)
+
+        # Last non-rest state before each sample: a charge sample that follows a discharge opens a cycle.
+        pos = np.where(state != REST, np.arange(len(state)), -1)
+        np.maximum.accumulate(pos, out=pos)
+        active = np.where(pos >= 0, state[np.maximum(pos, 0)], self._active)
+        starts = (state == CHARGE) & (np.concatenate(([self._active], active[:-1])) == DISCHARGE)
+        cycle = self._cycle + np.cumsum(starts)
+        self._active, self._cycle = int(active[-1]), int(cycle[-1])
+
+        # Interval k runs from sample k-1 to k and belongs to sample k-1 (the carried sample for k = 0).
+        if self._last is not None:
+            lt, lv, li, ls, lc = self._last
+            T, V, I = np.concatenate(([lt], t)), np.concatenate(([lv], v)), np.concatenate(([li], i))
+            S, C = np.concatenate(([ls], state)), np.concatenate(([lc], cycle))
+        else: T, V, I, S, C = t, v, i, state, cycle
+        self._last = (t[-1], v[-1], i[-1], state[-1], cycle[-1])
+        dt = np.diff(T)
+        dt = np.where(np.isfinite(dt) & (dt > 0), dt, 0.0)      # step-time resets and gaps contribute nothing
+        ah = I[:-1] * dt / 3600.0
+        wh = V[:-1] * ah
+        s, c = S[:-1], C[:-1]
+        charge, discharge = s == CHARGE, s == DISCHARGE
+        sums = np.column_stack((np.where(charge, ah, 0.0), np.where(discharge, -ah, 0.0),
+                                np.where(charge, wh, 0.0), np.where(discharge, -wh, 0.0), dt))
+        # Cycle ids never decrease, so per-cycle totals are segment reductions.
+        if len(c):
+            first = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+            self._ids.append(c[first]); self._sums.append(np.add.reduceat(sums, first, axis=0))
+        first = np.flatnonzero(np.r_[True, cycle[1:] != cycle[:-1]])
+        self._vmin.append((cycle[first], np.minimum.reduceat(v, first)))
+        self._vmax.append((cycle[first], np.maximum.reduceat(v, first)))
+
+        for name, y in (("Voltage (V)", v), ("Current (A)", i)):
+            keep = minmax_indices(y, CHUNK_PLOT_POINTS)
+            self._trace[name].append((self.samples + keep, t[keep], y[keep]))
+        self.samples += len(v)
+
+    def result(self):
+        if not self.samples: return None
+        # A cycle can straddle chunks; merge the per-chunk partials.
+        vmin = pd.Series(np.concatenate([m for _, m in self._vmin]), index=np.concatenate([c for c, _ in self._vmin])).groupby(level=0).min()
+        vmax = pd.Series(np.concatenate([m for _, m in self._vmax]), index=np.concatenate([c for c, _ in self._vmax])).groupby(level=0).max()
+        totals = pd.DataFrame(np.concatenate(self._sums) if self._sums else np.zeros((0, len(_SUMS))), columns=_SUMS,
+                              index=np.concatenate(self._ids) if self._ids else []).groupby(level=0).sum()
+        totals = totals.reindex(vmin.index, fill_value=0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cycles = pd.DataFrame({
+                "Cycle": totals.index.astype(int),
+                "Charge Capacity (Ah)": totals["charge_ah"], "Discharge Capacity (Ah)": totals["discharge_ah"],
+                "Coulombic Efficiency (%)": np.where(totals["charge_ah"] > 0, 100 * totals["discharge_ah"] / totals["charge_ah"], np.nan),
+                "Charge Energy (Wh)": totals["charge_wh"], "Discharge Energy (Wh)": totals["discharge_wh"],
+                "Energy Efficiency (%)": np.where(totals["charge_wh"] > 0, 100 * totals["discharge_wh"] / totals["charge_wh"], np.nan),
+                "Min Voltage (V)": vmin, "Max Voltage (V)": vmax,
+                "Duration (h)": totals["seconds"] / 3600.0}).reset_index(drop=True)
+        # The last cycle is complete only if the log went on to rest after discharging; any
+        # earlier cycle was closed by the charge that started the next one.
+        last_complete = self._last[3] == REST and self._active == DISCHARGE
+        return CycleAnalysis(cycles, summarize_cycles(cycles, last_complete), self._final_trace())
+
+    def _final_trace(self):
+        trace = {}
+        for name, parts in self._trace.items():
+            x, t, y = (np.concatenate(a) for a in zip(*parts))
+            keep = lttb(x.astype(float), y, PLOT_POINTS)
+            if np.isfinite(t).all(): axis, values = "Time (h)", (t[keep] - t[0]) / 3600.0
+            else: axis, values = "Sample", x[keep]
+            trace[name] = {axis: values.tolist(), name: y[keep].tolist()}
+        return trace
+
+def summarize_cycles(cycles, last_complete=True):
+    """Headline figures over complete cycles (both charged and discharged).
+
+    last_complete=False drops the last cycle, for a log cut off before it finished.
+    """
+    if not last_complete: cycles = cycles.iloc[:-1]
+    full = cycles[(cycles["Charge Capacity (Ah)"] > 0) & (cycles["Discharge Capacity (Ah)"] > 0)]
+    summary = {"Cycles": len(full)}
+    if full.empty: return summary
+    summary["Mean Coulombic Efficiency (%)"] = f"{full['Coulombic Efficiency (%)'].mean():.2f}"
+    capacity = full["Discharge Capacity (Ah)"].to_numpy()
+    if len(full) >= 2 and capacity[0] > 0:
+        slope = np.polyfit(full["Cycle"].to_numpy(float), capacity, 1)[0]
+        summary["Capacity Retention (%)"] = f"{100 * capacity[-1] / capacity[0]:.2f}"
+        summary["Capacity Fade (%/100 cycles)"] = f"{-100 * 100 * slope / capacity[0]:.3f}"
+    return summary
@@ -0,0 +1,87 @@
+# compliance_core/bom_check.py
+# Batch compliance check of a bill of materials against the component database.
+# The BOM is resolved with a single merge on normalized part numbers and every
+# rule is a column-wise mask, so cost is independent of how many lines are looked up.
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import tracing
+from .component_index import normalize_part
+
+PART_COLUMN_HINTS = ("manufacturer part number", "mfr part number", "part number", "mpn", "part no", "part_number", "part")
+QUALIFIED_GRADES = ("AEC-Q100", "AEC-Q101", "AEC-Q200")   # Q200 covers passives
+DEFAULT_TEMP_RANGE = (-40.0, 125.0)                        # AEC Grade 1
+_TEMP = r"([-+]?\d+(?:\.\d+)?)\s*°?\s*C"
+
+def build_catalog(db):
+    """One row per database part with the columns the BOM rules need."""
+    catalog = pd.DataFrame.from_dict(dict(db.items()), orient="index")
+    catalog.index.name = "DB Part"
+    catalog = catalog.reset_index()
+    out = pd.DataFrame({"DB Part": catalog["DB Part"], "norm": catalog["DB Part"].map(normalize_part)})
+    for col in ("Manufacturer", "Product Category", "RoHS", "Qualification"):
+        out[col] = catalog[col] if col in catalog else np.nan
+    t_min = catalog.get("Minimum Operating Temperature", pd.Series(np.nan, index=catalog.index)).astype("string").str.extract(_TEMP)[0]
+    t_max = catalog.get("Maximum Operating Temperature", pd.Series(np.nan, index=catalog.index)).astype("string").str.extract(_TEMP)[0]
+    if "Operating Temperature Range" in catalog:
+        rng = catalog["Operating Temperature Range"].astype("string").str.extract(_TEMP + r"\s*to\s*" + _TEMP)
+        t_min, t_max = t_min.fillna(rng[0]), t_max.fillna(rng[1])
+    out["Temp Min (C)"] = pd.to_numeric(t_min, errors="coerce").astype(float)
+    out["Temp Max (C)"] = pd.to_numeric(t_max, errors="coerce").astype(float)
+    return out.drop_duplicates("norm")
+
+def read_bom(name, data):
+    ext = os.path.splitext(name.lower())[1]
+    bom = pd.read_excel(io.BytesIO(data), dtype=str) if ext in (".xlsx", ".xls") else pd.read_csv(io.BytesIO(data), dtype=str, sep=None, engine="python")
+    bom.columns = [str(c).strip() for c in bom.columns]
+    return bom
+
+def find_part_column(columns):
+    lowered = {c.lower(): c for c in columns}
+    for hint in PART_COLUMN_HINTS:
+        if hint in lowered: return lowered[hint]
+    return next((c for c in columns if "part" in c.lower() or "mpn" in c.lower()), None)
+
+@tracing.traced("bom.check")
+def check_bom(bom, catalog, part_column=None, temp_range=DEFAULT_TEMP_RANGE):
+    """Resolve every BOM line against the catalog and flag compliance issues.
+
+    Lines without a part number (blank rows, section separators) are skipped; Line keeps
+    the position in the BOM.
+    """
+    part_column = part_column or find_part_column(bom.columns)
+    if part_column is None: raise ValueError("No part-number column found in the BOM.")
+    parts = bom[part_column].fillna("").astype(str).str.strip()
+    lines = pd.DataFrame({"Line": np.arange(1, len(bom) + 1), "Part Number": parts.to_numpy(),
+        "norm": parts.str.lower().str.replace(r"[^0-9a-z]+", "", regex=True).to_numpy()})
+    lines = lines[lines["norm"] != ""]
+    merged = lines.merge(catalog, on="norm", how="left", sort=False)
+
+    missing = merged["DB Part"].isna().to_numpy()
+    known = ~missing
+    rohs = merged["RoHS"].astype("string").str.strip().str.lower().eq("yes").fillna(False).to_numpy()
+    qual = merged["Qualification"].astype("string").str.upper().str.contains("|".join(QUALIFIED_GRADES), regex=True).fillna(False).to_numpy()
+    t_min, t_max = merged["Temp Min (C)"].to_numpy(dtype=float), merged["Temp Max (C)"].to_numpy(dtype=float)
+    out_of_range = (t_min > temp_range[0]) | (t_max < temp_range[1])
+
+    flags = {"Not in database": missing, "Not RoHS": known & ~rohs,
+        "Not AEC-Q qualified": known & ~qual, "Temperature out of range": known & out_of_range}
+    issues = np.full(len(merged), "", dtype=object)
+    for label, mask in flags.items():
+        issues = np.where(mask, np.where(issues == "", label, issues + "; " + label), issues)
+    unknown_temp = known & (np.isnan(t_min) | np.isnan(t_max)) & ~out_of_range
+    status = np.where(issues != "", "FAIL", np.where(unknown_temp, "REVIEW", "PASS"))
+
+    merged["Issues"] = issues
+    merged["Status"] = status
+    cols = ["Line", "Part Number", "Status", "Issues", "Manufacturer", "Product Category", "RoHS",
+            "Qualification", "Temp Min (C)", "Temp Max (C)"]
+    return merged[cols]
+
+def summarize(result):
+    counts = result["Status"].value_counts()
+    return {"lines": len(result), "pass": int(counts.get("PASS", 0)), "review": int(counts.get("REVIEW", 0)),
+            "fail": int(counts.get("FAIL", 0))}
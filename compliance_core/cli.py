@@ -0,0 +1,212 @@
+# compliance_core/cli.py
+# Headless entry point: `compliance-check` (or `python -m compliance_core`).
+#   compliance-check verify reports/ --jobs 8 --format jsonl > results.jsonl
+#   compliance-check bom bom.xlsx --fail-on-fail
+#   compliance-check verify reports/ --check-limits > results.jsonl; compliance-check limits results.jsonl --format csv
+#   compliance-check parts ncp164 --limit 5
+#   compliance-check requirements "esd gun"
+#   compliance-check assets fetch          # on a connected machine, before shipping offline
+#   compliance-check --trace traces.jsonl verify reports/   # OTLP/JSON spans per stage
+import argparse
+import json
+import os
+import sys
+
+from . import asset_cache, bom_check, knowledge_store, limits, report_parser, tracing
+from .component_index import INDEXED_ATTRIBUTES, ComponentIndex
+from .requirement_search import RequirementIndex
+
+def _json_default(value):
+    # numpy scalars and the like, as produced by the parsers
+    if hasattr(value, "item"): return value.item()
+    return str(value)
+
+class _Writer:
+    """Streams records as JSON Lines, or collects them into one JSON array."""
+    def __init__(self, out, fmt):
+        self.out, self.fmt, self.items = out, fmt, []
+
+    def write(self, record):
+        if self.fmt == "json": self.items.append(record); return
+        self.out.write(json.dumps(record, default=_json_default, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    def close(self):
+        if self.fmt == "json": json.dump(self.items, self.out, default=_json_default, ensure_ascii=False, indent=2); self.out.write("\n")
+
+def _open_output(path):
+    return sys.stdout if path in (None, "-") else open(path, "w", encoding="utf-8")
+
+def _rows(frame):
+    # NaN is not valid JSON; missing values become null.
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+def _load_results(path):
+    # Output of `verify`, as JSON Lines or one JSON array.
+    with open(path, encoding="utf-8") as f: text = f.read()
+    entries = json.loads(text) if text.lstrip().startswith("[") else [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [(e["file"], e.get("tests") or []) for e in entries]
+
+# === Commands ===
+def cmd_verify(args):
+    out = _open_output(args.output)
+    writer, errors, failed = _Writer(out, args.format), 0, 0
+    table = limits.load_limits(args.limits) if args.check_limits else None
+    try:
+        for name, results, error in report_parser.verify_paths(args.paths, jobs=args.jobs):
+            status = "error" if error else "verified" if results else "no_data"
+            errors += bool(error)
+            record = {"file": name, "status": status, "tests": results, "error": error}
+            fail = any(t.get("Result") == "FAIL" for t in results)
+            if table is not None:
+                checks = limits.check_reports([(name, results)], table)
+                record["requirements"] = _rows(checks.drop(columns="File"))
+                fail = fail or (checks["Status"] == limits.FAIL).any()
+            failed += bool(fail)
+            writer.write(record)
+        writer.close()
+    finally:
+        if out is not sys.stdout: out.close()
+    print(f"{errors} file(s) with errors, {failed} file(s) with failing tests", file=sys.stderr)
+    return 1 if errors or (args.fail_on_fail and failed) else 0
+
+def cmd_bom(args):
+    with open(args.bom, "rb") as f: bom = bom_check.read_bom(args.bom, f.read())
+    catalog = bom_check.build_catalog(knowledge_store.components())
+    result = bom_check.check_bom(bom, catalog, part_column=args.part_column, temp_range=(args.temp_min, args.temp_max))
+    out = _open_output(args.output)
+    try:
+        if args.format == "csv": result.to_csv(out, index=False)
+        else:
+            writer = _Writer(out, args.format)
+            for record in result.to_dict(orient="records"): writer.write(record)
+            writer.close()
+    finally:
+        if out is not sys.stdout: out.close()
+    summary = bom_check.summarize(result)
+    print(f"{summary['lines']} line(s): {summary['pass']} pass, {summary['review']} review, {summary['fail']} fail", file=sys.stderr)
+    return 1 if args.fail_on_fail and summary["fail"] else 0
+
+def cmd_limits(args):
+    result = limits.check_reports(_load_results(args.results), limits.load_limits(args.limits))
+    out = _open_output(args.output)
+    try:
+        if args.format == "csv": result.to_csv(out, index=False)
+        else:
+            writer = _Writer(out, args.format)
+            for record in _rows(result): writer.write(record)
+            writer.close()
+    finally:
+        if out is not sys.stdout: out.close()
+    summary = limits.summarize(result)
+    print(f"{summary['requirements']} requirement check(s): {summary['pass']} pass, {summary['fail']} fail, "
+          f"{summary['not_measured']} not measured", file=sys.stderr)
+    return 1 if args.fail_on_fail and summary["fail"] else 0
+
+def cmd_parts(args):
+    db = knowledge_store.components()
+    filters = {a: getattr(args, a.lower().replace(" ", "_")) for a in INDEXED_ATTRIBUTES}
+    writer = _Writer(sys.stdout, args.format)
+    for hit in ComponentIndex(db).search(args.query, filters=filters, limit=args.limit):
+        writer.write({"part": hit.part, "score": round(hit.score, 4), "match": hit.match, "record": db[hit.part]})
+    writer.close()
+    return 0
+
+def cmd_requirements(args):
+    kb = knowledge_store.test_cases()
+    writer = _Writer(sys.stdout, args.format)
+    for hit in RequirementIndex(kb).search(args.query, limit=args.limit):
+        entry = kb[hit.key]
+        record = {"key": hit.key, "score": round(hit.score, 4), "name": entry.get("name"), "standard": entry.get("standard")}
+        if args.full: record.update(entry)
+        writer.write(record)
+    writer.close()
+    return 0
+
+def cmd_assets(args):
+    if args.action == "add":
+        with open(args.file, "rb") as f: print(asset_cache.add_image(args.url, f.read()))
+        return 0
+    if args.action == "fetch":
+        errors = 0
+        for url, state in asset_cache.prefetch(args.urls or None, refresh=args.refresh):
+            errors += state.startswith("error")
+            print(f"{state:<8} {url}")
+        if errors: return 1
+    counts = asset_cache.status()
+    print(f"{counts['cached']}/{counts['images']} knowledge-base image(s) available offline in {asset_cache.ASSET_DIR}", file=sys.stderr)
+    return 0
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="compliance-check", description="Regulatory compliance & safety checks without the web UI.")
+    ap.add_argument("--trace", metavar="TARGET", default=None,
+                    help="export per-stage spans as OTLP/JSON to a file or an OTLP/HTTP collector URL")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    v = sub.add_parser("verify", help="verify test reports (files, directories or ZIP bundles)")
+    v.add_argument("paths", nargs="+")
+    v.add_argument("--jobs", "-j", type=int, default=None, help="parallel worker processes (default: CPU count)")
+    v.add_argument("--format", choices=("jsonl", "json"), default="jsonl")
+    v.add_argument("--output", "-o", default="-", help="output file (default: stdout)")
+    v.add_argument("--fail-on-fail", action="store_true", help="exit 1 if any extracted test (or, with --check-limits, requirement) FAILs")
+    v.add_argument("--check-limits", action="store_true", help="check each report against the standards' limits catalogue")
+    v.add_argument("--limits", default=None, metavar="CATALOGUE", help="limits catalogue for --check-limits (default: the bundled one)")
+    v.set_defaults(func=cmd_verify)
+
+    lim = sub.add_parser("limits", help="re-check saved verify output against the limits catalogue")
+    lim.add_argument("results", help="output of `verify` (JSON Lines or JSON)")
+    lim.add_argument("--limits", default=None, metavar="CATALOGUE", help="limits catalogue (default: the bundled one)")
+    lim.add_argument("--format", choices=("jsonl", "json", "csv"), default="jsonl")
+    lim.add_argument("--output", "-o", default="-")
+    lim.add_argument("--fail-on-fail", action="store_true", help="exit 1 if any requirement FAILs")
+    lim.set_defaults(func=cmd_limits)
+
+    b = sub.add_parser("bom", help="check a BOM (CSV/XLSX) against the component database")
+    b.add_argument("bom")
+    b.add_argument("--part-column", default=None)
+    b.add_argument("--temp-min", type=float, default=bom_check.DEFAULT_TEMP_RANGE[0])
+    b.add_argument("--temp-max", type=float, default=bom_check.DEFAULT_TEMP_RANGE[1])
+    b.add_argument("--format", choices=("jsonl", "json", "csv"), default="jsonl")
+    b.add_argument("--output", "-o", default="-")
+    b.add_argument("--fail-on-fail", action="store_true", help="exit 1 if any BOM line FAILs")
+    b.set_defaults(func=cmd_bom)
+
+    p = sub.add_parser("parts", help="search the component database")
+    p.add_argument("query", nargs="?", default="")
+    for a in INDEXED_ATTRIBUTES: p.add_argument(f"--{a.lower().replace(' ', '-')}", action="append", default=None)
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--format", choices=("jsonl", "json"), default="jsonl")
+    p.set_defaults(func=cmd_parts)
+
+    r = sub.add_parser("requirements", help="ranked test-procedure lookup")
+    r.add_argument("query")
+    r.add_argument("--limit", type=int, default=5)
+    r.add_argument("--full", action="store_true", help="include procedure, equipment and description")
+    r.add_argument("--format", choices=("jsonl", "json"), default="jsonl")
+    r.set_defaults(func=cmd_requirements)
+
+    a = sub.add_parser("assets", help="manage the offline image cache")
+    asub = a.add_subparsers(dest="action", required=True)
+    f = asub.add_parser("fetch", help="download knowledge-base images (or the given URLs) that are not cached yet")
+    f.add_argument("urls", nargs="*")
+    f.add_argument("--refresh", action="store_true", help="download again even if cached")
+    add = asub.add_parser("add", help="register a local image file for a URL")
+    add.add_argument("url")
+    add.add_argument("file")
+    asub.add_parser("status", help="how many knowledge-base images are available offline")
+    a.set_defaults(func=cmd_assets)
+    return ap
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        os.environ["COMPLIANCE_TRACE_EXPORT"] = args.trace   # inherited by the verify worker processes
+        tracing.configure_export(args.trace)
+    try: return args.func(args)
+    except BrokenPipeError:
+        # Output piped into head or similar. Caught before OSError, of which it is a subclass.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"compliance-check: {e}", file=sys.stderr)
+        return 2
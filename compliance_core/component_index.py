@@ -0,0 +1,132 @@
+# compliance_core/component_index.py
+# Search index over the component database: exact / prefix lookup on normalized part
+# numbers through a sorted array, typo-tolerant matching through a trigram index, and
+# inverted indexes on the attributes users filter by. Built once and shared read-only.
+import bisect
+import re
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+from . import tracing
+
+INDEXED_ATTRIBUTES = ("Manufacturer", "Product Category", "Qualification")
+NGRAM = 3
+FUZZY_CANDIDATES = 200       # candidates re-scored after trigram counting
+MIN_FUZZY_SCORE = 0.3
+
+SearchHit = namedtuple("SearchHit", ["part", "score", "match"])
+
+_strip = re.compile(r"[^0-9a-z]+")
+
+def normalize_part(part):
+    return _strip.sub("", str(part).lower())
+
+def _ngrams(norm):
+    padded = f"^{norm}$"
+    return {padded[i:i + NGRAM] for i in range(max(len(padded) - NGRAM + 1, 1))}
+
+class ComponentIndex:
+    def __init__(self, db, attributes=INDEXED_ATTRIBUTES):
+        self.db = db
+        records = dict(db.items())
+        self.parts = list(records)
+        self.norms = [normalize_part(p) for p in self.parts]
+
+        # Sorted array of normalized part numbers for exact and prefix lookups.
+        order = sorted(range(len(self.parts)), key=self.norms.__getitem__)
+        self._sorted_norms = [self.norms[i] for i in order]
+        self._sorted_ids = np.asarray(order, dtype=np.int32)
+
+        # Trigram postings, stored as int32 arrays so candidate counting is vectorized.
+        postings = defaultdict(list)
+        self._gram_counts = np.empty(len(self.parts), dtype=np.int32)
+        for i, norm in enumerate(self.norms):
+            grams = _ngrams(norm)
+            self._gram_counts[i] = len(grams)
+            for g in grams: postings[g].append(i)
+        self._postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+
+        # Inverted indexes: attribute -> normalized value -> sorted part ids.
+        attr_postings = {a: defaultdict(list) for a in attributes}
+        self._labels = {a: {} for a in attributes}
+        for i, record in enumerate(records.values()):
+            for a in attributes:
+                value = record.get(a)
+                if value is None: continue
+                key = str(value).strip().lower()
+                attr_postings[a][key].append(i)
+                self._labels[a].setdefault(key, str(value).strip())
+        self._attributes = {a: {v: np.asarray(ids, dtype=np.int32) for v, ids in vals.items()} for a, vals in attr_postings.items()}
+
+    def __len__(self):
+        return len(self.parts)
+
+    def values(self, attribute):
+        # Distinct display values of an indexed attribute, for filter widgets.
+        return sorted(self._labels.get(attribute, {}).values(), key=str.lower)
+
+    def _filter_mask(self, filters):
+        # Boolean mask of parts passing every filter; None means "no restriction".
+        allowed = None
+        for attribute, wanted in (filters or {}).items():
+            if not wanted: continue
+            if isinstance(wanted, str): wanted = [wanted]
+            index = self._attributes.get(attribute, {})
+            mask = np.zeros(len(self.parts), dtype=bool)
+            for w in wanted:
+                ids = index.get(w.strip().lower())
+                if ids is not None: mask[ids] = True
+            allowed = mask if allowed is None else allowed & mask
+        return allowed
+
+    def _prefix_ids(self, norm):
+        # Exact matches sort first within the prefix range, so both are slices.
+        lo = bisect.bisect_left(self._sorted_norms, norm)
+        mid = bisect.bisect_right(self._sorted_norms, norm, lo)
+        hi = bisect.bisect_left(self._sorted_norms, norm + "\x7f", mid)
+        return self._sorted_ids[lo:mid], self._sorted_ids[mid:hi]
+
+    def _fuzzy(self, norm, allowed):
+        grams = [self._postings[g] for g in _ngrams(norm) if g in self._postings]
+        if not grams: return np.empty(0, dtype=np.int32), np.empty(0)
+        ids, shared = np.unique(np.concatenate(grams), return_counts=True)
+        if allowed is not None:
+            keep = allowed[ids]
+            ids, shared = ids[keep], shared[keep]
+        # Dice coefficient on trigram sets.
+        scores = 2.0 * shared / (self._gram_counts[ids] + len(_ngrams(norm)))
+        if len(ids) > FUZZY_CANDIDATES:
+            top = np.argpartition(-scores, FUZZY_CANDIDATES)[:FUZZY_CANDIDATES]
+            ids, scores = ids[top], scores[top]
+        keep = scores >= MIN_FUZZY_SCORE
+        return ids[keep], scores[keep]
+
+    @tracing.traced("components.search")
+    def search(self, query, filters=None, limit=20):
+        """Ranked hits for a part-number query: exact, then prefix, then fuzzy matches."""
+        norm = normalize_part(query)
+        allowed = self._filter_mask(filters)
+        if not norm:
+            if allowed is None: return []
+            return [SearchHit(self.parts[i], 1.0, "filter") for i in np.flatnonzero(allowed)[:limit]]
+
+        hits, seen = [], set()
+        def add(ids, score_of, match):
+            for i in ids:
+                i = int(i)
+                if i in seen or (allowed is not None and not allowed[i]): continue
+                seen.add(i); hits.append(SearchHit(self.parts[i], score_of(i), match))
+
+        exact, prefix = self._prefix_ids(norm)
+        if allowed is not None: prefix = prefix[allowed[prefix]]
+        add(exact, lambda i: 1.0, "exact")
+        # Shorter completions rank first among prefix matches.
+        by_len = sorted(prefix[:limit * 4], key=lambda i: len(self.norms[i]))
+        add(by_len, lambda i: 0.5 + 0.4 * len(norm) / len(self.norms[i]), "prefix")
+        if len(hits) < limit:
+            ids, scores = self._fuzzy(norm, allowed)
+            order = np.argsort(-scores, kind="stable")
+            score_map = dict(zip(ids.tolist(), scores.tolist()))
+            add(ids[order], lambda i: 0.5 * score_map[i], "fuzzy")
+        return hits[:limit]
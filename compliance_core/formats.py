@@ -0,0 +1,83 @@
+# compliance_core/formats.py
+# Content sniffing and the parser registry. A file's format is decided from its first
+# SNIFF_BYTES (plus, for ZIP containers, the central directory listing) rather than from
+# its name, and the parsers registered for that format are tried cheapest first, so a
+# mislabeled file or a vendor cycler export goes straight to the parser that fits it.
+import codecs
+import io
+import zipfile
+from collections import namedtuple
+
+from . import tracing
+
+SNIFF_BYTES = 8192
+
+_MAGIC = ((b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"), (b"PK\x03\x04", "zip"), (b"PK\x05\x06", "zip"))
+_BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+_OFFICE = (("word/document.xml", "docx"), ("xl/workbook.xml", "xlsx"))
+UNSUPPORTED = {"ole": "Legacy binary Office file (.doc/.xls); save it as DOCX or XLSX first.",
+               "zip": "ZIP archive; upload it as a bundle so its reports are unpacked.",
+               "binary": "Unrecognized binary file."}
+
+class Sniffed(namedtuple("Sniffed", ["kind", "encoding", "head", "truncated"])):
+    """kind is one of pdf, docx, xlsx, text, zip, ole or binary; encoding is set for text."""
+    @property
+    def text(self):
+        # Decoded head without the trailing partial line.
+        text = self.head.decode(self.encoding or "utf-8", errors="replace")
+        return text.rsplit("\n", 1)[0] if self.truncated else text
+
+Parser = namedtuple("Parser", ["name", "kinds", "cost", "parse", "accepts"])
+_registry = []
+
+def _zip_kind(data):
+    # Only the central directory is read, not the members.
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf: names = set(zf.namelist())
+    except zipfile.BadZipFile: return "binary"
+    return next((kind for member, kind in _OFFICE if member in names), "zip")
+
+def sniff(data):
+    head, truncated = bytes(data[:SNIFF_BYTES]), len(data) > SNIFF_BYTES
+    if b"%PDF-" in head[:1024]: return Sniffed("pdf", None, head, truncated)   # may follow a little junk
+    for magic, kind in _MAGIC:
+        if head.startswith(magic): return Sniffed(_zip_kind(data) if kind == "zip" else kind, None, head, truncated)
+    for bom, encoding in _BOMS:
+        if head.startswith(bom): return Sniffed("text", encoding, head, truncated)
+    if b"\x00" in head: return Sniffed("binary", None, head, truncated)
+    return Sniffed("text", "utf-8", head, truncated)
+
+# === Registry ===
+def register(name, kinds, cost, parse, accepts=None):
+    """Register parse(data, sniffed) -> list of test records ([] if it finds nothing) for the
+    given sniffed kinds. cost orders candidates; accepts(sniffed) may rule a parser out from
+    the head alone, and a parser it accepts owns the file if it fails."""
+    _registry.append(Parser(name, tuple(kinds), cost, parse, accepts))
+    _registry.sort(key=lambda p: p.cost)
+
+def candidates(sniffed):
+    return [p for p in _registry if sniffed.kind in p.kinds and (p.accepts is None or p.accepts(sniffed))]
+
+def parse(data, sniffed=None):
+    """Run the cheapest matching parser that yields results.
+
+    A parser whose accepts() recognized the head has identified the file, so its error is
+    raised at once rather than falling back to a slower generic parser (a full-text pass
+    over a large cycler log). Other parsers that raise do not stop the cheaper-first chain,
+    but their error is re-raised if no later parser finds anything, so broken files are
+    reported instead of coming back as "no data".
+    """
+    sniffed = sniffed or sniff(data)
+    found = candidates(sniffed)
+    if not found: raise ValueError(UNSUPPORTED.get(sniffed.kind, f"No parser for {sniffed.kind} files."))
+    error = None
+    for parser in found:
+        try:
+            with tracing.span(f"parse.{parser.name}"): results = parser.parse(data, sniffed)
+        except Exception as e:
+            if parser.accepts is not None: raise
+            error = error or e
+            continue
+        if results: return results
+    if error is not None: raise error
+    return []
@@ -0,0 +1,126 @@
+# compliance_core/history_store.py
+# Append-only activity history shared by every session, with dashboard rollups.
+# Events go into an embedded SQLite database in WAL mode (readers never block the
+# writer). Triggers fold each inserted event into per-day, per-test-type and
+# per-component rollup rows, so the dashboard reads a handful of pre-aggregated
+# rows instead of scanning the event log.
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+HISTORY_PATH = os.environ.get("COMPLIANCE_HISTORY_PATH") or os.path.join(
+    DATA_DIR if os.access(DATA_DIR, os.W_OK) else tempfile.gettempdir(), "history.sqlite")   # installed read-only
+BUSY_TIMEOUT_MS = 5000
+
+# Event kinds
+REPORT = "report"            # one uploaded file; result: VERIFIED / NO DATA / ERROR
+TEST = "test"                # one test record extracted from a report; result: PASS / FAIL / ...
+GENERATION = "generation"    # one generated requirement; test_type is the KB key
+COMPONENT = "component"      # one checked BOM line; result: PASS / REVIEW / FAIL
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, day TEXT NOT NULL, kind TEXT NOT NULL, session TEXT,
+    subject TEXT, test_type TEXT, component TEXT, result TEXT);
+
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    day TEXT NOT NULL, kind TEXT NOT NULL, events INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (day, kind)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS test_type_rollup (
+    test_type TEXT NOT NULL, kind TEXT NOT NULL, events INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (test_type, kind)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS component_rollup (
+    component TEXT PRIMARY KEY, events INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0, review INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS component_rollup_rank ON component_rollup (failed DESC, events DESC);
+
+CREATE TRIGGER IF NOT EXISTS events_rollup AFTER INSERT ON events BEGIN
+    INSERT INTO daily_rollup (day, kind, events, passed, failed)
+        VALUES (NEW.day, NEW.kind, 1, IFNULL(NEW.result IN ('PASS', 'VERIFIED'), 0), IFNULL(NEW.result IN ('FAIL', 'ERROR'), 0))
+        ON CONFLICT (day, kind) DO UPDATE SET events = events + 1,
+            passed = passed + excluded.passed, failed = failed + excluded.failed;
+    INSERT INTO test_type_rollup (test_type, kind, events, passed, failed)
+        SELECT NEW.test_type, NEW.kind, 1, IFNULL(NEW.result = 'PASS', 0), IFNULL(NEW.result = 'FAIL', 0) WHERE NEW.test_type IS NOT NULL
+        ON CONFLICT (test_type, kind) DO UPDATE SET events = events + 1,
+            passed = passed + excluded.passed, failed = failed + excluded.failed;
+    INSERT INTO component_rollup (component, events, passed, review, failed)
+        SELECT NEW.component, 1, IFNULL(NEW.result = 'PASS', 0), IFNULL(NEW.result = 'REVIEW', 0), IFNULL(NEW.result = 'FAIL', 0) WHERE NEW.component IS NOT NULL
+        ON CONFLICT (component) DO UPDATE SET events = events + 1, passed = passed + excluded.passed,
+            review = review + excluded.review, failed = failed + excluded.failed;
+END;
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+def _connection(path=None):
+    path = path or HISTORY_PATH
+    cons = getattr(_local, "cons", None)
+    if cons is None: cons = _local.cons = {}
+    con = cons.get(path)
+    if con is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        con = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False)
+        con.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        con.execute("PRAGMA journal_mode = WAL")
+        con.execute("PRAGMA synchronous = NORMAL")
+        with _init_lock:
+            if path not in _initialized:
+                con.executescript(_SCHEMA); _initialized.add(path)
+        cons[path] = con
+    return con
+
+# === Writing ===
+def record_events(events, path=None):
+    """Append (kind, session, subject, test_type, component, result) tuples in one transaction."""
+    now = time.time()
+    day = time.strftime("%Y-%m-%d", time.localtime(now))
+    rows = [(now, day) + tuple(e) for e in events]
+    if not rows: return 0
+    con = _connection(path)
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        con.executemany("INSERT INTO events (ts, day, kind, session, subject, test_type, component, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK"); raise
+    return len(rows)
+
+def record_verification(session, outcomes, path=None):
+    # outcomes: (file name, parsed records, error) as produced by report_parser.parse_many
+    events = []
+    for name, results, error in outcomes:
+        events.append((REPORT, session, name, None, None, "ERROR" if error else "VERIFIED" if results else "NO DATA"))
+        for t in results:
+            events.append((TEST, session, name, t.get("TestKey") or t.get("TestName"), None, t.get("Result")))
+    return record_events(events, path)
+
+def record_generation(session, query, test_key, path=None):
+    return record_events([(GENERATION, session, query, test_key, None, None)], path)
+
+def record_bom_check(session, bom_name, result, path=None):
+    # result: the frame returned by bom_check.check_bom
+    parts = result["Part Number"].str.lower().tolist()
+    return record_events(((COMPONENT, session, bom_name, None, p, s) for p, s in zip(parts, result["Status"].tolist())), path)
+
+# === Reading rollups ===
+def totals(path=None):
+    rows = _connection(path).execute("SELECT kind, SUM(events), SUM(passed), SUM(failed) FROM daily_rollup GROUP BY kind").fetchall()
+    return {kind: {"events": n, "passed": p, "failed": f} for kind, n, p, f in rows}
+
+def daily(days=30, path=None):
+    cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - days * 86400))
+    return _connection(path).execute(
+        "SELECT day, kind, events, passed, failed FROM daily_rollup WHERE day > ? ORDER BY day", (cutoff,)).fetchall()
+
+def by_test_type(kind=TEST, limit=20, path=None):
+    return _connection(path).execute(
+        "SELECT test_type, events, passed, failed FROM test_type_rollup WHERE kind = ? ORDER BY events DESC LIMIT ?", (kind, limit)).fetchall()
+
+def by_component(limit=20, path=None):
+    return _connection(path).execute(
+        "SELECT component, events, passed, review, failed FROM component_rollup ORDER BY failed DESC, events DESC LIMIT ?", (limit,)).fetchall()
@@ -0,0 +1,272 @@
+# compliance_core/job_store.py
+# Background verification jobs. An upload is submitted as a batch of files; each file is
+# a job keyed by the SHA-256 of its content, so the same report uploaded twice (or by two
+# users, or again after a rerun) is parsed once. Jobs run on report_parser's per-format
+# thread pools in the server process and report progress as they go; their state and finished results
+# live in a SQLite store (WAL mode, like history_store), so a session can poll it, pick
+# up files as they finish, or close the tab and come back to the results later. Uploads
+# are spooled to disk until their job finishes, so queued work survives a restart.
+# Several server processes can share the store: each job row names the process that owns
+# it, processes send a heartbeat, and jobs of a process that stopped are claimed
+# atomically by one of the others (or by the next one to start).
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+from . import formats, history_store, report_parser, tracing
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+JOBS_PATH = os.environ.get("COMPLIANCE_JOBS_PATH") or os.path.join(
+    DATA_DIR if os.access(DATA_DIR, os.W_OK) else tempfile.gettempdir(), "jobs.sqlite")   # installed read-only
+BUSY_TIMEOUT_MS = 5000
+RETENTION_DAYS = 30          # batches and results kept after they finish
+PROGRESS_INTERVAL = 0.5      # seconds between progress writes per job
+RESULT_CACHE_SIZE = 256      # decoded results of finished jobs kept in memory
+HEARTBEAT_INTERVAL = 10.0    # seconds between a process's heartbeats (and checks for orphaned jobs)
+OWNER_TIMEOUT = 3 * HEARTBEAT_INTERVAL   # a process silent for longer has stopped
+PRUNE_EVERY = 360            # heartbeats between prunes of expired batches (about an hour)
+
+QUEUED, RUNNING, DONE, ERROR = "queued", "running", "done", "error"
+PENDING = (QUEUED, RUNNING)
+
+Job = namedtuple("Job", ["name", "hash", "kind", "bytes", "status", "progress", "submitted", "started", "finished", "results", "error"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    hash TEXT PRIMARY KEY, name TEXT, kind TEXT, bytes INTEGER, status TEXT NOT NULL, progress REAL NOT NULL DEFAULT 0,
+    submitted REAL, started REAL, finished REAL, results TEXT, error TEXT, owner TEXT) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS owners (id TEXT PRIMARY KEY, pid INTEGER, seen REAL NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS batches (id TEXT PRIMARY KEY, session TEXT, created REAL NOT NULL, recorded INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS batch_files (
+    batch TEXT NOT NULL, position INTEGER NOT NULL, name TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (batch, position)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS batches_session ON batches (session, created DESC);
+CREATE INDEX IF NOT EXISTS files_status ON files (status);
+"""
+
+# A pending job may be taken over when no live process owns it.
+_ORPHANED = "(files.owner IS NULL OR files.owner NOT IN (SELECT id FROM owners WHERE seen >= ?))"
+
+def _json_default(value):
+    # numpy scalars and arrays, as produced by the parsers
+    if hasattr(value, "tolist"): return value.tolist()
+    return str(value)
+
+class JobQueue:
+    def __init__(self, path=None, max_workers=None):
+        self.path = path or JOBS_PATH
+        self.spool_dir = os.path.join(os.path.dirname(os.path.abspath(self.path)), "job_spool")
+        self._pools = report_parser.FormatPools(max_workers, prefix="job")
+        self._local, self._lock = threading.local(), threading.Lock()
+        self._active, self._results = set(), OrderedDict()
+        self.owner = uuid.uuid4().hex
+        os.makedirs(self.spool_dir, exist_ok=True)
+        con = self._con()
+        con.executescript(_SCHEMA)
+        if "owner" not in {row[1] for row in con.execute("PRAGMA table_info(files)")}:    # stores from before owners
+            con.execute("ALTER TABLE files ADD COLUMN owner TEXT")
+        self._heartbeat()
+        self._claim_orphans()
+        self._prune()
+        threading.Thread(target=self._keep_alive, name="job-heartbeat", daemon=True).start()
+
+    def _con(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False)
+            con.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            con.execute("PRAGMA journal_mode = WAL")
+            con.execute("PRAGMA synchronous = NORMAL")
+            self._local.con = con
+        return con
+
+    def _spool_path(self, key):
+        return os.path.join(self.spool_dir, key)
+
+    # === Ownership ===
+    def _heartbeat(self):
+        self._con().execute("INSERT OR REPLACE INTO owners (id, pid, seen) VALUES (?, ?, ?)", (self.owner, os.getpid(), time.time()))
+
+    def _keep_alive(self):
+        # Long-running servers are pruned here too, not only when a queue is opened.
+        for beat in itertools.count(1):
+            time.sleep(HEARTBEAT_INTERVAL)
+            try:
+                self._heartbeat(); self._claim_orphans()
+                if beat % PRUNE_EVERY == 0: self._prune()
+            except sqlite3.Error: continue       # locked or briefly unavailable; retried on the next beat
+
+    def _claim_orphans(self):
+        # Jobs of a stopped process are resumed from the spool. Each row is claimed with one
+        # conditional UPDATE, so when several processes look at once only one restarts it.
+        con, now = self._con(), time.time()
+        alive = now - OWNER_TIMEOUT
+        rows = con.execute(f"SELECT hash, kind FROM files WHERE status IN (?, ?) AND {_ORPHANED}", (*PENDING, alive)).fetchall()
+        for key, kind in rows:
+            if os.path.exists(self._spool_path(key)):
+                claimed = con.execute(f"UPDATE files SET status = ?, owner = ?, progress = 0 WHERE hash = ? AND status IN (?, ?) AND {_ORPHANED}",
+                                      (QUEUED, self.owner, key, *PENDING, alive)).rowcount == 1
+                if claimed:
+                    with self._lock: self._start(key, kind)
+            elif con.execute(f"UPDATE files SET status = ?, error = ?, finished = ?, owner = ? WHERE hash = ? AND status IN (?, ?) AND {_ORPHANED}",
+                             (ERROR, "Interrupted by a server restart; upload the file again.", now, self.owner, key, *PENDING, alive)).rowcount == 1:
+                self._record_finished(key)
+
+    def _prune(self):
+        con, now = self._con(), time.time()
+        cutoff = now - RETENTION_DAYS * 86400
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.execute("DELETE FROM batch_files WHERE batch IN (SELECT id FROM batches WHERE created < ?)", (cutoff,))
+            con.execute("DELETE FROM batches WHERE created < ?", (cutoff,))
+            con.execute("DELETE FROM files WHERE finished < ? AND hash NOT IN (SELECT hash FROM batch_files)", (cutoff,))
+            con.execute("DELETE FROM owners WHERE seen < ?", (now - OWNER_TIMEOUT,))
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK"); raise
+
+    # === Submitting ===
+    def submit(self, files, session=None):
+        """Queue (name, bytes) uploads (ZIP bundles are unpacked) as one batch; returns its id.
+
+        Files whose content was already verified are not parsed again, and files that are
+        already queued or running are shared with the batch that submitted them first.
+        """
+        items = list(report_parser.expand_uploads(files))
+        if not items: raise ValueError("No supported report files were found in the upload.")
+        batch, con, rows = uuid.uuid4().hex, self._con(), []
+        for position, (name, data) in enumerate(items):
+            key = hashlib.sha256(data).hexdigest()
+            rows.append((batch, position, name, key))
+            self._enqueue(key, name, data)
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.execute("INSERT INTO batches (id, session, created) VALUES (?, ?, ?)", (batch, session, time.time()))
+            con.executemany("INSERT INTO batch_files (batch, position, name, hash) VALUES (?, ?, ?, ?)", rows)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK"); raise
+        self._record_batch(batch)               # every file may already have been verified
+        return batch
+
+    def _enqueue(self, key, name, data):
+        with self._lock:
+            if key in self._active: return
+            con = self._con()
+            row = con.execute("SELECT status FROM files WHERE hash = ?", (key,)).fetchone()
+            if row is not None and row[0] == DONE: return
+            kind = formats.sniff(data).kind
+            # New, failed and orphaned jobs are (re)queued here; one pending in a live process is shared.
+            claimed = con.execute(
+                "INSERT INTO files (hash, name, kind, bytes, status, progress, submitted, owner) VALUES (?, ?, ?, ?, ?, 0, ?, ?) "
+                "ON CONFLICT (hash) DO UPDATE SET name = excluded.name, status = excluded.status, progress = 0, "
+                "submitted = excluded.submitted, owner = excluded.owner, started = NULL, finished = NULL, results = NULL, error = NULL "
+                f"WHERE files.status = ? OR (files.status IN (?, ?) AND {_ORPHANED})",
+                (key, name, kind, len(data), QUEUED, time.time(), self.owner, ERROR, *PENDING, time.time() - OWNER_TIMEOUT)).rowcount == 1
+            if not claimed: return
+            spool, tmp = self._spool_path(key), f"{self._spool_path(key)}.{self.owner}.tmp"
+            with open(tmp, "wb") as f: f.write(data)
+            os.replace(tmp, spool)
+            self._start(key, kind)
+
+    def _start(self, key, kind):
+        # Only the hash is queued; the worker reads the spooled bytes, so waiting jobs hold no memory.
+        self._active.add(key)
+        self._pools.submit(kind, self._run, key)
+
+    # === Running ===
+    def _run(self, key):
+        con, last = self._con(), [0.0]
+        def progress(done, total):
+            now = time.monotonic()
+            if now - last[0] < PROGRESS_INTERVAL: return
+            last[0] = now
+            con.execute("UPDATE files SET progress = ? WHERE hash = ?", (min(done / total, 0.99), key))
+        try:
+            con.execute("UPDATE files SET status = ?, started = ? WHERE hash = ?", (RUNNING, time.time(), key))
+            name = con.execute("SELECT name FROM files WHERE hash = ?", (key,)).fetchone()[0]
+            with open(self._spool_path(key), "rb") as f: data = f.read()
+            with tracing.span("job.run", file=name, bytes=len(data)):
+                results = report_parser.parse_report(name, data, progress=progress)
+            con.execute("UPDATE files SET status = ?, progress = 1, finished = ?, results = ? WHERE hash = ?",
+                        (DONE, time.time(), json.dumps(results, default=_json_default), key))
+        except Exception as e:
+            con.execute("UPDATE files SET status = ?, finished = ?, error = ? WHERE hash = ?", (ERROR, time.time(), str(e), key))
+        finally:
+            try: os.remove(self._spool_path(key))
+            except OSError: pass
+            with self._lock: self._active.discard(key)
+            self._record_finished(key)
+
+    # === History ===
+    def _record_finished(self, key):
+        # A batch goes into the activity history when its last job finishes, whether or not
+        # a session is still watching it; mark_recorded keeps it to one entry across processes.
+        try: batches = self._con().execute("SELECT DISTINCT b.batch FROM batch_files b JOIN batches bt ON bt.id = b.batch "
+                                           "WHERE b.hash = ? AND bt.recorded = 0", (key,)).fetchall()
+        except sqlite3.Error: return
+        for (batch_id,) in batches: self._record_batch(batch_id)
+
+    def _record_batch(self, batch_id):
+        try:
+            jobs = self.batch(batch_id)
+            if not jobs or any(j.status in PENDING for j in jobs) or not self.mark_recorded(batch_id): return
+            session = self._con().execute("SELECT session FROM batches WHERE id = ?", (batch_id,)).fetchone()[0]
+            history_store.record_verification(session, outcomes(jobs))
+        except Exception:
+            pass                                 # history is best effort; a failure never fails the verification
+
+    # === Reading ===
+    def _decoded(self, key, finished):
+        # Finished results never change, so they are decoded once per process.
+        cache_key = (key, finished)
+        with self._lock:
+            if cache_key in self._results:
+                self._results.move_to_end(cache_key)
+                return self._results[cache_key]
+        row = self._con().execute("SELECT results FROM files WHERE hash = ?", (key,)).fetchone()
+        results = json.loads(row[0]) if row and row[0] else []
+        with self._lock:
+            self._results[cache_key] = results
+            while len(self._results) > RESULT_CACHE_SIZE: self._results.popitem(last=False)
+        return results
+
+    def batch(self, batch_id):
+        """Jobs of a batch in upload order; results are filled in for finished files only."""
+        rows = self._con().execute(
+            "SELECT b.name, f.hash, f.kind, f.bytes, f.status, f.progress, f.submitted, f.started, f.finished, f.error "
+            "FROM batch_files b JOIN files f ON f.hash = b.hash WHERE b.batch = ? ORDER BY b.position", (batch_id,)).fetchall()
+        return [Job(name, key, kind, size, status, progress, submitted, started, finished,
+                    self._decoded(key, finished) if status == DONE else [], error)
+                for name, key, kind, size, status, progress, submitted, started, finished, error in rows]
+
+    def recent_batches(self, session=None, limit=20):
+        """(batch id, created, files, files finished) of recent batches, newest first; all sessions if session is None."""
+        where, args = ("WHERE bt.session = ?", (session, limit)) if session else ("", (limit,))
+        return self._con().execute(
+            "SELECT bt.id, bt.created, COUNT(*), SUM(f.status IN ('done', 'error')) FROM batches bt "
+            f"JOIN batch_files b ON b.batch = bt.id JOIN files f ON f.hash = b.hash {where} "
+            "GROUP BY bt.id ORDER BY bt.created DESC LIMIT ?", args).fetchall()
+
+    def mark_recorded(self, batch_id):
+        """True for the first caller only, so a finished batch goes into the activity history once."""
+        return self._con().execute("UPDATE batches SET recorded = 1 WHERE id = ? AND recorded = 0", (batch_id,)).rowcount == 1
+
+def outcomes(jobs):
+    """(name, results, error) of the finished jobs, as produced by report_parser.parse_many."""
+    return [(j.name, j.results, j.error) for j in jobs if j.status not in PENDING]
+
+_queue, _queue_lock = None, threading.Lock()
+
+def get_queue():
+    # One queue per server process, shared by every session and rerun.
+    global _queue
+    with _queue_lock:
+        if _queue is None: _queue = JobQueue()
+        return _queue
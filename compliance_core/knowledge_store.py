@@ -0,0 +1,114 @@
+# compliance_core/knowledge_store.py
+# Read-only, on-disk store for the test-case knowledge base and the component database.
+# The JSON files under data/ are the editable source; they are compiled once into a
+# SQLite file that every session and worker process opens read-only, so script reruns
+# never rebuild the catalogues and per-session memory does not grow with them.
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
+
+from . import tracing
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+TEST_CASES_JSON = os.path.join(DATA_DIR, "test_cases.json")
+COMPONENTS_JSON = os.path.join(DATA_DIR, "components.json")
+STORE_PATH = os.environ.get("COMPLIANCE_STORE_PATH") or os.path.join(
+    DATA_DIR if os.access(DATA_DIR, os.W_OK) else tempfile.gettempdir(), "knowledge.sqlite")   # installed read-only
+RECORD_CACHE_SIZE = 1024
+
+_build_lock = threading.Lock()
+_local = threading.local()
+
+# === Building ===
+def _is_stale(path=STORE_PATH):
+    if not os.path.exists(path): return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(src) > built for src in (TEST_CASES_JSON, COMPONENTS_JSON) if os.path.exists(src))
+
+def build_store(path=STORE_PATH):
+    """Compile the JSON sources into a fresh SQLite file, replacing it atomically."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    con = sqlite3.connect(tmp)
+    try:
+        con.executescript("""
+            CREATE TABLE test_cases (key TEXT PRIMARY KEY, position INTEGER NOT NULL, record TEXT NOT NULL) WITHOUT ROWID;
+            CREATE TABLE components (part TEXT PRIMARY KEY, position INTEGER NOT NULL, record TEXT NOT NULL) WITHOUT ROWID;
+        """)
+        with open(TEST_CASES_JSON, encoding="utf-8") as f: tests = json.load(f)
+        with open(COMPONENTS_JSON, encoding="utf-8") as f: parts = json.load(f)
+        con.executemany("INSERT INTO test_cases VALUES (?, ?, ?)",
+            ((k, i, json.dumps(v, ensure_ascii=False, separators=(",", ":"))) for i, (k, v) in enumerate(tests.items())))
+        con.executemany("INSERT INTO components VALUES (?, ?, ?)",
+            ((k, i, json.dumps(v, ensure_ascii=False, separators=(",", ":"))) for i, (k, v) in enumerate(parts.items())))
+        con.executescript("""
+            CREATE INDEX test_cases_position ON test_cases (position);
+            CREATE INDEX components_position ON components (position);
+        """)
+        con.commit()
+        con.execute("VACUUM")
+    finally: con.close()
+    os.replace(tmp, path)
+
+def _ensure_store():
+    # Another worker may be building at the same time; os.replace keeps readers safe.
+    with _build_lock:
+        if _is_stale(): build_store()
+
+def _connection():
+    con = getattr(_local, "con", None)
+    if con is None:
+        _ensure_store()
+        con = sqlite3.connect(f"file:{STORE_PATH}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        _local.con = con
+    return con
+
+# === Read-only mapping views ===
+class _TableView(Mapping):
+    """Dict-like, lazily loaded view over one table; records are decoded on access."""
+    def __init__(self, table, key_col, order_col):
+        self._table, self._key, self._order = table, key_col, order_col
+        self._get = lru_cache(maxsize=RECORD_CACHE_SIZE)(self._fetch)
+        tracing.register_cache(f"{table} records", lambda: self._get.cache_info()[:2])
+
+    def _fetch(self, key):
+        row = _connection().execute(f"SELECT record FROM {self._table} WHERE {self._key} = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def __getitem__(self, key):
+        record = self._get(key)
+        if record is None: raise KeyError(key)
+        return record
+
+    def get(self, key, default=None):
+        record = self._get(key)
+        return default if record is None else record
+
+    def __contains__(self, key):
+        return self._get(key) is not None
+
+    def __len__(self):
+        return _connection().execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+
+    def __iter__(self):
+        for (key,) in _connection().execute(f"SELECT {self._key} FROM {self._table} ORDER BY {self._order}"):
+            yield key
+
+    def items(self):
+        for key, record in _connection().execute(f"SELECT {self._key}, record FROM {self._table} ORDER BY {self._order}"):
+            yield key, json.loads(record)
+
+    def values(self):
+        for _, record in self.items(): yield record
+
+_test_cases = _TableView("test_cases", "key", "position")
+_components = _TableView("components", "part", "position")
+
+def test_cases():
+    return _test_cases
+
+def components():
+    return _components
@@ -0,0 +1,175 @@
+# compliance_core/limits.py
+# Checks extracted results against the limits of the standards they were tested to.
+# The catalogue (data/limits.json, editable) lists requirements per knowledge-base test
+# and standard: either a statistic (min, max or total) over the measurements of one
+# physical quantity, e.g. "the lowest temperature must be at most -40 °C", or a numeric
+# field of the record's Details, e.g. a battery profile's capacity retention. It is
+# compiled into one table with limits in base units; a batch of reports is flattened into
+# one measurement table, and evaluation is a groupby plus a merge, so a whole campaign is
+# re-checked in one pass after a limits change without re-parsing anything.
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from . import knowledge_store, tracing
+from .test_extraction import parse_measurements
+
+LIMITS_PATH = os.environ.get("COMPLIANCE_LIMITS_PATH") or os.path.join(knowledge_store.DATA_DIR, "limits.json")
+STATISTICS = ("min", "max", "total")
+PASS, FAIL, NOT_MEASURED = "PASS", "FAIL", "NOT MEASURED"
+
+# unit -> (quantity, factor to the quantity's base unit)
+UNITS = {
+    "mm": ("length", 1e-3), "cm": ("length", 1e-2), "m": ("length", 1.0),
+    "ms": ("time", 1e-3), "s": ("time", 1.0), "min": ("time", 60.0), "h": ("time", 3600.0),
+    "°C": ("temperature", 1.0), "degC": ("temperature", 1.0),
+    "mV": ("voltage", 1e-3), "V": ("voltage", 1.0), "kV": ("voltage", 1e3),
+    "mA": ("current", 1e-3), "A": ("current", 1.0),
+    "W": ("power", 1.0), "kW": ("power", 1e3),
+    "mΩ": ("resistance", 1e-3), "mohm": ("resistance", 1e-3), "Ω": ("resistance", 1.0), "ohm": ("resistance", 1.0),
+    "kΩ": ("resistance", 1e3), "kohm": ("resistance", 1e3), "MΩ": ("resistance", 1e6), "Mohm": ("resistance", 1e6),
+    "Hz": ("frequency", 1.0), "kHz": ("frequency", 1e3), "MHz": ("frequency", 1e6),
+    "mAh": ("capacity", 1e-3), "Ah": ("capacity", 1.0),
+    "dB": ("level", 1.0), "g": ("acceleration", 1.0), "kPa": ("pressure", 1.0), "bar": ("pressure", 100.0),
+    "%": ("percent", 1.0), "cycles": ("count", 1.0),
+}
+
+_FOLDED = {u[0] + u[1:].lower(): u for u in UNITS}          # keeps the m/M prefix distinction
+_LOWER = {u.lower(): u for u in UNITS if sum(v.lower() == u.lower() for v in UNITS) == 1}
+
+Measurements = namedtuple("Measurements", ["records", "values"])
+
+_STD_SPLIT = re.compile(r"[^0-9A-Z]+|(?<=[A-Z])(?=[0-9])")
+_NUMBER = r"^\s*([-+]?\d+(?:\.\d+)?)"
+_lock = threading.Lock()
+_compiled = (None, None)   # ((path, mtime_ns), compiled table)
+
+def _norm_standard(text):
+    # "IEC 60068-2-1" -> " IEC 60068 2 1 ", so it matches "IEC60068-2-1" but not "IEC 60068-2-14".
+    return " " + " ".join(t for t in _STD_SPLIT.split(str(text).upper()) if t) + " "
+
+# === Catalogue ===
+def compile_limits(catalog):
+    """One row per requirement, with lower/upper limits converted to base units."""
+    rows = []
+    for test, standards in catalog.items():
+        for standard, requirements in standards.items():
+            for req in requirements:
+                unit = req.get("unit", "")
+                where = f"{test} / {standard} / {req.get('requirement')}"
+                if "field" in req: source, name, factor = "field", req["field"], UNITS.get(unit, (None, 1.0))[1]
+                elif unit in UNITS and UNITS[unit][0] == req.get("quantity", UNITS[unit][0]):
+                    source, (name, factor) = "quantity", UNITS[unit]
+                else: raise ValueError(f"{where}: unit {unit!r} does not measure {req.get('quantity')!r}")
+                statistic = req.get("statistic", "max")
+                if statistic not in STATISTICS: raise ValueError(f"{where}: statistic must be one of {', '.join(STATISTICS)}")
+                if req.get("lower") is None and req.get("upper") is None: raise ValueError(f"{where}: needs a lower or upper limit")
+                rows.append({"test": test.lower(), "Standard": standard, "Requirement": req["requirement"], "source": source,
+                             "name": name, "statistic": "max" if source == "field" else statistic, "Unit": unit, "factor": factor,
+                             "lower": np.nan if req.get("lower") is None else req["lower"] * factor,
+                             "upper": np.nan if req.get("upper") is None else req["upper"] * factor,
+                             "std_norm": _norm_standard(standard)})
+    columns = ["test", "Standard", "Requirement", "source", "name", "statistic", "Unit", "factor", "lower", "upper", "std_norm"]
+    return pd.DataFrame(rows, columns=columns)
+
+def load_limits(path=None):
+    """Compiled catalogue from path (default LIMITS_PATH); recompiled when the file changes."""
+    global _compiled
+    path = path or LIMITS_PATH
+    key = (path, os.stat(path).st_mtime_ns)
+    with _lock:
+        if _compiled[0] == key: return _compiled[1]
+    with open(path, encoding="utf-8") as f: table = compile_limits(json.load(f))
+    with _lock: _compiled = (key, table)
+    return table
+
+# === Measurements ===
+def canonical_unit(unit):
+    """Catalogue spelling of a unit as written in a report ("MOhm" -> "Mohm", "KV" -> "kV"), or None."""
+    if unit in UNITS: return unit
+    return _FOLDED.get(unit[:1] + unit[1:].lower()) or _LOWER.get(unit.lower())
+
+def _record_values(record):
+    values = record.get("Measurements")
+    if values: return values
+    # Table rows carry their values in Details cells instead.
+    return [m for v in (record.get("Details") or {}).values() if isinstance(v, str) for m in parse_measurements(v)]
+
+def measurement_table(reports):
+    """Flatten (file, records) pairs into a record table and a long table of measured values."""
+    files, tests, names, cited = [], [], [], []
+    v_rec, v_unit, v_value, f_rec, f_name, f_value = [], [], [], [], [], []
+    for file, records in reports:
+        for record in records:
+            rid = len(files)
+            details = record.get("Details") or {}
+            files.append(file); names.append(record.get("TestName", "N/A"))
+            tests.append((record.get("TestKey") or record.get("TestName") or "").lower())
+            # Only the standards the report itself cites; Details["Standard"] is the knowledge base's own list.
+            cited.append(_norm_standard(details.get("Standards Cited", "")))
+            for value, unit in _record_values(record):
+                v_rec.append(rid); v_unit.append(unit); v_value.append(value)
+            for name, value in details.items():
+                f_rec.append(rid); f_name.append(name); f_value.append(value)
+    records = pd.DataFrame({"record": np.arange(len(files)), "File": pd.Series(files, dtype=object), "Test": pd.Series(names, dtype=object),
+                            "test": pd.Series(tests, dtype=object), "cited": pd.Series(cited, dtype=object)})
+    units = pd.Series(v_unit, dtype=object)
+    canonical = {u: canonical_unit(u) for u in units.unique()}
+    quantity = units.map({u: UNITS[c][0] for u, c in canonical.items() if c})
+    factor = units.map({u: UNITS[c][1] for u, c in canonical.items() if c}).astype(float)
+    measured = pd.DataFrame({"record": np.asarray(v_rec, dtype=np.int64), "source": "quantity", "name": quantity,
+                             "value": np.asarray(v_value, dtype=float) * factor.to_numpy()})
+    fields = pd.DataFrame({"record": np.asarray(f_rec, dtype=np.int64), "source": "field", "name": f_name,
+                           "value": pd.to_numeric(pd.Series(f_value, dtype=object).astype(str).str.extract(_NUMBER)[0], errors="coerce")})
+    values = pd.concat([measured, fields], ignore_index=True).dropna(subset=["name", "value"]).astype({"name": object, "source": object})
+    return Measurements(records, values)
+
+# === Evaluation ===
+def _standard_matches(records, pairs):
+    # A record that cites one of its test's catalogue standards is only held to those; one that
+    # cites none of them is held to all of the test's standards.
+    combos = pairs[["cited", "std_norm"]].drop_duplicates()
+    combos["match"] = [s.strip() != "" and s in c for c, s in zip(combos["cited"], combos["std_norm"])]
+    match = pairs.merge(combos, on=["cited", "std_norm"], how="left")["match"].to_numpy(dtype=bool)
+    any_match = pd.Series(match).groupby(pairs["record"].to_numpy()).transform("any").to_numpy(dtype=bool)
+    return match | ~any_match
+
+@tracing.traced("limits.evaluate")
+def evaluate(measurements, limits):
+    """Per-requirement PASS/FAIL/NOT MEASURED with the margin to the binding limit.
+
+    Margin is in the requirement's unit and positive inside the limits; with both a lower
+    and an upper limit it is the distance to the nearer one.
+    """
+    records, values = measurements
+    keys = ["record", "source", "name"]
+    stats = (values.groupby(keys, as_index=False)["value"].agg(min="min", max="max", total="sum")
+             .melt(id_vars=keys, var_name="statistic", value_name="measured"))
+    pairs = records.merge(limits, on="test", how="inner")
+    pairs = pairs[_standard_matches(records, pairs)]
+    out = pairs.merge(stats, on=["record", "source", "name", "statistic"], how="left")
+    measured, lower, upper, factor = (out[c].to_numpy(dtype=float) for c in ("measured", "lower", "upper", "factor"))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        to_lower, to_upper = measured - lower, upper - measured
+        margin = np.fmin(to_lower, to_upper)
+        binding = np.where(np.isnan(to_upper) | (to_lower <= to_upper), lower, upper)
+        status = np.select([np.isnan(measured), margin >= 0], [NOT_MEASURED, PASS], FAIL)
+        return pd.DataFrame({
+            "File": out["File"], "Test": out["Test"], "Standard": out["Standard"], "Requirement": out["Requirement"],
+            "Measured": measured / factor, "Lower Limit": lower / factor, "Upper Limit": upper / factor, "Unit": out["Unit"],
+            "Margin": margin / factor, "Margin (%)": np.round(100 * margin / np.abs(binding), 2), "Status": status,
+        }).reset_index(drop=True)
+
+def check_reports(reports, limits=None):
+    """Evaluate (file, records) pairs against the catalogue (default: load_limits())."""
+    return evaluate(measurement_table(reports), load_limits() if limits is None else limits)
+
+def summarize(result):
+    counts = result["Status"].value_counts()
+    return {"requirements": len(result), "pass": int(counts.get(PASS, 0)), "fail": int(counts.get(FAIL, 0)),
+            "not_measured": int(counts.get(NOT_MEASURED, 0))}
@@ -0,0 +1,561 @@
+# compliance_core/report_parser.py
+# Parsing core for uploaded test reports. Kept out of the Streamlit script so that
+# the page-extraction workers are importable by the process pool and the result
+# cache survives script reruns.
+import contextvars
+import copy
+import csv
+import hashlib
+import io
+import itertools
+import os
+import tempfile
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from . import formats, tracing
+from .battery_analytics import CycleAnalyzer
+from .test_extraction import get_extractor, iter_text_chunks
+
+# === Tuning ===
+PAGES_PER_TASK = 16          # pages handed to one worker per task
+PARALLEL_MIN_PAGES = 48      # below this, extraction stays in-process
+RESULT_CACHE_SIZE = 32       # parsed reports kept, keyed by content hash
+SNIFF_ROWS = 200             # rows searched for the battery-profile header
+CHUNK_ROWS = 250_000         # rows per chunk when streaming cycler logs
+POOL_WORKERS = os.cpu_count() or 1
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.xlsx', '.csv', '.txt')
+FORMAT_WORKERS = {'pdf': 2, 'xlsx': 2, 'docx': 2, 'text': 4}   # concurrent files per sniffed format
+MAX_ARCHIVE_MEMBER_BYTES = 512 * 1024 * 1024
+
+# progress(done, total) callback of the parse_report call running in this context
+_progress = contextvars.ContextVar("parse_progress", default=None)
+
+def _report_progress(done, total):
+    callback = _progress.get()
+    if callback is not None and total: callback(done, total)
+
+# === Battery Profile Parsing ===
+# Header detection only looks at the first SNIFF_ROWS rows; the data below it is
+# streamed in CHUNK_ROWS batches and reduced incrementally, so peak memory does
+# not grow with the length of the cycler log.
+#
+# Cycler export dialects, most specific first. A dialect is recognized by marker cells
+# in its header row; columns are matched on the upper-cased header cell (exact names for
+# the vendor formats, substrings for the generic layout). Vendors that log unsigned
+# current get the sign from their step-state column.
+CyclerDialect = namedtuple("CyclerDialect", ["name", "markers", "time", "voltage", "current", "capacity", "state", "exact"])
+CYCLER_DIALECTS = (
+    CyclerDialect("Arbin", (("DATA_POINT", "TEST_TIME(S)"),), ("TEST_TIME(S)",), ("VOLTAGE(V)",), ("CURRENT(A)",),
+        ("DISCHARGE_CAPACITY(AH)",), (), True),
+    CyclerDialect("Maccor", (("REC#", "CYC#"),), ("TEST (SEC)", "TEST TIME (SEC)", "TEST TIME", "TESTTIME"), ("VOLTS", "VOLTAGE"),
+        ("AMPS", "CURRENT"), ("AMP-HR", "AMP HR", "AH"), ("STATE", "MD"), True),
+    CyclerDialect("Neware", (("STEP TYPE",), ("RECORD ID", "STATUS")), ("TOTAL TIME", "TIME", "REALTIME"), ("VOLTAGE(V)",),
+        ("CURRENT(A)", "CURRENT(MA)", "CUR(MA)"), ("CAPACITY(AH)", "CAPACITY(MAH)"), ("STEP TYPE", "STATUS"), True),
+    CyclerDialect("Generic", (("TIME", "VOLTAGE"),), ("TIME",), ("VOLTAGE",), ("CURRENT",), ("AH",), (), False),
+)
+BatteryLayout = namedtuple("BatteryLayout", ["row", "dialect", "names", "cols"])
+
+def _battery_columns(dialect, names):
+    # Positions of the time, voltage, current, capacity (and state) columns, or None if one is missing.
+    def pick(candidates):
+        for cand in candidates:
+            j = next((j for j, c in enumerate(names) if (c == cand if dialect.exact else cand in c)), None)
+            if j is not None: return j
+        return None
+    cols = {field: pick(getattr(dialect, field)) for field in ("time", "voltage", "current", "capacity", "state")}
+    return None if any(cols[f] is None for f in ("time", "voltage", "current", "capacity")) else cols
+
+@tracing.traced("battery.detect_header")
+def _find_battery_header(head):
+    cells = head.astype(str).apply(lambda col: col.str.strip().str.upper())
+    for dialect in CYCLER_DIALECTS:
+        hit = np.zeros(len(cells), dtype=bool)
+        for marker in dialect.markers:
+            hit |= np.logical_and.reduce([cells.eq(m).any(axis=1).to_numpy() for m in marker])
+        for i in np.flatnonzero(hit):
+            names = [str(c).strip().upper() if c else "" for c in head.iloc[i]]
+            cols = _battery_columns(dialect, names)
+            if cols: return BatteryLayout(int(i), dialect, names, cols)
+    return None
+
+def _unit_scale(name):
+    return 1e-3 if "(MA)" in name or "(MAH)" in name else 1.0
+
+def _state_signs(state):
+    # +1 for charge steps, -1 for discharge steps, 0 where the state says neither.
+    codes, labels = pd.factorize(state.astype(str).str.strip().str.upper())
+    table = np.array([-1 if l.startswith("D") or "DCHG" in l or "DISCHARGE" in l else
+                      1 if l.startswith("C") or "CHG" in l or "CHARGE" in l else 0 for l in labels] + [0])
+    return table[codes]      # code -1 (missing) picks the trailing 0
+
+def _battery_series(block, layout):
+    cols, names = layout.cols, layout.names
+    curr = pd.to_numeric(block[cols["current"]], errors='coerce') * _unit_scale(names[cols["current"]])
+    if cols["state"] is not None:
+        signs = _state_signs(block[cols["state"]])
+        curr = curr.where(signs == 0, curr.abs() * signs)
+    ah = pd.to_numeric(block[cols["capacity"]], errors='coerce') * _unit_scale(names[cols["capacity"]])
+    return block[cols["time"]], block[cols["voltage"]], curr, ah
+
+class _ProfileAccumulator:
+    def __init__(self, dialect="Generic"):
+        self.rows, self.start_v, self.last, self.max_i, self.dialect = 0, None, None, 0.0, dialect
+        self.cycles = CycleAnalyzer()
+
+    @tracing.traced("battery.analyze")
+    def update(self, time, volt, curr, ah):
+        volt, curr, ah = (pd.to_numeric(s, errors='coerce') for s in (volt, curr, ah))
+        valid = (volt.notna() & curr.notna() & ah.notna()).to_numpy()
+        if not valid.any(): return
+        volt, curr, ah = volt[valid], curr[valid], ah[valid]
+        if self.start_v is None: self.start_v = volt.iloc[0]
+        self.last = (time[valid].iloc[-1], volt.iloc[-1], ah.iloc[-1])
+        self.max_i = max(self.max_i, curr.abs().max())
+        self.rows += int(valid.sum())
+        self.cycles.update(time[valid], volt.to_numpy(float), curr.to_numpy(float))
+
+    def result(self):
+        if not self.rows: return None
+        last_t, last_v, last_ah = self.last
+        analysis = self.cycles.result()
+        cycles = analysis.cycles.astype(object).where(analysis.cycles.notna(), None)
+        return {"TestName": "Battery Charge/Discharge Profile", "Result": "Data Extracted",
+            "Details": {"Log Format": self.dialect, "Total Duration": last_t, "Starting Voltage (V)": f"{self.start_v:.2f}",
+                "Ending Voltage (V)": f"{last_v:.2f}", "Max Current (A)": f"{self.max_i:.2f}",
+                "Total Capacity (Ah)": f"{last_ah:.2f}", **analysis.summary},
+            "Cycles": cycles.to_dict(orient="records"), "Trace": analysis.trace}
+
+def parse_battery_profile(df):
+    # In-memory variant for frames that are already loaded (header=None).
+    layout = _find_battery_header(df.head(SNIFF_ROWS))
+    if layout is None: return None
+    acc = _ProfileAccumulator(layout.dialect.name)
+    acc.update(*_battery_series(df.iloc[layout.row + 1:], layout))
+    return acc.result()
+
+def _csv_delimiter(text):
+    lines = text.splitlines()[:SNIFF_ROWS] or [""]
+    return max((',', '\t', ';'), key=lambda d: sum(line.count(d) for line in lines))
+
+def _csv_rows(text, delimiter):
+    return list(itertools.islice(csv.reader(text, delimiter=delimiter), SNIFF_ROWS))
+
+def _csv_head(text, delimiter):
+    return pd.DataFrame(_csv_rows(text, delimiter))
+
+def _data_width(rows, header_row):
+    # read_csv needs exactly as many names as the first data row has fields. The padded head
+    # frame is as wide as its widest row (often a metadata preamble), so count the raw rows:
+    # the first data row, else the header row without trailing empty cells.
+    first = next((r for r in rows[header_row + 1:] if r), None)
+    if first is not None: return len(first)
+    header = rows[header_row]
+    while header and not header[-1].strip(): header = header[:-1]
+    return len(header)
+
+def _parse_battery_csv(data, encoding='utf-8'):
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding=encoding, errors='replace', newline='')
+    head = list(itertools.islice(stream, SNIFF_ROWS))
+    delimiter = _csv_delimiter(''.join(head))
+    rows = _csv_rows(head, delimiter)
+    layout = _find_battery_header(pd.DataFrame(rows))
+    if layout is None: return None
+    cols = sorted({c for c in layout.cols.values() if c is not None})
+    text_cols = {layout.cols["time"]: str, **({layout.cols["state"]: str} if layout.cols["state"] is not None else {})}
+    acc = _ProfileAccumulator(layout.dialect.name)
+    source = io.BytesIO(data)
+    width = max(_data_width(rows, layout.row), cols[-1] + 1)
+    chunks = pd.read_csv(source, sep=delimiter, header=None, skiprows=layout.row + 1, names=range(width),
+        usecols=cols, dtype=text_cols, chunksize=CHUNK_ROWS, encoding=encoding, encoding_errors='replace')
+    for chunk in tracing.traced_iter("battery.read_csv", chunks):
+        acc.update(*_battery_series(chunk, layout))
+        _report_progress(source.tell(), len(data))
+    return acc.result()
+
+def _parse_battery_xlsx(data):
+    import openpyxl  # deferred: only XLSX logs need it, and it is slow to import
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        # Vendor workbooks put the data on a channel sheet after an info sheet.
+        for ws in wb.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            head = list(itertools.islice(rows, SNIFF_ROWS))
+            layout = _find_battery_header(pd.DataFrame(head)) if head else None
+            if layout is None: continue
+            acc = _ProfileAccumulator(layout.dialect.name)
+            width = max(c for c in layout.cols.values() if c is not None) + 1
+            batch = itertools.chain(head[layout.row + 1:], rows)
+            blocks = (pd.DataFrame(list(itertools.islice(batch, CHUNK_ROWS))) for _ in itertools.count())
+            for block in tracing.traced_iter("battery.read_xlsx", itertools.takewhile(lambda b: not b.empty, blocks)):
+                acc.update(*_battery_series(block.reindex(columns=range(width)), layout))
+            return acc.result()
+        return None
+    finally: wb.close()
+
+def parse_battery_file(file_extension, data):
+    """Battery profile from a CSV or XLSX cycler log; None if no cycler header is found."""
+    return _parse_battery_csv(data) if file_extension == '.csv' else _parse_battery_xlsx(data)
+
+# === Streaming PDF Extraction ===
+_pool = None
+_pool_lock = threading.Lock()
+
+def set_page_workers(n):
+    # Page-level parallelism for large PDFs; 1 keeps extraction in-process, e.g. inside
+    # a worker that is itself one of many parsing files in parallel.
+    global POOL_WORKERS
+    POOL_WORKERS = max(1, int(n))
+
+def _get_pool():
+    # One pool per server process, shared by every session and rerun.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+def _extract_page_range(path, start, stop):
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        texts = []
+        for page in pdf.pages[start:stop]:
+            texts.append(page.extract_text() or "")
+            page.flush_cache()
+        return texts
+
+def iter_pdf_pages(data, parallel=None):
+    """Yield the text of each page in order; closing the generator cancels pending work."""
+    import pdfplumber  # deferred: only PDF reports need it, and it is slow to import
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        n_pages = len(pdf.pages)
+        if parallel is None: parallel = n_pages >= PARALLEL_MIN_PAGES and POOL_WORKERS > 1
+        if not parallel:
+            for i, page in enumerate(pdf.pages, start=1):
+                yield page.extract_text() or ""
+                page.flush_cache()
+                _report_progress(i, n_pages)
+            return
+
+    # Workers reopen the document from disk rather than receiving the bytes per task.
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as f: f.write(data)
+    pool, pending, done = _get_pool(), [], 0
+    ranges = iter(range(0, n_pages, PAGES_PER_TASK))
+    window = 2 * POOL_WORKERS
+    try:
+        for start in ranges:
+            pending.append(pool.submit(_extract_page_range, path, start, min(start + PAGES_PER_TASK, n_pages)))
+            if len(pending) >= window: break
+        while pending:
+            texts = pending.pop(0).result()
+            start = next(ranges, None)
+            if start is not None:
+                pending.append(pool.submit(_extract_page_range, path, start, min(start + PAGES_PER_TASK, n_pages)))
+            yield from texts
+            done += len(texts)
+            _report_progress(done, n_pages)
+    finally:
+        for fut in pending: fut.cancel()
+        for fut in pending:
+            if not fut.cancelled():
+                try: fut.result()
+                except Exception: pass
+        os.remove(path)
+
+# === Streaming DOCX Extraction ===
+# word/document.xml is read with iterparse and cleared block by block, so large Word
+# reports are never materialized as a full DOM.
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+TEST_NAME_HEADERS = ('test', 'item', 'description', 'parameter')
+RESULT_HEADERS = ('result', 'verdict', 'status', 'pass/fail', 'judgement', 'judgment')
+VERDICTS = {'pass': 'PASS', 'passed': 'PASS', 'ok': 'PASS', 'conform': 'PASS', 'compliant': 'PASS',
+    'fail': 'FAIL', 'failed': 'FAIL', 'ng': 'FAIL', 'nok': 'FAIL', 'not ok': 'FAIL', 'non-compliant': 'FAIL'}
+
+def iter_docx_blocks(data):
+    """Yield ('p', text) for body paragraphs and ('row', cells, row_index) for table rows, in document order."""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf, zf.open('word/document.xml') as xml:
+        body, depth, row_index, row, cell, runs = None, 0, 0, None, None, []
+        for event, el in ET.iterparse(xml, events=('start', 'end')):
+            tag = el.tag
+            if event == 'start':
+                if tag == _W + 'body': body = el
+                elif tag == _W + 'tbl':
+                    depth += 1
+                    if depth == 1: row_index = 0
+                elif depth == 1 and tag == _W + 'tr': row = []
+                elif depth == 1 and tag == _W + 'tc': cell = []
+                continue
+            if tag == _W + 't': runs.append(el.text or '')
+            elif tag == _W + 'tab': runs.append('\t')
+            elif tag in (_W + 'br', _W + 'cr'): runs.append('\n')
+            elif tag == _W + 'p':
+                text, runs = ''.join(runs), []
+                if cell is not None: cell.append(text)
+                elif depth == 0: yield 'p', text
+            elif depth == 1 and tag == _W + 'tc':
+                row.append('\n'.join(t for t in cell if t).strip()); cell = None
+            elif depth == 1 and tag == _W + 'tr':
+                yield 'row', row, row_index
+                row, row_index = None, row_index + 1
+            elif tag == _W + 'tbl': depth -= 1
+            if body is not None and depth == 0 and tag in (_W + 'p', _W + 'tbl'): body.clear()
+
+def _table_columns(header):
+    lowered = [h.lower() for h in header]
+    name = next((j for j, h in enumerate(lowered) if any(k in h for k in TEST_NAME_HEADERS)), None)
+    result = next((j for j, h in enumerate(lowered) if j != name and any(k in h for k in RESULT_HEADERS)), None)
+    return (name, result) if name is not None and result is not None else None
+
+def _normalize_verdict(value):
+    return VERDICTS.get(value.strip().lower(), value.strip().upper())
+
+def _parse_docx(data):
+    table_tests, header, cols = [], None, None
+    def texts():
+        nonlocal header, cols
+        for block in tracing.traced_iter("docx.read_blocks", iter_docx_blocks(data)):
+            if block[0] == 'row':
+                cells, row_index = block[1], block[2]
+                if row_index == 0: header, cols = cells, _table_columns(cells)
+                elif cols and max(cols) < len(cells) and cells[cols[0]] and cells[cols[1]]:
+                    details = {header[j] or f"Column {j + 1}": v for j, v in enumerate(cells) if j not in cols and j < len(header) and v}
+                    table_tests.append({"TestName": cells[cols[0]], "Result": _normalize_verdict(cells[cols[1]]), "Details": details})
+                yield ' | '.join(cells) + '\n'
+            else: yield block[1] + '\n'
+    extractor = get_extractor()
+    tests, summary = extractor.scan(texts())
+    # Table rows are authoritative; text-derived records only add tests the tables lack.
+    listed = set()
+    for t in table_tests:
+        key = extractor.resolve(t["TestName"])
+        if key: t["TestKey"] = key; listed.add(key)
+    return table_tests + [t for t in tests if t["TestKey"] not in listed], summary
+
+# === Result Cache ===
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cache_get(key):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    return None
+
+def _cache_put(key, value):
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > RESULT_CACHE_SIZE: _cache.popitem(last=False)
+
+# === Report Parsing ===
+# Parsers are registered with compliance_core.formats by the kind sniffed from the file
+# content; costs order the candidates within a kind (cycler fast paths before full-text
+# scans). Each returns a list of test records, [] if it found nothing.
+def _with_summary(tests, summary):
+    if tests: return tests
+    if summary: return [{"TestName": "Generic Test Report", "Result": "PASS"}]
+    return []
+
+def _accepts_cycler_text(sniffed):
+    lines = sniffed.text.splitlines(keepends=True)
+    return _find_battery_header(_csv_head(lines, _csv_delimiter(''.join(lines)))) is not None
+
+def _parse_cycler_text(data, sniffed):
+    profile = _parse_battery_csv(data, sniffed.encoding)
+    return [profile] if profile else []
+
+def _parse_cycler_xlsx(data, sniffed):
+    profile = _parse_battery_xlsx(data)
+    return [profile] if profile else []
+
+def _parse_text(data, sniffed):
+    return _with_summary(*get_extractor().scan(iter_text_chunks(data.decode(sniffed.encoding, errors='ignore'))))
+
+def iter_xlsx_text(data, size=1 << 20):
+    """Yield the cell text of every sheet, one line per row, in chunks of about size characters."""
+    import openpyxl
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        lines, length = [], 0
+        for ws in wb.worksheets:
+            for row in ws.iter_rows(values_only=True):
+                cells = [str(c) for c in row if c is not None and str(c).strip()]
+                if not cells: continue
+                lines.append('  '.join(cells) + '\n'); length += len(lines[-1])
+                if length >= size: yield ''.join(lines); lines, length = [], 0
+        if lines: yield ''.join(lines)
+    finally: wb.close()
+
+def _parse_xlsx_text(data, sniffed):
+    return _with_summary(*get_extractor().scan(tracing.traced_iter("xlsx.read_text", iter_xlsx_text(data))))
+
+def _parse_docx_report(data, sniffed):
+    return _with_summary(*_parse_docx(data))
+
+def _parse_pdf(data, sniffed):
+    pages = tracing.traced_iter("pdf.extract_text", iter_pdf_pages(data))
+    try: return _with_summary(*get_extractor().scan(text + '\n' for text in pages))
+    finally: pages.close()
+
+formats.register("cycler-text", ("text",), 1, _parse_cycler_text, accepts=_accepts_cycler_text)
+formats.register("text", ("text",), 2, _parse_text)
+formats.register("cycler-xlsx", ("xlsx",), 3, _parse_cycler_xlsx)
+formats.register("xlsx-text", ("xlsx",), 4, _parse_xlsx_text)
+formats.register("docx", ("docx",), 5, _parse_docx_report)
+formats.register("pdf", ("pdf",), 10, _parse_pdf)
+
+def parse_report(name, data, progress=None):
+    """Parse an uploaded report given its file name and raw bytes. Raises on unreadable files.
+
+    The format is sniffed from the content, so a mislabeled file still reaches the right
+    parser; the name is only used by callers for reporting. progress(done, total) is
+    called as PDF pages and CSV chunks are consumed.
+    """
+    with tracing.span("parse_report", file=name, bytes=len(data)) as sp:
+        with tracing.span("content_hash"): key = hashlib.sha256(data).hexdigest()
+        cached = _cache_get(key)
+        tracing.cache_event("report results", cached is not None)
+        if cached is not None:
+            sp.set(cache_hit=True)
+            return copy.deepcopy(cached)
+        sniffed = formats.sniff(data)
+        sp.set(cache_hit=False, kind=sniffed.kind)
+        token = _progress.set(progress)
+        try: result = formats.parse(data, sniffed)
+        finally: _progress.reset(token)
+        _cache_put(key, result)
+        # Callers get their own copy; records nest dicts and lists that must not alias the cache.
+        return copy.deepcopy(result)
+
+# === Batch Parsing ===
+def expand_uploads(files):
+    """Yield (name, bytes) for every supported report in (name, bytes) uploads, unpacking ZIP bundles."""
+    for name, data in files:
+        if formats.sniff(data).kind != 'zip':
+            yield name, data
+            continue
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            for info in _archive_members(zf, name): yield f"{name}/{info.filename}", zf.read(info)
+
+def _archive_members(zf, name):
+    # Supported reports in an open ZIP bundle, without folders, macOS metadata or hidden files.
+    for info in zf.infolist():
+        member = info.filename
+        if info.is_dir() or member.startswith('__MACOSX/') or os.path.basename(member).startswith('.'): continue
+        if os.path.splitext(member.lower())[1] not in SUPPORTED_EXTENSIONS: continue
+        if info.file_size > MAX_ARCHIVE_MEMBER_BYTES: raise ValueError(f"{member} in {name} is too large to unpack")
+        yield info
+
+class FormatPools:
+    """One bounded thread pool per sniffed file format, created on first use.
+
+    A burst of large PDFs then cannot starve the cheap text and CSV files queued behind
+    them. max_workers overrides the per-format defaults in FORMAT_WORKERS.
+    """
+    def __init__(self, max_workers=None, prefix="parse"):
+        self.max_workers, self.prefix = max_workers, prefix
+        self._pools, self._lock = {}, threading.Lock()
+
+    def submit(self, kind, fn, *args):
+        with self._lock:
+            pool = self._pools.get(kind)
+            if pool is None:
+                pool = self._pools[kind] = ThreadPoolExecutor(max_workers=self.max_workers or FORMAT_WORKERS.get(kind, 1),
+                                                              thread_name_prefix=f"{self.prefix}-{kind}")
+        return pool.submit(tracing.context().run, fn, *args)
+
+    def shutdown(self):
+        with self._lock: pools, self._pools = list(self._pools.values()), {}
+        for pool in pools: pool.shutdown(wait=False, cancel_futures=True)
+
+def parse_many(items, max_workers=None):
+    """Parse (name, bytes) items concurrently on FormatPools, yielding (name, results, error) as each file finishes."""
+    pools, futures = FormatPools(max_workers), {}
+    try:
+        for name, data in items:
+            futures[pools.submit(formats.sniff(data).kind, parse_report, name, data)] = name
+        for fut in as_completed(futures):
+            try: yield futures[fut], fut.result(), None
+            except Exception as e: yield futures[fut], [], str(e)
+    finally:
+        pools.shutdown()
+
+def iter_report_paths(paths):
+    """Expand files and directories (recursively) into report and ZIP paths, in sorted order."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for f in sorted(files):
+                if os.path.splitext(f.lower())[1] in SUPPORTED_EXTENSIONS + ('.zip',): yield os.path.join(root, f)
+
+def verify_file(path, member=None):
+    """Parse one file on disk, or every report inside it if it is a ZIP bundle; never raises.
+
+    With member, only that report inside the ZIP bundle at path is read and parsed.
+    """
+    if member is None:
+        with tracing.span("verify_file", file=path): return _verify_file(path)
+    name = f"{path}/{member}"
+    with tracing.span("verify_file", file=name):
+        try:
+            with zipfile.ZipFile(path) as zf: data = zf.read(member)
+            return [(name, parse_report(name, data), None)]
+        except Exception as e: return [(name, [], str(e))]
+
+def _verify_tasks(paths):
+    # (path, member) per report: ZIP bundles are split into their members (only the central
+    # directory is read here) so a single large bundle is still spread over the pool.
+    for path in iter_report_paths(paths):
+        if not (path.lower().endswith('.zip') and zipfile.is_zipfile(path)):
+            yield path, None
+            continue
+        try:
+            with zipfile.ZipFile(path) as zf: members = [info.filename for info in _archive_members(zf, path)]
+        except Exception:
+            yield path, None      # verify_file reports why the bundle cannot be read
+            continue
+        for member in members: yield path, member
+
+def _verify_file(path):
+    try:
+        with open(path, 'rb') as f: items = list(expand_uploads([(path, f.read())]))
+    except Exception as e: return [(path, [], str(e))]
+    outcomes = []
+    for name, data in items:
+        try: outcomes.append((name, parse_report(name, data), None))
+        except Exception as e: outcomes.append((name, [], str(e)))
+    return outcomes
+
+def _init_file_worker():
+    set_page_workers(1)
+
+def verify_paths(paths, jobs=None):
+    """Yield (name, results, error) for every report under paths, as each file finishes.
+
+    Files, and each report inside a ZIP bundle, are spread over a process pool of `jobs`
+    workers; each worker extracts PDF pages in-process so the machine is not
+    oversubscribed. jobs=1 runs in-process.
+    """
+    tasks = list(_verify_tasks(paths))
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        for path, member in tasks: yield from verify_file(path, member)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=get_context("spawn"), initializer=_init_file_worker) as pool:
+        futures = [pool.submit(verify_file, path, member) for path, member in tasks]
+        try:
+            for fut in as_completed(futures): yield from fut.result()
+        finally:
+            for fut in futures: fut.cancel()
@@ -0,0 +1,103 @@
+# compliance_core/requirement_search.py
+# Ranked lookup over the test-case knowledge base for the requirement generator.
+# An inverted index with field-weighted term frequencies is built once; queries are
+# expanded through a synonym table and scored with BM25, so latency depends on the
+# postings the query touches rather than on the size of the catalogue.
+import bisect
+import math
+import re
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+from . import tracing
+
+FIELD_WEIGHTS = {"key": 3.0, "name": 3.0, "standard": 2.0, "description": 1.0, "procedure": 0.5, "equipment": 0.5}
+K1, B = 1.2, 0.75
+MAX_PREFIX_EXPANSION = 20
+
+# Query phrase -> extra terms. Phrases are matched on the normalized query.
+SYNONYMS = {
+    "ip67": "water ingress immersion ipx7", "ip68": "water ingress immersion ipx7", "ipx7": "water ingress immersion",
+    "ipx8": "water ingress immersion", "immersion": "water ingress", "submersion": "water ingress immersion",
+    "waterproof": "water ingress", "ip5x": "dust ingress", "ip6x": "dust ingress", "ip65": "dust ingress water",
+    "esd gun": "electrostatic discharge esd", "esd": "electrostatic discharge", "static": "electrostatic discharge",
+    "hipot": "dielectric strength", "high pot": "dielectric strength", "withstand voltage": "dielectric strength",
+    "megger": "insulation resistance", "salt fog": "salt spray corrosion", "corrosion": "salt spray",
+    "shaker": "vibration", "sine sweep": "vibration", "random vibration": "vibration",
+    "thermal cycling": "temperature cycling", "tc": "temperature cycling", "tst": "thermal shock",
+    "htol": "high temperature endurance life", "damp heat": "humidity", "85/85": "humidity damp heat",
+    "emc": "emi emc", "emissions": "radiated emissions", "immunity": "conducted immunity", "bci": "conducted immunity",
+    "drop": "drop mechanical shock", "mechanical shock": "drop shock", "surge": "overvoltage", "load dump": "overvoltage",
+    "fuse": "overcurrent", "short": "short circuit", "mating cycles": "connector durability",
+}
+
+SearchResult = namedtuple("SearchResult", ["key", "score"])
+
+_token = re.compile(r"[a-z0-9]+(?:[-/][a-z0-9]+)*")
+
+def tokenize(text):
+    # Compound tokens such as "60068-2-6" are kept and also split into their parts.
+    out = []
+    for tok in _token.findall(text.lower()):
+        parts = re.split(r"[-/]", tok)
+        out.append(tok)
+        if len(parts) > 1: out.extend(p for p in parts if p)
+    return [t[:-1] if len(t) > 4 and t.endswith("s") and not t.endswith("ss") else t for t in out]
+
+class RequirementIndex:
+    def __init__(self, knowledge_base, synonyms=SYNONYMS):
+        self.keys, weighted = [], []
+        for key, entry in knowledge_base.items():
+            tf = defaultdict(float)
+            fields = {"key": key, "name": entry.get("name", ""), "standard": entry.get("standard", ""),
+                      "description": entry.get("description", ""), "procedure": " ".join(entry.get("procedure", [])),
+                      "equipment": " ".join(entry.get("equipment", []))}
+            for field, text in fields.items():
+                for tok in tokenize(text): tf[tok] += FIELD_WEIGHTS[field]
+            self.keys.append(key); weighted.append(tf)
+
+        lengths = np.array([sum(tf.values()) for tf in weighted], dtype=float)
+        self._norm = K1 * (1 - B + B * lengths / max(lengths.mean(), 1e-9)) if len(lengths) else lengths
+        postings = defaultdict(lambda: ([], []))
+        for i, tf in enumerate(weighted):
+            for tok, f in tf.items():
+                ids, fs = postings[tok]; ids.append(i); fs.append(f)
+        n = len(self.keys)
+        self._postings = {t: (np.asarray(ids, dtype=np.int32), np.asarray(fs)) for t, (ids, fs) in postings.items()}
+        self._idf = {t: math.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5)) for t, (ids, _) in self._postings.items()}
+        self._vocab = sorted(self._postings)
+        self._synonyms = sorted(((tuple(tokenize(k)), tokenize(v)) for k, v in synonyms.items()), key=lambda kv: -len(kv[0]))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _expand(self, tokens):
+        # Query terms with weights: original terms 1.0, synonym expansions 0.7, prefix completions 0.5.
+        terms = defaultdict(float)
+        for t in tokens: terms[t] = 1.0
+        for phrase, extra in self._synonyms:
+            n = len(phrase)
+            if any(tuple(tokens[i:i + n]) == phrase for i in range(len(tokens) - n + 1)):
+                for t in extra: terms[t] = max(terms[t], 0.7)
+        for t in [t for t in terms if t not in self._postings and len(t) >= 3]:
+            lo = bisect.bisect_left(self._vocab, t)
+            for v in self._vocab[lo:lo + MAX_PREFIX_EXPANSION]:
+                if not v.startswith(t): break
+                terms[v] = max(terms[v], 0.5 * terms[t])
+        return terms
+
+    @tracing.traced("requirements.search")
+    def search(self, query, limit=10):
+        """BM25-ranked knowledge-base keys for a free-text query, best first."""
+        tokens = tokenize(query)
+        if not tokens: return []
+        scores = np.zeros(len(self.keys))
+        for term, weight in self._expand(tokens).items():
+            posting = self._postings.get(term)
+            if posting is None: continue
+            ids, tf = posting
+            scores[ids] += weight * self._idf[term] * tf * (K1 + 1) / (tf + self._norm[ids])
+        hits = np.flatnonzero(scores)
+        top = hits[np.argsort(-scores[hits], kind="stable")][:limit]
+        return [SearchResult(self.keys[i], float(scores[i])) for i in top]
@@ -0,0 +1,143 @@
+# compliance_core/test_extraction.py
+# Rule engine that turns report text into one structured record per test.
+# Every rule (test names and aliases derived from the knowledge base, standard
+# references, verdicts, measured values with units, the "test summary" marker) is
+# folded into a single compiled pattern, and text is consumed in one left-to-right
+# pass over streamed chunks, so cost is linear in the size of the report.
+import re
+import threading
+from collections import Counter
+
+from . import knowledge_store
+
+WINDOW_CHARS = 400           # max distance from a test mention to a verdict/value it owns
+OVERLAP_CHARS = 256          # unscanned tail carried between chunks; longer than any token
+MAX_MEASUREMENTS = 50        # values kept per test
+STOP_WORDS = ("test", "tests")
+
+VERDICTS = {"PASS": "PASS", "PASSED": "PASS", "OK": "PASS", "FAIL": "FAIL", "FAILED": "FAIL", "NG": "FAIL", "NOK": "FAIL"}
+UNITS = ("mAh", "Ah", "kV", "mV", "V", "mA", "A", "kW", "W", "MΩ", "kΩ", "mΩ", "Ω", "Mohm", "kohm", "ohm", "°C", "degC",
+         "kHz", "MHz", "Hz", "ms", "min", "h", "s", "mm", "cm", "m", "dB", "g", "kPa", "bar", "%", "cycles")
+
+# Every token must follow one of these separators. Leading the pattern with a plain
+# character class lets the regex engine skip through word interiors in C instead of
+# attempting every alternative at every position, which is most of the throughput.
+_LEAD = r"[\s(\[/:=,;|\-]"
+_STANDARD = r"(?-i:(?:ISO|IEC|CISPR|ASTM|UL|AIS|SAE|JESD|AEC|EN|GB/T)[\s-]?[A-Z]?\d+(?:[-.]\d+)*)"
+_VERDICT = r"(?-i:(?:PASS(?:ED)?|Pass(?:ed)?|FAIL(?:ED)?|Fail(?:ed)?|NOK|NG|OK)\b)"
+_MEASURE = (r"(?P<value>[-+]?\d+(?:\.\d+)?)\s?(?P<unit>"
+            + "|".join(re.escape(u) for u in sorted(UNITS, key=len, reverse=True)) + r")(?![\w])")
+_SUMMARY = r"test\s+summary\b"
+
+def _aliases(key, entry):
+    # Names a test may appear under: its key, its display name, the parts of either
+    # split on "/" and "&", and parenthesized abbreviations such as "ESD" or "IPX7".
+    out = set()
+    for label in (key, entry.get("name", "")):
+        label = label.lower()
+        out.update(a.strip() for a in re.findall(r"\(([^)]+)\)", label))
+        plain = re.sub(r"\([^)]*\)", " ", label)
+        for part in [plain] + re.split(r"/|&|\band\b", plain):
+            part = " ".join(part.split())
+            words = part.split()
+            if len(words) > 1 and words[-1] in STOP_WORDS and len(" ".join(words[:-1])) >= 8: part = " ".join(words[:-1])
+            out.add(part)
+    return {a for a in out if len(a) >= 3}
+
+def _trie_pattern(phrases):
+    # Alternation factored on shared prefixes, so at most one branch per next character is tried.
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase: node = node.setdefault(ch, {})
+        node[""] = {}
+    def emit(node):
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + emit(sub) for ch, sub in sorted(node.items()) if ch]
+        if not branches: return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+    return emit(trie)
+
+class TestExtractor:
+    def __init__(self, knowledge_base):
+        self.tests = {}
+        alias_to_key = {}
+        for key, entry in knowledge_base.items():
+            self.tests[key] = entry
+            for alias in _aliases(key, entry): alias_to_key.setdefault(alias, key)
+        # The trie is greedy, so "high temperature endurance" wins over "endurance".
+        self._alias_to_key = {" ".join(a.split()): k for a, k in alias_to_key.items()}
+        self.pattern = re.compile(
+            rf"{_LEAD}(?:(?P<test>{_trie_pattern(self._alias_to_key)}\b)|(?P<std>{_STANDARD})|(?P<verdict>{_VERDICT})"
+            rf"|{_MEASURE}|(?P<summary>{_SUMMARY}))", re.IGNORECASE)
+
+    def resolve(self, text):
+        """Knowledge-base key of the first test named in a short label, or None."""
+        for m in self.pattern.finditer("\n" + text):
+            if m.lastgroup == "test": return self._alias_to_key.get(" ".join(m.group("test").lower().split()))
+        return None
+
+    def scan(self, chunks):
+        """Scan an iterable of text chunks and return one record per test that has a verdict or value."""
+        found, summary = {}, False
+        current, anchor, base, tail = None, 0, -1, "\n"   # leading separator for a token at offset 0
+        for final, chunk in _with_final(chunks):
+            buf = tail + chunk
+            limit = len(buf) if final else max(len(buf) - OVERLAP_CHARS, 0)
+            pos = 0
+            for m in self.pattern.finditer(buf):
+                if m.start() >= limit: break
+                at, kind = base + m.start(), m.lastgroup
+                pos = m.end()
+                if kind == "test":
+                    key = self._alias_to_key.get(" ".join(m.group("test").lower().split()))
+                    current = found.setdefault(key, {"verdicts": Counter(), "values": [], "cited": set(), "mentions": 0})
+                    current["mentions"] += 1; anchor = at
+                elif kind == "summary": summary = True
+                elif current is None or at - anchor > WINDOW_CHARS: continue
+                elif kind == "verdict": current["verdicts"][VERDICTS[m.group("verdict").upper()]] += 1; anchor = at
+                elif kind == "std": current["cited"].add(" ".join(m.group("std").split()))
+                else:
+                    if len(current["values"]) < MAX_MEASUREMENTS: current["values"].append((float(m.group("value")), m.group("unit")))
+                    anchor = at
+            cut = max(pos, limit)
+            base, tail = base + cut, buf[cut:]
+        records = [self._record(key, state) for key, state in found.items() if state["verdicts"] or state["values"]]
+        return records, summary
+
+    def _record(self, key, state):
+        entry, verdicts = self.tests[key], state["verdicts"]
+        result = "FAIL" if verdicts["FAIL"] else "PASS" if verdicts["PASS"] else "Data Extracted"
+        details = {"Standard": entry.get("standard", "N/A")}
+        if state["cited"]: details["Standards Cited"] = ", ".join(sorted(state["cited"]))
+        if verdicts: details["Verdicts"] = ", ".join(f"{v} ×{n}" for v, n in verdicts.most_common())
+        if state["values"]: details["Measurements"] = ", ".join(f"{v:g} {u}" for v, u in state["values"][:10])
+        return {"TestName": entry.get("name", key), "TestKey": key, "Result": result, "Details": details,
+                "Measurements": list(state["values"])}
+
+def _with_final(chunks):
+    # (is_last, chunk) pairs; a trailing empty chunk flushes the carried tail.
+    prev = None
+    for chunk in chunks:
+        if prev is not None: yield False, prev
+        prev = chunk
+    yield True, prev or ""
+
+_MEASURE_ONLY = re.compile(r"(?<![\w.])" + _MEASURE)
+
+def parse_measurements(text):
+    """(value, unit) pairs in a short text such as a table cell ("-40 °C", "1.5 kV")."""
+    return [(float(m.group("value")), m.group("unit")) for m in _MEASURE_ONLY.finditer(text)]
+
+def iter_text_chunks(text, size=1 << 20):
+    for i in range(0, len(text), size): yield text[i:i + size]
+
+_extractor, _extractor_lock = None, threading.Lock()
+
+def get_extractor():
+    # Compiled once per process from the knowledge store.
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = TestExtractor(knowledge_store.test_cases())
+        return _extractor
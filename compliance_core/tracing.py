@@ -0,0 +1,278 @@
+# compliance_core/tracing.py
+# Lightweight tracing for the hot paths. Every span (upload, sniffing, each parser, PDF
+# text extraction, battery header detection and analysis, rendering) is kept in an
+# in-process ring buffer for the Diagnostics page, together with cache hit counters and
+# the process memory high-water mark at the end of each span. Spans can also be exported
+# as OTLP/JSON, the OpenTelemetry wire format, without depending on the OpenTelemetry SDK:
+#   COMPLIANCE_TRACE_EXPORT=traces.jsonl              # one ExportTraceServiceRequest per line
+#   COMPLIANCE_TRACE_EXPORT=http://localhost:4318     # OTLP/HTTP collector (/v1/traces)
+# COMPLIANCE_TRACING=0 turns recording off entirely.
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+try: import resource
+except ImportError: resource = None      # Windows
+try: import psutil
+except ImportError: psutil = None
+
+RECENT_SPANS = 5000          # spans kept for the Diagnostics page
+EXPORT_BATCH = 256           # spans per OTLP request
+EXPORT_INTERVAL = 2.0        # seconds between flushes of a partial batch
+SERVICE_NAME = "compliance-tool"
+ENABLED = os.environ.get("COMPLIANCE_TRACING", "1") != "0"
+
+SpanRecord = namedtuple("SpanRecord", ["name", "trace_id", "span_id", "parent_id", "start_ns", "duration_ns",
+                                       "attrs", "error", "peak_rss_mb", "rss_growth_mb"])
+
+_current = contextvars.ContextVar("compliance_span", default=None)   # (trace_id, span_id) of the open span
+_recent = deque(maxlen=RECENT_SPANS)
+_cache_counts = {}
+_cache_sources = {}
+_lock = threading.Lock()
+_exporter = None
+
+_process = psutil.Process() if resource is None and psutil is not None else None
+
+def _peak_rss_mb():
+    if resource is not None: return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    if _process is None: return 0.0      # no resource module and no psutil: memory marks read 0
+    info = _process.memory_info()
+    return getattr(info, "peak_wset", info.rss) / 2 ** 20
+
+def current_rss_mb():
+    """Resident set size now (Linux), else the peak so far."""
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError): return _peak_rss_mb()
+
+def _record(record):
+    _recent.append(record)
+    if _exporter is not None: _exporter.submit(record)
+
+# === Spans ===
+class Span:
+    __slots__ = ("name", "attrs", "trace_id", "span_id", "parent_id", "_token", "_start_ns", "_t0", "_peak0")
+
+    def __init__(self, name, attrs):
+        self.name, self.attrs = name, attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current.get()
+        self.trace_id = parent[0] if parent else random.getrandbits(128)
+        self.parent_id, self.span_id = parent and parent[1], random.getrandbits(64)
+        self._token = _current.set((self.trace_id, self.span_id))
+        self._peak0, self._start_ns, self._t0 = _peak_rss_mb(), time.time_ns(), time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter_ns() - self._t0
+        _current.reset(self._token)
+        peak = _peak_rss_mb()
+        error = f"{exc_type.__name__}: {exc}" if exc_type is not None and not issubclass(exc_type, GeneratorExit) else None
+        _record(SpanRecord(self.name, self.trace_id, self.span_id, self.parent_id, self._start_ns, duration,
+                           self.attrs, error, round(peak, 1), round(peak - self._peak0, 1)))
+        return False
+
+class _NoopSpan:
+    def set(self, **attrs): pass
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NOOP = _NoopSpan()
+
+def span(name, **attrs):
+    """Context manager timing one stage; attributes can be added with .set() while it is open."""
+    return Span(name, attrs) if ENABLED else _NOOP
+
+def traced(name):
+    """Decorator: run every call of the function inside span(name)."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(name): return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def traced_iter(name, iterable, **attrs):
+    """Yield from iterable, recording one span for the time spent producing items.
+
+    For lazily consumed streams (PDF pages, CSV chunks) whose producer and consumer
+    interleave; the span's duration is the producer's share only, and "items" is set
+    to the number of items produced.
+    """
+    if not ENABLED:
+        yield from iterable
+        return
+    parent = _current.get()
+    trace_id = parent[0] if parent else random.getrandbits(128)
+    start_ns, peak0, busy, items, error = time.time_ns(), _peak_rss_mb(), 0, 0, None
+    it = iter(iterable)
+    try:
+        while True:
+            t0 = time.perf_counter_ns()
+            try: item = next(it)
+            except StopIteration: break
+            finally: busy += time.perf_counter_ns() - t0
+            items += 1
+            yield item
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"; raise
+    finally:
+        if hasattr(it, "close"): it.close()
+        peak = _peak_rss_mb()
+        _record(SpanRecord(name, trace_id, random.getrandbits(64), parent and parent[1], start_ns, busy,
+                           {**attrs, "items": items}, error, round(peak, 1), round(peak - peak0, 1)))
+
+def context():
+    """Copy of the current context, so work handed to a thread stays inside the open span."""
+    return contextvars.copy_context()
+
+# === Cache counters ===
+def cache_event(name, hit):
+    with _lock:
+        counts = _cache_counts.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+
+def register_cache(name, stats):
+    """Report an external cache on the Diagnostics page; stats() returns (hits, misses)."""
+    _cache_sources[name] = stats
+
+def cache_stats():
+    """{name: (hits, misses)} for counted and registered caches."""
+    with _lock: stats = {name: tuple(c) for name, c in _cache_counts.items()}
+    for name, fn in _cache_sources.items():
+        try: stats[name] = tuple(fn())
+        except Exception: continue
+    return stats
+
+# === Reading back ===
+def recent_spans():
+    return list(_recent)
+
+def clear():
+    _recent.clear()
+    with _lock: _cache_counts.clear()
+
+def stage_stats(spans=None):
+    """Per span name: calls, errors, latency percentiles (ms), total time and memory marks."""
+    import numpy as np
+    by_name = {}
+    for s in recent_spans() if spans is None else spans: by_name.setdefault(s.name, []).append(s)
+    rows = []
+    for name, group in sorted(by_name.items()):
+        ms = np.array([s.duration_ns for s in group]) / 1e6
+        p50, p95 = np.percentile(ms, [50, 95])
+        rows.append({"Stage": name, "Calls": len(group), "Errors": sum(s.error is not None for s in group),
+                     "p50 ms": round(float(p50), 2), "p95 ms": round(float(p95), 2), "Max ms": round(float(ms.max()), 2),
+                     "Total s": round(float(ms.sum()) / 1e3, 3), "Peak RSS MB": max(s.peak_rss_mb for s in group),
+                     "Max RSS Growth MB": max(s.rss_growth_mb for s in group)})
+    return rows
+
+def histogram(name, spans=None, bins=20):
+    """(bin upper edges in ms, counts) of the durations of one stage, on log-spaced bins."""
+    import numpy as np
+    ms = np.array([s.duration_ns for s in (recent_spans() if spans is None else spans) if s.name == name]) / 1e6
+    if not len(ms): return [], []
+    lo, hi = max(ms.min(), 1e-3), max(ms.max(), 1e-3)
+    edges = np.geomspace(lo, hi * 1.0001, bins + 1) if hi > lo else np.array([lo * 0.9, hi * 1.1])
+    counts, edges = np.histogram(np.clip(ms, edges[0], edges[-1]), bins=edges)
+    return edges[1:].tolist(), counts.tolist()
+
+def runs(spans=None):
+    """Root spans (one per upload, page render or CLI file), newest first."""
+    return [s for s in reversed(recent_spans() if spans is None else spans) if s.parent_id is None]
+
+def trace(trace_id, spans=None):
+    return sorted((s for s in (recent_spans() if spans is None else spans) if s.trace_id == trace_id), key=lambda s: s.start_ns)
+
+# === OTLP export ===
+def _attr_value(value):
+    if isinstance(value, bool): return {"boolValue": value}
+    if isinstance(value, int): return {"intValue": str(value)}
+    if isinstance(value, float): return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_span(s):
+    attrs = {**s.attrs, "process.runtime.peak_rss_mb": s.peak_rss_mb, "process.runtime.rss_growth_mb": s.rss_growth_mb}
+    out = {"traceId": f"{s.trace_id:032x}", "spanId": f"{s.span_id:016x}", "name": s.name, "kind": 1,
+           "startTimeUnixNano": str(s.start_ns), "endTimeUnixNano": str(s.start_ns + s.duration_ns),
+           "attributes": [{"key": k, "value": _attr_value(v)} for k, v in attrs.items()],
+           "status": {"code": 2, "message": s.error} if s.error else {}}
+    if s.parent_id: out["parentSpanId"] = f"{s.parent_id:016x}"
+    return out
+
+def otlp_request(spans):
+    """ExportTraceServiceRequest (OTLP/JSON) for the given span records."""
+    resource_attrs = [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                      {"key": "process.pid", "value": {"intValue": str(os.getpid())}}]
+    return {"resourceSpans": [{"resource": {"attributes": resource_attrs},
+                               "scopeSpans": [{"scope": {"name": "compliance_core"}, "spans": [_otlp_span(s) for s in spans]}]}]}
+
+class _Exporter:
+    """Batches finished spans on a daemon thread and ships them to a file or collector."""
+    def __init__(self, target):
+        self.target, self.exported, self.dropped, self.last_error = target, 0, 0, None
+        self._queue = queue.Queue(maxsize=20 * EXPORT_BATCH)
+        self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        try: self._queue.put_nowait(record)
+        except queue.Full: self.dropped += 1
+
+    def _run(self):
+        batch, deadline = [], time.monotonic() + EXPORT_INTERVAL
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None: break
+                batch.append(item)
+            except queue.Empty: pass
+            if len(batch) >= EXPORT_BATCH or (batch and time.monotonic() >= deadline):
+                self._send(batch); batch = []
+            if time.monotonic() >= deadline: deadline = time.monotonic() + EXPORT_INTERVAL
+        if batch: self._send(batch)
+
+    def _send(self, batch):
+        body = json.dumps(otlp_request(batch), separators=(",", ":"))
+        try:
+            if self.target.startswith(("http://", "https://")):
+                url = self.target if self.target.rstrip("/").endswith("/v1/traces") else self.target.rstrip("/") + "/v1/traces"
+                import urllib.request
+                req = urllib.request.Request(url, data=body.encode("utf-8"), headers={"Content-Type": "application/json"})
+                with urllib.request.urlopen(req, timeout=5): pass
+            else:
+                # One write per batch on an O_APPEND file, so worker processes can share it.
+                with open(self.target, "a", encoding="utf-8") as f: f.write(body + "\n")
+            self.exported += len(batch)
+        except Exception as e:
+            self.dropped += len(batch); self.last_error = str(e)
+
+    def close(self, timeout=5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+def configure_export(target):
+    """Export spans to a file path or an OTLP/HTTP collector URL; None or "" stops exporting."""
+    global _exporter
+    if _exporter is not None: _exporter.close(); _exporter = None
+    if target: _exporter = _Exporter(target)
+
+def export_status():
+    if _exporter is None: return None
+    return {"target": _exporter.target, "exported": _exporter.exported, "dropped": _exporter.dropped, "last_error": _exporter.last_error}
+
+configure_export(os.environ.get("COMPLIANCE_TRACE_EXPORT") if ENABLED else None)
+atexit.register(lambda: configure_export(None))